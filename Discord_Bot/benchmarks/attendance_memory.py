@@ -0,0 +1,126 @@
+# benchmarks/attendance_memory.py
+"""Memory of the attendance store as the bot keeps it, and team rollup time.
+
+Run from the Discord_Bot folder:  python -m benchmarks.attendance_memory [users] [days]
+
+The bot holds the nested ``{user_id: {date: status}}`` dict, the JSON
+backend's per-user encoded copy, *and* every index the cogs attach to the
+attendance store (status matrix, per-user dates, event date index). The
+data is loaded from JSON like the bot does, then each step is measured as
+a change in the running tracemalloc total (building the matrix makes the
+dict share its strings, so that step is negative), and the process's peak
+RSS is reported at the end: the total is what a bot with this much history
+actually pays.
+"""
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from utils.aio import dumps, loads
+from utils.events import attach_events
+from utils.matrix import STATUSES, get_matrix
+from utils.render import get_render_cache
+from utils.search import get_user_dates
+from utils.storage import JsonFileBackend, Store
+
+
+def build_dict(users, days):
+    start = date(2020, 1, 1)
+    rng = random.Random(1)
+    data = {}
+    for u in range(users):
+        user_id = str(10**17 + u)  # snowflake-sized IDs
+        data[user_id] = {
+            (start + timedelta(days=d)).isoformat(): rng.choice(STATUSES)
+            for d in range(days)
+            if rng.random() < 0.9
+        }
+    return data
+
+
+class MemoryBackend(JsonFileBackend):
+    """Hands the generated data to a real Store without touching the disk"""
+
+    def __init__(self, data):
+        super().__init__("benchmark.json")
+        self.data = data
+
+    def load(self):
+        self._parts = {user_id: dumps(entries) for user_id, entries in self.data.items()}  # as JsonFileBackend.load
+        return self.data
+
+    def stamp(self):
+        return None
+
+
+class Traced:
+    """Running tracemalloc total, so a step that frees memory shows as negative"""
+
+    def __init__(self):
+        tracemalloc.start()
+        self.steps = []
+
+    def step(self, name, build):
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        self.steps.append((name, tracemalloc.get_traced_memory()[0] - before))
+        return result
+
+
+def timed(fn, repeat=20):
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t) * 1000 / repeat
+
+
+def dict_team(data, user_ids):
+    summary = dict.fromkeys(STATUSES, 0)
+    for user_id in user_ids:
+        for status in data.get(user_id, {}).values():
+            summary[status] += 1
+    return summary
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365 * 3
+
+    raw = dumps(build_dict(users, days))  # load from JSON, like the bot: fresh strings per person-day
+    traced = Traced()
+    data = traced.step("nested dict (as loaded)", lambda: loads(raw))
+    store = traced.step("json backend write cache", lambda: Store("benchmark.json", backend=MemoryBackend(data), file_lock=False))
+
+    # Same indexes, in the same order, as the cogs' store hooks
+    traced.step("status matrix + shared strings", lambda: get_matrix(store))
+    traced.step("render cache (empty)", lambda: get_render_cache(store))
+    traced.step("user dates", lambda: get_user_dates(store))
+    traced.step("events + date index", lambda: attach_events(store, "attendance"))
+    total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    matrix = get_matrix(store)
+    assert dict_team(data, data) == matrix.team(data)
+
+    print(f"{users} users x {days} days ({sum(map(len, data.values()))} records)")
+    print(f"{'step':<32}{'memory MB':>12}")
+    for name, size in traced.steps:
+        print(f"{name:<32}{size / 2**20:>+12.1f}")
+    print(f"{'total (traced)':<32}{total / 2**20:>12.1f}")
+    print(f"{'process peak RSS':<32}{peak_rss_mb():>12.1f}")
+    print()
+    print(f"{'team rollup':<32}{'ms':>12}")
+    print(f"{'nested dict':<32}{timed(lambda: dict_team(data, data)):>12.2f}")
+    print(f"{'matrix':<32}{timed(lambda: matrix.team(data)):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+# benchmarks/load_test.py
+"""Offline load test: drive the real cog commands with simulated interactions.
+
+Run from the Discord_Bot folder:
+    python -m benchmarks.load_test --users 300 --days 180 --tasks 3 --invocations 500
+    python -m benchmarks.load_test --output after.json --compare before.json
+
+A synthetic guild (users x days of attendance, users x days x tasks of task
+records, split into --teams roles) is written to a scratch data folder
+through the real Store, then each scenario fires --invocations calls of one
+command, at most --concurrency at a time, against fake Interaction / Guild /
+Member / Role objects. Nothing touches the network: responses are recorded
+locally, optionally after --api-latency ms to imitate Discord.
+
+Per scenario the report has throughput, p50/p99 latency, the mean storage
+and render time per call (from utils.metrics spans), storage bytes read and
+written (including the final flush) and the process peak RSS so far.
+Command checks (e.g. administrator) are not run; the callbacks are called
+directly. STORAGE_BACKEND / STORAGE_PARTITION and other settings are read
+from the environment as usual.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import traceback
+from datetime import date, timedelta
+import discord
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+GUILD_ID = 100000000000000000
+FIRST_USER = GUILD_ID + 1000
+STATUS_WEIGHTS = {"Present": 70, "Late": 15, "Half-Day": 5, "Absent": 10}
+
+# Punch-in is accepted at any minute of any day, so every run measures the write path
+OPEN_POLICY = {"default": {"start": "00:00", "end": "23:59", "grace_minutes": 1439, "half_day_after": "23:59", "workdays": list(range(7)), "punch_in_days": list(range(7))}}
+
+
+# ----------------- Fake Discord Objects -----------------
+class FakeRole:
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+        self.mention = f"<@&{role_id}>"
+
+
+class FakeMember:
+    def __init__(self, member_id, name, guild, roles):
+        self.id = member_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{member_id}>"
+        self.bot = False
+        self.guild = guild
+        self.roles = roles  # lowest first, like discord.Member.roles
+
+
+class FakeGuild:
+    def __init__(self, guild_id, name="Load Test"):
+        self.id = guild_id
+        self.name = name
+        self.members = {}
+        self.roles = [FakeRole(guild_id, "@everyone")]
+        self.text_channels = []  # no logs channel: log lines are batched, then dropped
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    async def chunk(self, *, cache=True):
+        return list(self.members.values())
+
+
+class FakeBot:
+    def __init__(self, guild, members_intent=True):
+        self.intents = discord.Intents.default()
+        self.intents.members = members_intent
+        self.guild = guild
+        self.latency = 0.0
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+    def get_channel(self, channel_id):
+        return None
+
+
+class FakeResponse:
+    """Stands in for ``InteractionResponse`` and the followup webhook"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self._done = False
+        self.sent = []
+
+    def is_done(self):
+        return self._done
+
+    async def _api(self, kind, kwargs):
+        from utils import metrics
+        t = time.perf_counter()
+        # Build the payload discord.py would send, so serialization cost is included
+        payload = {"type": kind}
+        if kwargs.get("embed") is not None:
+            payload["embed"] = kwargs["embed"].to_dict()
+        if kwargs.get("view") is not None:
+            payload["components"] = kwargs["view"].to_components()
+        if kwargs.get("file") is not None:
+            payload["file_bytes"] = len(kwargs["file"].fp.getbuffer())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append(payload)
+        metrics.add("discord", time.perf_counter() - t)
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        await self._api("message", kwargs)
+
+    async def defer(self, **kwargs):
+        self._done = True
+        await self._api("defer", kwargs)
+
+    async def edit_message(self, **kwargs):
+        self._done = True
+        await self._api("edit", kwargs)
+
+    async def send_modal(self, modal):
+        self._done = True
+        await self._api("modal", {})
+
+    async def send(self, content=None, **kwargs):
+        await self._api("followup", kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, user, guild, latency=0.0):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.response = FakeResponse(latency)
+        self.followup = self.response
+        self.extras = {}
+        self.command = None
+
+
+# ----------------- Synthetic Dataset -----------------
+def build_guild(users, teams):
+    guild = FakeGuild(GUILD_ID)
+    team_roles = [FakeRole(GUILD_ID + 1 + t, f"Team {t + 1}") for t in range(teams)]
+    guild.roles += team_roles
+    for u in range(users):
+        member_id = FIRST_USER + u
+        guild.members[member_id] = FakeMember(member_id, f"user{u:05d}", guild, [guild.roles[0], team_roles[u % teams]])
+    return guild, team_roles
+
+
+def build_data(guild, days, tasks_per_day, seed=1):
+    """Attendance up to yesterday (today stays open for punch-ins) and tasks up to today"""
+    from utils.timesheet import format_minutes
+    rng = random.Random(seed)
+    today = date.today()
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    attendance, tasks = {}, {}
+    for member_id in guild.members:
+        user_id = str(member_id)
+        attendance[user_id] = {
+            (today - timedelta(days=d)).isoformat(): rng.choices(statuses, weights)[0]
+            for d in range(days, 0, -1)
+            if rng.random() < 0.9
+        }
+        user_tasks = {}
+        for d in range(days - 1, -1, -1):
+            day = []
+            for k in range(tasks_per_day):
+                minutes = rng.choice((15, 30, 45, 60, 90, 120))
+                day.append({"task": f"Task {k + 1} for day -{d}", "time": format_minutes(minutes), "minutes": minutes})
+            if day:
+                user_tasks[(today - timedelta(days=d)).isoformat()] = day
+        tasks[user_id] = user_tasks
+    return attendance, tasks
+
+
+async def seed(attendance, tasks):
+    """Write the dataset through the real Store (before the cogs attach their indexes)"""
+    from utils.storage import ATTENDANCE_FILE, TASKS_FILE, open_store
+    for path, data in ((ATTENDANCE_FILE, attendance), (TASKS_FILE, tasks)):
+        store = await open_store(path, GUILD_ID)
+        for user_id, dates in data.items():
+            store.set(user_id, value=dates)
+        await store.flush()
+
+
+# ----------------- Scenarios -----------------
+def scenarios(cogs, guild, team_roles):
+    """name -> (app command, cog, rng -> (invoking member, kwargs))"""
+    members = list(guild.members.values())
+
+    def anyone(rng):
+        return rng.choice(members), {}
+
+    def team(rng):
+        return rng.choice(members), {"role": rng.choice(team_roles)}
+
+    def task_view(rng):
+        if rng.random() < 0.5:
+            return rng.choice(members), {"user": rng.choice(members)}
+        return team(rng)
+
+    return {
+        "punch_in": (cogs["punchin"].punch_in, cogs["punchin"], anyone),
+        "attendance_team": (cogs["attendance"].attendance_team, cogs["attendance"], team),
+        "calendar": (cogs["calendar"].calendar, cogs["calendar"], anyone),
+        "logs": (cogs["logs"].logs, cogs["logs"], anyone),
+        "task_view": (cogs["tasks"].task_view, cogs["tasks"], task_view),
+    }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB elsewhere
+
+
+async def run_scenario(name, command, cog, pick, guild, args):
+    from utils import metrics
+    from utils.storage import iter_stores, ATTENDANCE_FILE, TASKS_FILE
+
+    rng = random.Random(f"{args.seed}:{name}")
+    calls = [pick(rng) for _ in range(args.invocations)]
+    gate = asyncio.Semaphore(args.concurrency or args.invocations)
+    latencies, errors = [], []
+
+    async def invoke(member, kwargs):
+        async with gate:
+            interaction = FakeInteraction(member, guild, args.api_latency / 1000)
+            span = metrics.begin()
+            t = time.perf_counter()
+            failed = False
+            try:
+                await command.callback(cog, interaction, **kwargs)
+            except Exception:
+                failed = True
+                errors.append(traceback.format_exc())
+            latencies.append(time.perf_counter() - t)
+            metrics.finish(name, span, error=failed)
+
+    # One untimed call starts the storage and render pools
+    member, kwargs = calls[0]
+    await command.callback(cog, FakeInteraction(member, guild), **kwargs)
+
+    io_before = dict(metrics.registry.storage_bytes)
+    t = time.perf_counter()
+    await asyncio.gather(*(invoke(member, kwargs) for member, kwargs in calls))
+    for store in iter_stores(ATTENDANCE_FILE) + iter_stores(TASKS_FILE):
+        await store.flush()  # count the writes this scenario caused
+    wall = time.perf_counter() - t
+
+    latencies.sort()
+    stats = {row.name: row for row in metrics.command_summary()}.get(name)
+    return {
+        "scenario": name,
+        "invocations": len(calls),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_seconds": wall,
+        "throughput_per_second": len(calls) / wall if wall else None,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "storage_ms_mean": stats.storage * 1000 if stats and stats.storage is not None else None,
+        "render_ms_mean": stats.render * 1000 if stats and stats.render is not None else None,
+        "bytes_read": metrics.registry.storage_bytes["read"] - io_before["read"],
+        "bytes_written": metrics.registry.storage_bytes["written"] - io_before["written"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def run(args):
+    from utils.aio import write_json
+    from utils.policy import POLICY_FILE
+
+    write_json(POLICY_FILE, OPEN_POLICY)
+    guild, team_roles = build_guild(args.users, args.teams)
+    bot = FakeBot(guild)
+
+    t = time.perf_counter()
+    attendance, tasks = build_data(guild, args.days, args.tasks)
+    await seed(attendance, tasks)
+    del attendance, tasks
+    seed_seconds = time.perf_counter() - t
+
+    from cogs.attendance import Attendance
+    from cogs.calender import Calendar
+    from cogs.logs import Logs
+    from cogs.punchin import PunchIn
+    from cogs.tasks import Task
+    t = time.perf_counter()
+    cogs = {"punchin": PunchIn(bot), "attendance": Attendance(bot), "calendar": Calendar(bot), "logs": Logs(bot), "tasks": Task(bot)}
+    index_seconds = time.perf_counter() - t  # the cogs' store hooks build their indexes here
+
+    results = []
+    try:
+        for name, (command, cog, pick) in scenarios(cogs, guild, team_roles).items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            results.append(await run_scenario(name, command, cog, pick, guild, args))
+            print(f"✅ {name}: {results[-1]['throughput_per_second']:.0f}/s")
+    finally:
+        await cogs["logs"].cog_unload()
+    return {"seed_seconds": seed_seconds, "index_seconds": index_seconds, "scenarios": results}
+
+
+def shutdown():
+    from utils.aio import shutdown_io
+    from utils.render import shutdown_renderer
+    from utils.roles import close_role_indexes
+    from utils.storage import close_stores
+    shutdown_io()
+    close_stores()
+    close_role_indexes()
+    shutdown_renderer()
+
+
+# ----------------- Report -----------------
+def print_report(report, previous=None):
+    before = {r["scenario"]: r for r in previous["scenarios"]} if previous else {}
+
+    def delta(row, key, higher_is_better=False):
+        old = before.get(row["scenario"], {}).get(key)
+        if not old or row[key] is None:
+            return ""
+        change = (row[key] - old) / old * 100
+        worse = change < 0 if higher_is_better else change > 0
+        return f" ({change:+.0f}%{'!' if worse and abs(change) >= 10 else ''})"
+
+    c = report["config"]
+    print(f"{c['users']} users x {c['days']} days x {c['tasks']} tasks/day, {c['invocations']} invocations"
+          f" (concurrency {c['concurrency'] or c['invocations']}, API latency {c['api_latency']} ms, backend {c['backend']})")
+    print(f"Seeded in {report['seed_seconds']:.2f}s, indexes built in {report['index_seconds']:.2f}s")
+    if previous and previous["config"] != c:
+        changed = sorted(k for k in c if previous["config"].get(k) != c[k])
+        print(f"⚠️ Compared run used different settings: {', '.join(changed)}")
+    print(f"{'scenario':<17}{'req/s':>16}{'p50 ms':>16}{'p99 ms':>16}{'storage ms':>11}{'render ms':>10}{'read KB':>9}{'written KB':>11}{'RSS MB':>8}{'err':>5}")
+    for r in report["scenarios"]:
+        fmt = lambda v: "-" if v is None else f"{v:.1f}"
+        print(
+            f"{r['scenario']:<17}"
+            f"{r['throughput_per_second']:>8.0f}{delta(r, 'throughput_per_second', True):>8}"
+            f"{r['p50_ms']:>8.1f}{delta(r, 'p50_ms'):>8}"
+            f"{r['p99_ms']:>8.1f}{delta(r, 'p99_ms'):>8}"
+            f"{fmt(r['storage_ms_mean']):>11}{fmt(r['render_ms_mean']):>10}"
+            f"{r['bytes_read'] / 1024:>9.0f}{r['bytes_written'] / 1024:>11.0f}"
+            f"{fmt(r['peak_rss_mb']):>8}{r['errors']:>5}"
+        )
+    for r in report["scenarios"]:
+        if r["first_error"]:
+            print(f"\n❌ {r['scenario']} failed {r['errors']} time(s); first error:\n{r['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of the bot's commands")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90, help="Days of history per user")
+    parser.add_argument("--tasks", type=int, default=3, help="Tasks per user per day")
+    parser.add_argument("--teams", type=int, default=5, help="Roles the users are split into")
+    parser.add_argument("--invocations", type=int, default=200, help="Calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=0, help="Calls in flight at once (default: all)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Simulated ms per Discord API call")
+    parser.add_argument("--scenarios", nargs="+", choices=["punch_in", "attendance_team", "calendar", "logs", "task_view"])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="load_test.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to show changes against")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    # Storage paths are relative (data/...), so work in a scratch folder
+    os.environ["METRICS"] = "1"  # spans and byte counters; nothing is served
+    cwd = os.getcwd()
+    sys.path.insert(0, cwd)
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            report = asyncio.run(run(args))
+        finally:
+            shutdown()
+            os.chdir(cwd)
+
+    from utils.aio import JSON_LIBRARY
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "users": args.users, "days": args.days, "tasks": args.tasks, "teams": args.teams,
+            "invocations": args.invocations, "concurrency": args.concurrency, "api_latency": args.api_latency,
+            "seed": args.seed, "backend": os.getenv("STORAGE_BACKEND", "json"),
+            "partition": os.getenv("STORAGE_PARTITION", "global"), "json_library": JSON_LIBRARY,
+            "python": sys.version.split()[0],
+        },
+        **report,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report, previous)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
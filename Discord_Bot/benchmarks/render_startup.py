@@ -0,0 +1,69 @@
+# benchmarks/render_startup.py
+"""Compare import time, peak RSS and render time of the calendar renderers.
+
+Run from the Discord_Bot folder:  python -m benchmarks.render_startup
+Each case runs in a fresh interpreter so imports are measured cold.
+matplotlib is optional; its row is skipped when it is not installed.
+"""
+import json
+import subprocess
+import sys
+
+CASES = {
+    "baseline (python only)": "pass",
+    "utils.heatmap": "from utils.heatmap import render_strip as render",
+    "matplotlib.pyplot": "import matplotlib; matplotlib.use('Agg'); import matplotlib.pyplot as plt",
+}
+
+RENDER = {
+    "utils.heatmap": "render('Attendance', days, statuses)",
+    "matplotlib.pyplot": (
+        "fig = plt.figure(figsize=(10, 2)); plt.imshow([[i % 3 for i in range(30)]], cmap='Greens', aspect='auto'); "
+        "buf = io.BytesIO(); plt.savefig(buf, format='png'); plt.close(fig)"
+    ),
+}
+
+RENDER_BLOCK = """
+t = time.perf_counter()
+for _ in range(20):
+    {render}
+render_ms = (time.perf_counter() - t) * 1000 / 20
+"""
+
+PROBE = """
+import io, json, resource, sys, time
+t = time.perf_counter()
+{imports}
+import_ms = (time.perf_counter() - t) * 1000
+days = ["2024-01-%02d" % d for d in range(1, 31)]
+statuses = [("Present", "Half-Day", "Absent")[i % 3] for i in range(30)]
+render_ms = None
+{render_block}
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"import_ms": import_ms, "render_ms": render_ms, "peak_rss_mb": rss_kb / 1024}}))
+"""
+
+
+def run(name, imports):
+    render = RENDER.get(name)
+    render_block = RENDER_BLOCK.format(render=render) if render else ""
+    code = PROBE.format(imports=imports, render_block=render_block)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return json.loads(proc.stdout)
+
+
+def main():
+    print(f"{'renderer':<24}{'import ms':>12}{'render ms':>12}{'peak RSS MB':>14}")
+    for name, imports in CASES.items():
+        result = run(name, imports)
+        if result is None:
+            print(f"{name:<24}{'not installed':>12}")
+            continue
+        render = "-" if result["render_ms"] is None else f"{result['render_ms']:.1f}"
+        print(f"{name:<24}{result['import_ms']:>12.1f}{render:>12}{result['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
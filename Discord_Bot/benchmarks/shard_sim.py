@@ -0,0 +1,112 @@
+# benchmarks/shard_sim.py
+"""Simulate N guilds split across shard processes and measure punch-in throughput.
+
+Run from the Discord_Bot folder:
+    python -m benchmarks.shard_sim --guilds 200 --members 50 --shards 1 2 4
+
+Each shard is a separate process that owns the guilds Discord would route to
+it (``(guild_id >> 22) % shard_count``) and writes one punch-in per member per
+day through the real Store, in a scratch data folder. Two layouts are compared:
+- guild:  STORAGE_PARTITION=guild, every guild in its own file
+- global: one shared file, STORAGE_FILE_LOCK=1 so processes stay consistent
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+FIRST_GUILD = 100000000000000000
+
+
+def guild_ids(count):
+    # Spread snowflakes so (id >> 22) % shards distributes like real guilds
+    return [FIRST_GUILD + (i << 22) for i in range(count)]
+
+
+def shard_worker(shard, shard_count, guilds, members, days, workdir, layout, results):
+    os.chdir(workdir)
+    os.environ["STORAGE_PARTITION"] = layout
+    os.environ["STORAGE_FILE_LOCK"] = "1" if layout == "global" else "0"
+    from utils.storage import ATTENDANCE_FILE, close_stores, get_store
+
+    owned = [g for g in guild_ids(guilds) if (g >> 22) % shard_count == shard]
+    start = date(2024, 1, 1)
+
+    async def run():
+        writes = 0
+        t = time.perf_counter()
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            for guild_id in owned:
+                store = get_store(ATTENDANCE_FILE, guild_id)
+                for m in range(members):
+                    user_id = str(guild_id + m + 1)
+                    async with store.transaction(user_id):
+                        if store.get(user_id, day) is None:
+                            store.set(user_id, day, value="Present")
+                            writes += 1
+            for guild_id in owned:
+                await get_store(ATTENDANCE_FILE, guild_id).flush()
+        return writes, time.perf_counter() - t
+
+    writes, elapsed = asyncio.run(run())
+    close_stores()
+    results.put({"shard": shard, "guilds": len(owned), "writes": writes, "seconds": elapsed})
+
+
+def simulate(layout, shard_count, args):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    with tempfile.TemporaryDirectory() as workdir:
+        procs = [
+            ctx.Process(target=shard_worker, args=(s, shard_count, args.guilds, args.members, args.days, workdir, layout, results))
+            for s in range(shard_count)
+        ]
+        t = time.perf_counter()
+        for p in procs:
+            p.start()
+        rows = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        wall = time.perf_counter() - t
+    return sorted(rows, key=lambda r: r["shard"]), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard throughput simulation")
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--layouts", nargs="+", default=["guild", "global"], choices=["guild", "global"])
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    report = []
+    for layout in args.layouts:
+        for shard_count in args.shards:
+            rows, wall = simulate(layout, shard_count, args)
+            total = sum(r["writes"] for r in rows)
+            busy = max(r["seconds"] for r in rows)  # slowest shard, excluding process start-up
+            report.append({
+                "layout": layout, "shards": shard_count, "wall_seconds": wall, "busy_seconds": busy,
+                "writes": total, "writes_per_second": total / busy if busy else None, "per_shard": rows,
+            })
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.guilds} guilds x {args.members} members x {args.days} days")
+    print(f"{'layout':<8}{'shards':>7}{'writes/s total':>16}{'writes/s per shard (min..max)':>32}")
+    for r in report:
+        rates = [s["writes"] / s["seconds"] for s in r["per_shard"] if s["seconds"]]
+        print(f"{r['layout']:<8}{r['shards']:>7}{r['writes_per_second']:>16.0f}{f'{min(rates):.0f}..{max(rates):.0f}':>32}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# cogs/analytics.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+from datetime import date, datetime, timedelta
+import io
+import typing
+from utils.heatmap import render_team
+from utils.lazy import lazy_import
+from utils.matrix import get_matrix, month_range
+from utils.policy import get_policy
+from utils.render import render
+from utils.roles import needs_chunk, team_members
+from utils.storage import ATTENDANCE_FILE, add_store_hook, open_store
+
+# NumPy-backed; imported the first time a stats/heatmap command runs, not at startup
+analytics = lazy_import("utils.analytics")
+
+DEFAULT_WEEKS = 8
+MAX_RANGE_DAYS = 366  # longest since/until span for /attendance_stats
+MAX_HEATMAP_MEMBERS = 200
+
+
+def _percent(value):
+    return "-" if value is None else f"{value:.0%}"
+
+
+# ----------------- Analytics Cog -----------------
+class Analytics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.policy = get_policy()
+        add_store_hook(ATTENDANCE_FILE, get_matrix)
+
+    async def _matrix(self, interaction):
+        return get_matrix(await open_store(ATTENDANCE_FILE, interaction.guild_id))
+
+    # ----------------- /attendance_stats -----------------
+    @app_commands.command(name="attendance_stats", description="Weekly attendance rate, punctuality and streaks for a team")
+    @app_commands.describe(
+        role="Team to analyse (default: everyone)",
+        since="First date (YYYY-MM-DD, default: 8 weeks ago)",
+        until="Last date (YYYY-MM-DD, default: today)",
+    )
+    @app_commands.guild_only()
+    async def attendance_stats(self, interaction: discord.Interaction, role: typing.Optional[discord.Role] = None, since: typing.Optional[str] = None, until: typing.Optional[str] = None):
+        today = datetime.now().date()
+        until = until or today.isoformat()
+        since = since or (today - timedelta(weeks=DEFAULT_WEEKS) + timedelta(days=1)).isoformat()
+        if not _valid_range(since, until):
+            await interaction.response.send_message("❌ Invalid date range. Use YYYY-MM-DD with since ≤ until.", ephemeral=True)
+            return
+        if (date.fromisoformat(until) - date.fromisoformat(since)).days >= MAX_RANGE_DAYS:
+            await interaction.response.send_message(f"❌ Date range too long. Pick at most {MAX_RANGE_DAYS} days.", ephemeral=True)
+            return
+
+        if await needs_chunk(self.bot, interaction.guild):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+        members = await team_members(self.bot, interaction.guild, role)
+        # Count the days each member's shift expects attendance, like the close-out
+        workdays = {str(m.id): self.policy.shift_for(interaction.guild.id, m.role_ids[::-1]).workdays for m in members}
+        stats = analytics.team_stats(await self._matrix(interaction), [str(m.id) for m in members], since, until, workdays)
+
+        embed = discord.Embed(
+            title=f"📈 Attendance Stats ({role.name if role else 'Everyone'})",
+            description=f"{since} → {until} · {stats['members']} members",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Attendance rate", value=_percent(stats["rate"]))
+        embed.add_field(name="Punctuality", value=_percent(stats["punctuality"]))
+        embed.add_field(name="Totals", value=" · ".join(f"{s}: {n}" for s, n in stats["totals"].items()), inline=False)
+
+        weeks = "\n".join(
+            f"{w['week']}  {_percent(w['rate']):>5}  {_percent(w['punctuality']):>5}" for w in stats["weekly"][-12:]
+        )
+        embed.add_field(name="Week of       Rate  On time", value=f"```\n{weeks or 'No data'}\n```", inline=False)
+
+        names = {str(m.id): m.name for m in members}
+        for title, key in (("🔥 Current streaks", "current_streak"), ("🏆 Longest streaks", "longest_streak")):
+            top = sorted(stats[key].items(), key=lambda kv: kv[1], reverse=True)[:5]
+            lines = [f"{names[uid]}: {days} day(s)" for uid, days in top if days]
+            embed.add_field(name=title, value="\n".join(lines) or "None")
+
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ----------------- /team_heatmap -----------------
+    @app_commands.command(name="team_heatmap", description="Heatmap of a team's attendance for one month")
+    @app_commands.describe(role="Team to show", month="Month (YYYY-MM, default: this month)")
+    @app_commands.guild_only()
+    async def team_heatmap(self, interaction: discord.Interaction, role: discord.Role, month: typing.Optional[str] = None):
+        month = month or datetime.now().strftime("%Y-%m")
+        try:
+            since, until = month_range(month)
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid month. Use YYYY-MM.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        members = (await team_members(self.bot, interaction.guild, role))[:MAX_HEATMAP_MEMBERS]
+        if not members:
+            await interaction.followup.send(f"❌ No members in {role.name}.", ephemeral=True)
+            return
+
+        rows = analytics.heatmap_rows(await self._matrix(interaction), [str(m.id) for m in members], since, until)
+        dates = [d.isoformat() for d in _days(since, until)]
+        png = await render(render_team, f"{role.name} - {month}", dates, [m.name for m in members], rows)
+
+        await interaction.followup.send(
+            content=f"🗓️ Team heatmap for {role.name} ({month})",
+            file=discord.File(io.BytesIO(png), filename="team_heatmap.png"),
+            ephemeral=True,
+        )
+
+
+def _valid_range(since, until):
+    try:
+        return date.fromisoformat(since) <= date.fromisoformat(until)
+    except ValueError:
+        return False
+
+
+def _days(since, until):
+    day, last = date.fromisoformat(since), date.fromisoformat(until)
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+# ----------------- Setup Function -----------------
+async def setup(bot):
+    await bot.add_cog(Analytics(bot))
@@ -2,125 +2,226 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
+import glob
+import io
 import os
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+import tempfile
+from datetime import date, datetime, timedelta
 import typing
-
-ATTENDANCE_FILE = "data/attendance.json"
-
-
-# ----------------- Utility Functions -----------------
-def load_json(path):
-    """Load JSON file safely"""
-    if not os.path.exists(path):
-        return {}
-    with open(path, "r") as f:
-        return json.load(f)
-
-
-def save_json(path, data):
-    """Save JSON file safely"""
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
+from utils import aio
+from utils.export import export, import_attendance, parse_attendance_csv, snapshot
+from utils.heatmap import render_strip
+from utils.matrix import STATUSES, get_matrix, month_range
+from utils.render import get_render_cache, render
+from utils.roles import needs_chunk, team_members
+from utils.search import get_user_dates
+from utils.storage import ATTENDANCE_FILE, TASKS_FILE, add_store_hook, open_store
 
 
 # ----------------- Attendance Cog -----------------
 class Attendance(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Every guild's attendance store keeps the status matrix and chart cache
+        add_store_hook(ATTENDANCE_FILE, get_matrix)
+        add_store_hook(ATTENDANCE_FILE, get_render_cache)
+        add_store_hook(ATTENDANCE_FILE, get_user_dates)
+
+        # Charts are no longer written to disk; drop files left by older versions
+        for path in glob.glob("data/*_calendar.png"):
+            os.remove(path)
+
+    async def _store(self, interaction):
+        return await open_store(ATTENDANCE_FILE, interaction.guild_id)
 
     # ----------------- /attendance (user summary) -----------------
     @app_commands.command(name="attendance", description="Check attendance for a user")
-    async def attendance(self, interaction: discord.Interaction, user: typing.Optional[discord.Member] = None):
-        if user is None:
-            if interaction.guild is not None:
-                user = interaction.guild.get_member(interaction.user.id)
-            else:
-                user = None
-
-        if user is None:
-            await interaction.response.send_message("❌ Could not find the user.", ephemeral=True)
+    @app_commands.describe(month="Limit to one month (YYYY-MM)")
+    async def attendance(self, interaction: discord.Interaction, user: typing.Optional[discord.Member] = None, month: typing.Optional[str] = None):
+        # The caller comes with the interaction; the member cache may be empty (MEMBER_CACHE=minimal)
+        user = user or interaction.user
+
+        try:
+            days = month_range(month) if month else ()
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid month. Use YYYY-MM.", ephemeral=True)
             return
-
-        data = load_json(ATTENDANCE_FILE)
-
-        user_data = data.get(str(user.id), {})
-        present = sum(1 for s in user_data.values() if s == "Present")
-        half_day = sum(1 for s in user_data.values() if s == "Half-Day")
-        absent = sum(1 for s in user_data.values() if s == "Absent")
+        counts = get_matrix(await self._store(interaction)).counts(str(user.id), *days)
 
         embed = discord.Embed(
-            title=f"📅 Attendance Summary for {user.display_name}",
+            title=f"📅 Attendance Summary for {user.display_name}" + (f" ({month})" if month else ""),
             color=discord.Color.green(),
             timestamp=datetime.now()
         )
-        embed.add_field(name="✅ Present", value=str(present))
-        embed.add_field(name="🌓 Half-Day", value=str(half_day))
-        embed.add_field(name="❌ Absent", value=str(absent))
+        embed.add_field(name="✅ Present", value=str(counts["Present"]))
+        embed.add_field(name="⏰ Late", value=str(counts["Late"]))
+        embed.add_field(name="🌓 Half-Day", value=str(counts["Half-Day"]))
+        embed.add_field(name="❌ Absent", value=str(counts["Absent"]))
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     # ----------------- /attendance team -----------------
     @app_commands.command(name="attendance_team", description="Check attendance summary for a team (role-based)")
-    async def attendance_team(self, interaction: discord.Interaction, role: discord.Role):
-        data = load_json(ATTENDANCE_FILE)
-
-        team_summary = {"Present": 0, "Half-Day": 0, "Absent": 0}
-        for member in role.members:
-            user_data = data.get(str(member.id), {})
-            team_summary["Present"] += sum(1 for s in user_data.values() if s == "Present")
-            team_summary["Half-Day"] += sum(1 for s in user_data.values() if s == "Half-Day")
-            team_summary["Absent"] += sum(1 for s in user_data.values() if s == "Absent")
+    @app_commands.describe(month="Limit to one month (YYYY-MM)")
+    @app_commands.guild_only()
+    async def attendance_team(self, interaction: discord.Interaction, role: discord.Role, month: typing.Optional[str] = None):
+        try:
+            days = month_range(month) if month else ()
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid month. Use YYYY-MM.", ephemeral=True)
+            return
+        if await needs_chunk(self.bot, interaction.guild):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+        members = await team_members(self.bot, interaction.guild, role)
+        team_summary = get_matrix(await self._store(interaction)).team((str(member.id) for member in members), *days)
 
         embed = discord.Embed(
-            title=f"👥 Team Attendance Summary ({role.name})",
+            title=f"👥 Team Attendance Summary ({role.name})" + (f" ({month})" if month else ""),
             color=discord.Color.blue(),
             timestamp=datetime.now()
         )
         for status, count in team_summary.items():
             embed.add_field(name=status, value=str(count))
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
 
     # ----------------- /attendance edit -----------------
     @app_commands.command(name="attendance_edit", description="Edit attendance for a user (Admins only)")
     @app_commands.checks.has_permissions(administrator=True)
     async def attendance_edit(self, interaction: discord.Interaction, user: discord.Member, date: str, status: str):
-        """Admin correction: date format YYYY-MM-DD, status = Present / Half-Day / Absent"""
-        data = load_json(ATTENDANCE_FILE)
-
-        if status not in ["Present", "Half-Day", "Absent"]:
-            await interaction.response.send_message("❌ Invalid status. Use Present, Half-Day, or Absent.", ephemeral=True)
+        """Admin correction: date format YYYY-MM-DD, status = Present / Late / Half-Day / Absent"""
+        if status not in STATUSES:
+            await interaction.response.send_message("❌ Invalid status. Use Present, Late, Half-Day, or Absent.", ephemeral=True)
+            return
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid date. Use YYYY-MM-DD.", ephemeral=True)
             return
 
-        if str(user.id) not in data:
-            data[str(user.id)] = {}
-
-        data[str(user.id)][date] = status
-        save_json(ATTENDANCE_FILE, data)
+        store = await self._store(interaction)
+        async with store.transaction(str(user.id)):
+            store.set(str(user.id), date, value=status)
 
         await interaction.response.send_message(f"✅ Updated {user.display_name}'s attendance on {date} to {status}", ephemeral=True)
 
-    # ----------------- /calendar -----------------
-    async def calendar(self, interaction: discord.Interaction, user: typing.Optional[discord.Member] = None):
-        if user is None:
-            if interaction.guild is not None:
-                user = interaction.guild.get_member(interaction.user.id)
-            else:
-                user = None
-        data = load_json(ATTENDANCE_FILE)
+    @attendance_edit.autocomplete("date")
+    async def attendance_edit_date(self, interaction: discord.Interaction, current: str):
+        # Today, then the chosen user's recorded dates matching what was typed (newest first)
+        store = await self._store(interaction)
+        user_id = str(getattr(interaction.namespace.user, "id", ""))
+        dates = get_user_dates(store).prefix(user_id, current, limit=25)
+        today = datetime.now().strftime("%Y-%m-%d")
+        if today.startswith(current) and today not in dates:
+            dates = [today] + dates[:24]
+        return [
+            app_commands.Choice(name=f"{d} ({store.get(user_id, d) or 'no record'})", value=d)
+            for d in dates
+        ]
+
+    @attendance_edit.autocomplete("status")
+    async def attendance_edit_status(self, interaction: discord.Interaction, current: str):
+        store = await self._store(interaction)
+        recorded = store.get(str(getattr(interaction.namespace.user, "id", "")), interaction.namespace.date or "")
+        return [
+            app_commands.Choice(name=f"{s} (current)" if s == recorded else s, value=s)
+            for s in STATUSES if s.lower().startswith(current.lower())
+        ]
+
+    # ----------------- /attendance export -----------------
+    @app_commands.command(name="attendance_export", description="Export attendance or task records (Admins only)")
+    @app_commands.describe(
+        kind="Which records to export",
+        fmt="csv, or columnar (compact binary, see utils/export.py)",
+        since="First date to include (YYYY-MM-DD)",
+        until="Last date to include (YYYY-MM-DD)",
+        role="Only export members of this role",
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def attendance_export(
+        self,
+        interaction: discord.Interaction,
+        kind: typing.Literal["attendance", "tasks"] = "attendance",
+        fmt: typing.Literal["csv", "columnar"] = "csv",
+        since: typing.Optional[str] = None,
+        until: typing.Optional[str] = None,
+        role: typing.Optional[discord.Role] = None,
+    ):
+        try:
+            for day in (since, until):
+                if day is not None:
+                    date.fromisoformat(day)
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid date. Use YYYY-MM-DD for since and until.", ephemeral=True)
+            return
+        if since and until and since > until:
+            await interaction.response.send_message("❌ `since` must be on or before `until`.", ephemeral=True)
+            return
 
-        if user is None:
-            await interaction.response.send_message("❌ Could not find the user.", ephemeral=True)
+        store = await open_store(ATTENDANCE_FILE if kind == "attendance" else TASKS_FILE, interaction.guild_id)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            user_ids = [str(member.id) for member in await team_members(self.bot, interaction.guild, role)] if role else None
+
+            # Copy the selected entries and encode them in the storage pool.
+            # Rows are streamed into a spooled file, which moves to disk once it grows large.
+            data = await aio.run(snapshot, store, since, until, user_ids, label=f"snapshot {store.path}")
+            fp = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+            count = await aio.run(export, data, kind, fmt, fp, since, until, label=f"export {store.path}")
+            size = fp.tell()
+            limit = interaction.guild.filesize_limit if interaction.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+            if size > limit:
+                fp.close()
+                await interaction.followup.send(
+                    f"❌ The export is {size / 2**20:.1f} MB, over this server's {limit / 2**20:.0f} MB upload limit. "
+                    "Narrow since/until, pick a role, or use the columnar format.",
+                    ephemeral=True,
+                )
+                return
+            fp.seek(0)
+
+            filename = f"{kind}_{since or 'start'}_{until or 'today'}.{'csv' if fmt == 'csv' else 'atcol'}"
+            await interaction.followup.send(
+                content=f"📤 Exported {count} {kind} row(s)" + (f" for {role.name}" if role else ""),
+                file=discord.File(fp, filename=filename),
+                ephemeral=True,
+            )
+        except Exception as e:
+            print(f"❌ Export failed in {interaction.guild}: {e}")
+            await interaction.followup.send(f"❌ Export failed: {e}", ephemeral=True)
+
+    # ----------------- /attendance import -----------------
+    @app_commands.command(name="attendance_import", description="Bulk import attendance from a CSV (Admins only)")
+    @app_commands.describe(file="CSV with columns user_id,date,status")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def attendance_import(self, interaction: discord.Interaction, file: discord.Attachment):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        text = (await file.read()).decode("utf-8-sig")
+        rows, errors = parse_attendance_csv(io.StringIO(text, newline=""))
+        if errors:
+            message = "❌ Nothing imported:\n" + "\n".join(errors)
+            if len(message) <= 2000:
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                # Long values in the rows can push the list past Discord's message limit
+                report = discord.File(io.BytesIO("\n".join(errors).encode()), filename="import_errors.txt")
+                await interaction.followup.send(f"❌ Nothing imported: {len(errors)} invalid row(s), see the attached file.", file=report, ephemeral=True)
             return
 
-        user_data = data.get(str(user.id), {})
+        count = await import_attendance(await self._store(interaction), rows)
+        await interaction.followup.send(f"✅ Imported {count} attendance row(s)", ephemeral=True)
 
-        if not user_data:
+    # ----------------- /calendar -----------------
+    async def calendar(self, interaction: discord.Interaction, user: typing.Optional[discord.Member] = None):
+        # The caller comes with the interaction; the member cache may be empty (MEMBER_CACHE=minimal)
+        user = user or interaction.user
+
+        store = await self._store(interaction)
+        if str(user.id) not in store:
             await interaction.response.send_message(f"❌ No attendance records found for {user.display_name}.", ephemeral=True)
             return
 
@@ -129,39 +230,25 @@ class Attendance(commands.Cog):
         dates = [today - timedelta(days=i) for i in range(30)]
         dates.reverse()
 
-        values = []
-        for d in dates:
-            date_str = d.strftime("%Y-%m-%d")
-            status = user_data.get(date_str, "Absent")
-            if status == "Present":
-                values.append(2)
-            elif status == "Half-Day":
-                values.append(1)
-            else:
-                values.append(0)
-
-        # Plot heatmap (line-based for simplicity)
-        plt.figure(figsize=(10, 2))
-        date_nums = mdates.date2num(dates)
-        plt.plot(date_nums, values, marker="o")
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter("%d-%b"))
-        plt.gca().xaxis.set_major_locator(mdates.DayLocator())
-        plt.yticks([0, 1, 2], ["Absent", "Half-Day", "Present"])
-        plt.title(f"Attendance Heatmap - {user.display_name}")
-        plt.grid(True)
-
-        # Save and send
-        filename = f"data/{user.id}_calendar.png"
-        os.makedirs("data", exist_ok=True)
-        plt.savefig(filename)
-        plt.close()
-
-        file = discord.File(filename, filename="calendar.png")
-        await interaction.response.send_message(
-            content=f"📊 Attendance calendar for {user.display_name}",
-            file=file,
-            ephemeral=True
-        )
+        cache = get_render_cache(store)
+        cache_key = ("strip", str(user.id), today.date(), store.version(str(user.id)))
+        png = cache.get(cache_key)
+
+        if png is None:
+            day_strs = [d.strftime("%Y-%m-%d") for d in dates]
+            statuses = get_matrix(store).statuses(str(user.id), day_strs[0], len(day_strs))
+
+            # Draw the heatmap in the render pool
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            png = await render(render_strip, f"Attendance Heatmap - {user.display_name}", day_strs, statuses)
+            cache.put(cache_key, png)
+
+        file = discord.File(io.BytesIO(png), filename="calendar.png")
+        content = f"📊 Attendance calendar for {user.display_name}"
+        if interaction.response.is_done():
+            await interaction.followup.send(content=content, file=file, ephemeral=True)
+        else:
+            await interaction.response.send_message(content=content, file=file, ephemeral=True)
 
 
 # ----------------- Setup Function -----------------
@@ -0,0 +1,64 @@
+# cogs/botstats.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+from datetime import datetime
+import time
+from utils import metrics
+
+MAX_COMMANDS = 15
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def _bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+# ----------------- Bot Stats Cog -----------------
+class BotStats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="botstats", description="Command latency, event-loop lag and storage I/O (Admins only)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def botstats(self, interaction: discord.Interaction):
+        if not metrics.METRICS_ENABLED:
+            await interaction.response.send_message("❌ Metrics are disabled. Start the bot with METRICS=1.", ephemeral=True)
+            return
+
+        registry = metrics.registry
+        rows = metrics.command_summary()[:MAX_COMMANDS]
+        # p50/p95 are bucket upper bounds; storage/render/discord are means per call
+        table = [f"{'command':<22}{'n':>6}{'p50':>6}{'p95':>6}{'sto':>5}{'rnd':>5}{'api':>5}"]
+        for r in rows:
+            name = r.name if len(r.name) <= 21 else r.name[:20] + "…"
+            table.append(f"{name:<22}{r.count:>6}{_ms(r.p50):>6}{_ms(r.p95):>6}{_ms(r.storage):>5}{_ms(r.render):>5}{_ms(r.discord):>5}")
+        errors = sum(registry.errors.values())
+
+        embed = discord.Embed(
+            title="📈 Bot Stats",
+            description="```\n" + "\n".join(table) + "\n```" if rows else "No interactions recorded yet.",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        lag = registry.loop_lag
+        embed.add_field(name="Loop lag p95 / max", value=f"{_ms(lag.quantile(0.95))} / {_ms(lag.max)} ms")
+        embed.add_field(name="Gateway latency", value=f"{_ms(self.bot.latency)} ms")
+        embed.add_field(name="Handler errors", value=str(errors))
+        storage = registry.storage_calls
+        embed.add_field(name="Storage calls p95", value=f"{_ms(storage.quantile(0.95))} ms ({storage.count})")
+        embed.add_field(name="Storage read / written", value=f"{_bytes(registry.storage_bytes['read'])} / {_bytes(registry.storage_bytes['written'])}")
+        embed.add_field(name="Uptime", value=f"{(time.time() - metrics.STARTED) / 3600:.1f} h")
+        embed.set_footer(text="Times in ms · sto/rnd/api = mean storage, render and Discord API time")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+# ----------------- Setup Function -----------------
+async def setup(bot):
+    await bot.add_cog(BotStats(bot))
@@ -1,25 +1,12 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json, os
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import io
-
-ATTENDANCE_FILE = "data/attendance.json"
-
-# ------------------------
-# Utility functions
-# ------------------------
-def load_attendance():
-    if not os.path.exists(ATTENDANCE_FILE):
-        return {}
-    with open(ATTENDANCE_FILE, "r") as f:
-        return json.load(f)
-
-def save_attendance(data):
-    with open(ATTENDANCE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+from utils.heatmap import render_strip, render_year
+from utils.matrix import get_matrix
+from utils.render import get_render_cache, render
+from utils.storage import ATTENDANCE_FILE, add_store_hook, open_store
 
 # ------------------------
 # Calendar Cog
@@ -27,48 +14,63 @@ def save_attendance(data):
 class Calendar(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        add_store_hook(ATTENDANCE_FILE, get_matrix)
+        add_store_hook(ATTENDANCE_FILE, get_render_cache)
 
     @app_commands.command(name="calendar", description="View your attendance calendar (last 30 days)")
-    async def calendar(self, interaction: discord.Interaction):
+    @app_commands.describe(year="Show the full year as a weekly grid instead")
+    async def calendar(self, interaction: discord.Interaction, year: bool = False):
         user = interaction.user
         user_id = str(user.id)
 
-        attendance = load_attendance()
+        store = await open_store(ATTENDANCE_FILE, interaction.guild_id)
+        user_data = store.get(user_id)
 
         # If no attendance logged
-        if user_id not in attendance:
+        if user_data is None:
             await interaction.response.send_message("❌ No attendance data found.", ephemeral=True)
             return
 
         # Collect last 30 days
         today = datetime.now().date()
         dates = [today - timedelta(days=i) for i in range(29, -1, -1)]  # 30 days back
-        statuses = [attendance[user_id].get(d.strftime("%Y-%m-%d"), 0) for d in dates]
-
-        # ✅ Generate heatmap
-        plt.figure(figsize=(10, 2))
-        plt.imshow([statuses], cmap="Greens", aspect="auto")
-        plt.xticks(range(len(dates)), [d.strftime("%d-%b") for d in dates], rotation=90, fontsize=6)
-        plt.yticks([])
-        plt.colorbar(label="Attendance (1 = Present, 0 = Absent)")
-        plt.title(f"Attendance for {user.display_name} (Last 30 days)")
+        cache = get_render_cache(store)
+        cache_key = ("year" if year else "strip", user_id, today, store.version(user_id))
+        png = cache.get(cache_key)
 
-        # Save plot to buffer
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png", bbox_inches="tight")
-        buf.seek(0)
-        plt.close()
+        if png is None:
+            # ✅ Generate heatmap in the render pool (off the event loop)
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            if year:
+                png = await render(
+                    render_year,
+                    f"Attendance for {user.display_name} (Last year)",
+                    today.isoformat(),
+                    dict(user_data)
+                )
+            else:
+                day_strs = [d.strftime("%Y-%m-%d") for d in dates]
+                png = await render(
+                    render_strip,
+                    f"Attendance for {user.display_name} (Last 30 days)",
+                    day_strs,
+                    get_matrix(store).statuses(user_id, day_strs[0], len(day_strs))
+                )
+            cache.put(cache_key, png)
 
-        file = discord.File(buf, filename="calendar.png")
+        file = discord.File(io.BytesIO(png), filename="calendar.png")
 
         embed = discord.Embed(
             title=f"📅 Attendance Calendar - {user.display_name}",
-            description="Green = Present, White = Absent",
+            description="Green = Present, Amber = Late, Light green = Half-Day, Red = Absent, Grey = No record",
             color=discord.Color.green()
         )
         embed.set_image(url="attachment://calendar.png")
 
-        await interaction.response.send_message(embed=embed, file=file, ephemeral=True)
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, file=file, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, file=file, ephemeral=True)
 
 
 async def setup(bot):
@@ -0,0 +1,121 @@
+# cogs/closeout.py
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+from datetime import datetime, time, timezone
+import typing
+from utils.closeout import (
+    CLOSEOUT_TIME, close_day, closeout_zone, days_to_close, expected_on, is_holiday, load_holidays, load_last_closed, save_last_closed,
+)
+from utils.log_dispatcher import log_to_channel
+from utils.matrix import get_matrix
+from utils.policy import get_policy
+from utils.roles import team_members
+from utils.storage import ATTENDANCE_FILE, add_store_hook, open_store
+
+ZONE = closeout_zone()
+_hour, _minute = map(int, CLOSEOUT_TIME.split(":"))
+RUN_AT = time(_hour, _minute, tzinfo=ZONE)  # a real zone, so the run time follows DST changes
+
+
+# ----------------- Close-out Cog -----------------
+class CloseOut(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.policy = get_policy()
+        add_store_hook(ATTENDANCE_FILE, get_matrix)
+        self.daily.start()
+
+    async def cog_unload(self):
+        self.daily.cancel()
+
+    async def _shifts(self, guild):
+        """Shift of every indexed member, by user ID"""
+        return {
+            str(m.id): self.policy.shift_for(guild.id, m.role_ids[::-1])
+            for m in await team_members(self.bot, guild)
+        }
+
+    async def close(self, guild, days, now=None):
+        """Close each day for one guild: mark missing members Absent and post the rollup.
+
+        A day is only closed once every member expected that day is past the end
+        of their punch-in window, in their shift's timezone. Stops at the first
+        day that is still open, so it is picked up again by the next run.
+        Returns ``(count marked, when the open day can be closed or None)``.
+        """
+        now = now or datetime.now(timezone.utc)
+        store = await open_store(ATTENDANCE_FILE, guild.id)
+        shifts = await self._shifts(guild)
+        total = 0
+        for day in days:
+            expected = expected_on(shifts, day)
+            ends = [shift.ends_at(day) for shift in expected.values()]
+            if ends and max(ends) > now:
+                return total, max(ends)
+
+            day = day.isoformat()
+            marked = await close_day(store, sorted(expected), day) if expected else 0
+            total += marked
+            last = await load_last_closed(guild.id)
+            if last is None or day > last:
+                await save_last_closed(guild.id, day)
+            if not expected:
+                continue  # nobody works that day (e.g. a weekend): nothing to post
+            print(f"📋 Closed out {day} for {guild.name}: {marked} marked Absent")
+
+            summary = get_matrix(store).team(shifts, day, day)
+            log_to_channel(self.bot, guild, f"📋 Close-out {day}: " + ", ".join(f"{s} {n}" for s, n in summary.items()))
+        return total, None
+
+    # ----------------- Daily Job -----------------
+    @tasks.loop(time=RUN_AT)
+    async def daily(self):
+        # Each process only sees the guilds on its own shards
+        today, holidays = datetime.now(ZONE).date(), await load_holidays()
+        for guild in self.bot.guilds:
+            # One guild failing (e.g. a chunk timeout) must not skip the others
+            try:
+                await self.close(guild, list(days_to_close(await load_last_closed(guild.id), today, holidays)))
+            except Exception as e:
+                print(f"❌ Close-out failed for {guild.name}: {e}")
+
+    @daily.before_loop
+    async def before_daily(self):
+        await self.bot.wait_until_ready()
+
+    @daily.error
+    async def daily_error(self, error):
+        print(f"❌ Daily close-out failed: {error}")
+
+    # ----------------- /closeout -----------------
+    @app_commands.command(name="closeout", description="Run the attendance close-out for a day now (Admins only)")
+    @app_commands.describe(date="Day to close (YYYY-MM-DD, default: today)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.guild_only()
+    async def closeout(self, interaction: discord.Interaction, date: typing.Optional[str] = None):
+        try:
+            day = datetime.fromisoformat(date).date() if date else datetime.now(ZONE).date()
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid date. Use YYYY-MM-DD.", ephemeral=True)
+            return
+
+        if is_holiday(day, await load_holidays()):
+            await interaction.response.send_message(f"🎉 {day} is a holiday; there is nothing to close.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        marked, open_until = await self.close(interaction.guild, [day])
+        if open_until is not None:
+            await interaction.followup.send(
+                f"⏳ {day} can't be closed yet: some members' punch-in window runs until "
+                f"{open_until.astimezone(ZONE).strftime('%Y-%m-%d %H:%M %Z')}.",
+                ephemeral=True,
+            )
+            return
+        await interaction.followup.send(f"✅ Closed out {day}: {marked} member(s) marked Absent", ephemeral=True)
+
+
+# ----------------- Setup Function -----------------
+async def setup(bot):
+    await bot.add_cog(CloseOut(bot))
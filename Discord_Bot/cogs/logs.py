@@ -2,75 +2,157 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime
+import itertools
+import typing
+from utils.events import attach_events, iter_events
+from utils.log_dispatcher import get_dispatcher
+from utils.metrics import timed
+from utils.storage import ATTENDANCE_FILE, TASKS_FILE, add_store_hook, open_store
 
-TASKS_FILE = "data/tasks.json"
-ATTENDANCE_FILE = "data/attendance.json"
+PAGE_SIZE = 10
+KIND_ICONS = {"attendance": "📅", "tasks": "📝"}
 
 
-# ----------------- Utility Functions -----------------
-def load_json(path):
-    """Load JSON file safely"""
-    if not os.path.exists(path):
-        return {}
-    with open(path, "r") as f:
-        return json.load(f)
+# ----------------- Pagination -----------------
+class LogsView(discord.ui.View):
+    """Pages through an event stream; pages are only read from the stream when first shown"""
+
+    def __init__(self, owner_id, guild, events):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.guild = guild
+        self.events = events
+        self.pages = []
+        self.page = 0
+        self.exhausted = False
+        self._peek = None
+        self._fetch()
+        self._sync_buttons()
+
+    def _fetch(self):
+        # Read one event past the page so we know whether an older page exists
+        page = [self._peek] if self._peek is not None else []
+        page += itertools.islice(self.events, PAGE_SIZE + 1 - len(page))
+        self._peek = page.pop() if len(page) > PAGE_SIZE else None
+        self.exhausted = self._peek is None
+        self.pages.append(page)
+
+    def _sync_buttons(self):
+        self.newer.disabled = self.page == 0
+        self.older.disabled = self.exhausted and self.page >= len(self.pages) - 1
+
+    def _name(self, user_id):
+        member = self.guild.get_member(int(user_id)) if self.guild else None
+        return member.display_name if member else f"<@{user_id}>"  # a mention renders without the member cache
+
+    def render(self):
+        lines = []
+        for event in self.pages[self.page]:
+            when = event.ts.strftime("%Y-%m-%d %H:%M") if event.ts else event.date
+            lines.append(f"{KIND_ICONS[event.kind]} `{when}` {self._name(event.user_id)}: {event.text}"[:300])
+
+        embed = discord.Embed(
+            title="📜 Bot Logs",
+            description="\n".join(lines) if lines else "No activity logged.",
+            color=discord.Color.gold(),
+            timestamp=datetime.now()
+        )
+        embed.set_footer(text=f"Page {self.page + 1}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.owner_id
+
+    @discord.ui.button(label="Newer", emoji="◀️", style=discord.ButtonStyle.secondary)
+    @timed("ui:LogsView.newer")
+    async def newer(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="Older", emoji="▶️", style=discord.ButtonStyle.secondary)
+    @timed("ui:LogsView.older")
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page == len(self.pages) - 1:
+            self._fetch()
+        self.page += 1
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+
+# ----------------- Store Hooks -----------------
+def attach_tasks_events(store):
+    attach_events(store, "tasks")
+
+
+def attach_attendance_events(store):
+    attach_events(store, "attendance")
 
 
 # ----------------- Logs Cog -----------------
 class Logs(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        add_store_hook(TASKS_FILE, attach_tasks_events)
+        add_store_hook(ATTENDANCE_FILE, attach_attendance_events)
+        self.dispatcher = get_dispatcher(bot)
+
+    async def cog_unload(self):
+        # Send anything still queued before the bot disconnects
+        await self.dispatcher.close()
+
+    # ----------------- Logs channel cache -----------------
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        self.dispatcher.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.dispatcher.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name:
+            self.dispatcher.invalidate(after.guild.id)
 
     # ----------------- /logs -----------------
     @app_commands.command(name="logs", description="View bot logs (Admins only)")
     @app_commands.checks.has_permissions(administrator=True)
-    async def logs(self, interaction: discord.Interaction):
-        tasks_data = load_json(TASKS_FILE)
-        attendance_data = load_json(ATTENDANCE_FILE)
+    @app_commands.describe(
+        user="Only show this user's activity",
+        kind="Only show attendance or task activity",
+        since="Earliest date (YYYY-MM-DD)",
+        until="Latest date (YYYY-MM-DD)"
+    )
+    async def logs(
+        self,
+        interaction: discord.Interaction,
+        user: typing.Optional[discord.Member] = None,
+        kind: typing.Optional[typing.Literal["attendance", "tasks"]] = None,
+        since: typing.Optional[str] = None,
+        until: typing.Optional[str] = None
+    ):
+        try:
+            # Events are filtered by comparing YYYY-MM-DD strings, so compare padded dates
+            since, until = (datetime.strptime(day, "%Y-%m-%d").date().isoformat() if day else None for day in (since, until))
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid date. Use YYYY-MM-DD for since and until.", ephemeral=True)
+            return
+        if since and until and since > until:
+            await interaction.response.send_message("❌ `since` must be on or before `until`.", ephemeral=True)
+            return
 
-        embed = discord.Embed(
-            title="📜 Bot Logs",
-            description="Here are the latest activity logs.",
-            color=discord.Color.gold(),
-            timestamp=datetime.now()
-        )
+        stores = {
+            "attendance": await open_store(ATTENDANCE_FILE, interaction.guild_id),
+            "tasks": await open_store(TASKS_FILE, interaction.guild_id),
+        }
+        if kind is not None:
+            stores = {kind: stores[kind]}
 
-        # Add task logs
-        if tasks_data:
-            recent_tasks = []
-            for user_id, task_list in tasks_data.items():
-                user = interaction.guild.get_member(int(user_id)) if interaction.guild else None
-                username = user.display_name if user else f"User({user_id})"
-                for task in task_list:
-                    recent_tasks.append(f"📝 {username}: {task['task']} ({task['duration']}) on {task['date']}")
-            embed.add_field(
-                name="📝 Tasks",
-                value="\n".join(recent_tasks[-5:]) if recent_tasks else "No tasks logged.",
-                inline=False
-            )
-        else:
-            embed.add_field(name="📝 Tasks", value="No tasks logged.", inline=False)
-
-        # Add attendance logs
-        if attendance_data:
-            recent_attendance = []
-            for user_id, dates in attendance_data.items():
-                user = interaction.guild.get_member(int(user_id)) if interaction.guild else None
-                username = user.display_name if user else f"User({user_id})"
-                for date, status in dates.items():
-                    recent_attendance.append(f"📅 {username}: {status} on {date}")
-            embed.add_field(
-                name="📅 Attendance",
-                value="\n".join(recent_attendance[-5:]) if recent_attendance else "No attendance logged.",
-                inline=False
-            )
-        else:
-            embed.add_field(name="📅 Attendance", value="No attendance logged.", inline=False)
-
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        events = iter_events(stores, str(user.id) if user else None, since, until)
+        view = LogsView(interaction.user.id, interaction.guild, events)
+        await interaction.response.send_message(embed=view.render(), view=view, ephemeral=True)
 
 
 # ----------------- Setup Function -----------------
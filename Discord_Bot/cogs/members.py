@@ -0,0 +1,47 @@
+# cogs/members.py
+import discord
+from discord.ext import commands
+from utils.roles import open_role_index
+
+
+# ----------------- Role Index Maintenance -----------------
+class Members(commands.Cog):
+    """Keeps the persisted role -> members index (utils/roles.py) up to date"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        # Load the saved index off the event loop before member events need it
+        await open_role_index(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        (await open_role_index(member.guild.id)).observe(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Only dispatched for cached members: with MEMBER_CACHE=minimal, role
+        # changes reach the index through interactions and the periodic re-chunk
+        (await open_role_index(after.guild.id)).observe(after)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        # Raw: also fires for members that are not in the member cache
+        (await open_role_index(payload.guild_id)).remove(payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        (await open_role_index(role.guild.id)).remove_role(role.id)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # Every interaction carries the caller's current roles, even without a member cache
+        if isinstance(interaction.user, discord.Member):
+            (await open_role_index(interaction.user.guild.id)).observe(interaction.user)
+
+
+# ----------------- Setup Function -----------------
+async def setup(bot):
+    await bot.add_cog(Members(bot))
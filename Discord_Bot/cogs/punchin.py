@@ -2,72 +2,53 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, time
-import json
-import os
+from utils.log_dispatcher import log_to_channel
+from utils.policy import get_policy
+from utils.storage import ATTENDANCE_FILE, open_store
 
-# Path to attendance storage
-ATTENDANCE_FILE = "data/attendance.json"
-
-# ----------------- Utility Functions -----------------
-def load_attendance():
-    """Load attendance from JSON"""
-    if not os.path.exists(ATTENDANCE_FILE):
-        return {}
-    with open(ATTENDANCE_FILE, "r") as f:
-        return json.load(f)
-
-
-def save_attendance(data):
-    """Save attendance to JSON"""
-    with open(ATTENDANCE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-
-def is_within_timeframe():
-    """Check if current time is within 9:30 - 10:30"""
-    now = datetime.now().time()
-    start = time(9, 30)
-    end = time(10, 30)
-    return start <= now <= end
+STATUS_ICONS = {"Present": "🟢", "Late": "🟡", "Half-Day": "🟠"}
 
 
 # ----------------- Punch-in Cog -----------------
 class PunchIn(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.policy = get_policy()
 
     # ----------------- /punch-in -----------------
-    @app_commands.command(name="punch_in", description="Manually punch in (only between 9:30–10:30)")
+    @app_commands.command(name="punch_in", description="Punch in for today (within your shift's punch-in window)")
     async def punch_in(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        today = str(datetime.now().date())
-        data = load_attendance()
 
-        if not is_within_timeframe():
+        # Shift from data/policy.json: the member's highest configured role, else the guild default
+        shift = self.policy.shift_for_member(interaction.user)
+        status, now = shift.classify()
+        today = now.date().isoformat()
+
+        if status is None:
             await interaction.response.send_message(
-                "❌ Punch-in is only allowed between **09:30–10:30 AM**.",
+                f"❌ Punch-in is only allowed between **{shift.window()}** on punch-in days.",
                 ephemeral=True
             )
             return
 
-        # Check if already punched in
-        if user_id in data and today in data[user_id]:
+        store = await open_store(ATTENDANCE_FILE, interaction.guild_id)
+        async with store.transaction(user_id):
+            # Check if already punched in; a close-out Absent is replaced by the real punch-in
+            already = store.get(user_id, today) not in (None, "Absent")
+            if not already:
+                # Record punch-in
+                store.set(user_id, today, value=status)
+
+        if already:
             await interaction.response.send_message("✅ You have already punched in today.", ephemeral=True)
             return
 
-        # Record punch-in
-        data.setdefault(user_id, {})[today] = "Present"
-        save_attendance(data)
+        await interaction.response.send_message(f"✅ Punch-in recorded successfully! ({status})", ephemeral=True)
 
-        # Log punch-in to logs channel
-        logs_channel = None
+        # Log punch-in to logs channel (batched and sent in the background)
         if interaction.guild is not None:
-            logs_channel = discord.utils.get(interaction.guild.text_channels, name="fapps-bot-logs")
-        if logs_channel:
-            await logs_channel.send(f"🟢 {interaction.user.mention} punched in at {datetime.now().strftime('%H:%M:%S')}")
-
-        await interaction.response.send_message("✅ Punch-in recorded successfully!", ephemeral=True)
+            log_to_channel(self.bot, interaction.guild, f"{STATUS_ICONS[status]} {interaction.user.mention} punched in at {now.strftime('%H:%M:%S')} ({status})")
 
 
 # ----------------- Setup Function -----------------
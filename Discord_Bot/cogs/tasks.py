@@ -2,138 +2,243 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json, os
 from datetime import datetime
-from cogs.logs import log_to_channel
-
-TASKS_FILE = "data/tasks.json"
+import re
+import typing
+import zlib
+from utils.log_dispatcher import log_to_channel
+from utils.metrics import timed
+from utils.roles import needs_chunk, team_members
+from utils.search import get_task_search, get_user_dates
+from utils.storage import TASKS_FILE, add_store_hook, open_store
+from utils.timesheet import format_minutes, parse_duration, task_time
+
+PAGE_SIZE = 10  # tasks per page (a select menu holds at most 25)
+MAX_SEARCH_RESULTS = 15
+
+# Every component of the task manager: task:<action>:<owner id>:<YYYY-MM-DD>:<page or task id>
+CUSTOM_ID = re.compile(r"task:(?P<action>[a-z]+):(?P<owner>\d+):(?P<date>\d{4}-\d{2}-\d{2}):(?P<arg>\d+(?:\.[0-9a-f]{8})?)")
 
 # ------------------------
 # Utility functions
 # ------------------------
-def load_tasks():
-    if not os.path.exists(TASKS_FILE):
-        return {}
-    with open(TASKS_FILE, "r") as f:
-        return json.load(f)
+def task_key(task):
+    """Short hash of a task's content"""
+    content = f"{task['task']}\0{task_time(task)}"
+    return f"{zlib.crc32(content.encode()):08x}"
+
+
+def task_id(index, task):
+    """Reference to a task for custom IDs: its index plus a hash of its content"""
+    return f"{index}.{task_key(task)}"
+
+
+def locate_task(store, user_id, date, ref):
+    """Optimistic check: return the current index of the task ``ref`` points at, or None if it was changed or deleted.
+
+    If other edits moved the task (e.g. an earlier one was deleted) it is found again by content.
+    """
+    index, key = ref.split(".")
+    index = int(index)
+    day_tasks = store.get(user_id, date) or []
+    if index < len(day_tasks) and task_key(day_tasks[index]) == key:
+        return index
+    for i, task in enumerate(day_tasks):
+        if task_key(task) == key:
+            return i
+    return None
+
+
+def task_label(index, task):
+    return f"{index + 1}. {task['task']} ({task_time(task)})"
+
+
+def _custom_id(action, owner_id, date, arg):
+    return f"task:{action}:{owner_id}:{date}:{arg}"
+
+
+def _button(action, owner_id, date, arg, **kwargs):
+    return TaskComponent(discord.ui.Button(custom_id=_custom_id(action, owner_id, date, arg), **kwargs))
+
+
+def _stateless(view):
+    # Finished views are not stored by discord.py; TaskComponent answers from the custom ID alone
+    view.stop()
+    return view
+
+
+def task_list(store, user, date, page):
+    """Embed and components for one page of a user's tasks on ``date``"""
+    user_id = str(user.id)
+    tasks = store.get(user_id, date) or []
+    pages = max(1, -(-len(tasks) // PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+    first = page * PAGE_SIZE
+    shown = tasks[first:first + PAGE_SIZE]
+
+    embed = discord.Embed(title=f"{user.display_name}'s Tasks ({date})", color=discord.Color.blue())
+    for i, t in enumerate(shown, start=first + 1):
+        embed.add_field(name=f"Task {i}", value=f"{t['task']} ({task_time(t)})", inline=False)
+    if not tasks:
+        embed.description = "No tasks on this day."
+    embed.set_footer(text=f"Page {page + 1}/{pages} · {len(tasks)} task(s)")
+
+    view = discord.ui.View(timeout=None)
+    if shown:
+        options = [discord.SelectOption(label=task_label(i, t)[:100], value=task_id(i, t)) for i, t in enumerate(shown, start=first)]
+        view.add_item(TaskComponent(discord.ui.Select(custom_id=_custom_id("pick", user.id, date, page), placeholder="Select a task...", options=options)))
+
+    older, newer = get_user_dates(store).around(user_id, date)
+    today = datetime.now().strftime("%Y-%m-%d")
+    view.add_item(_button("older", user.id, older or date, 0, emoji="⏪", label="Older day", disabled=older is None, row=1))
+    view.add_item(_button("prev", user.id, date, max(page - 1, 0), emoji="◀️", disabled=page == 0, row=1))
+    view.add_item(_button("next", user.id, date, page + 1, emoji="▶️", disabled=page >= pages - 1, row=1))
+    view.add_item(_button("newer", user.id, newer or date, 0, emoji="⏩", label="Newer day", disabled=newer is None, row=1))
+    view.add_item(_button("today", user.id, today, 0, label="Today", disabled=date == today, row=1))
+    return embed, _stateless(view)
 
-def save_tasks(tasks):
-    with open(TASKS_FILE, "w") as f:
-        json.dump(tasks, f, indent=4)
+
+def task_detail(user, date, index, task):
+    embed = discord.Embed(title=f"Task {index + 1} ({date})", description=task["task"], color=discord.Color.blue())
+    embed.add_field(name="Time", value=task_time(task))
+    ref = task_id(index, task)
+    view = discord.ui.View(timeout=None)
+    view.add_item(_button("edit", user.id, date, ref, label="Edit", style=discord.ButtonStyle.primary, emoji="✏️"))
+    view.add_item(_button("delete", user.id, date, ref, label="Delete", style=discord.ButtonStyle.danger, emoji="🗑️"))
+    view.add_item(_button("back", user.id, date, index // PAGE_SIZE, label="Back", emoji="↩️"))
+    return embed, _stateless(view)
 
 # ------------------------
 # Edit Modal
 # ------------------------
 class EditTaskModal(discord.ui.Modal, title="Edit Task"):
-    def __init__(self, bot, user, date, task_index, old_task, old_time):
-        super().__init__()
-        self.bot = bot
-        self.user = user
-        self.date = date
-        self.task_index = task_index
+    """Sent already stopped, so nothing is kept in memory while it is open.
+
+    The submission is handled by :meth:`Task.on_interaction` from the custom ID
+    (``task:save:...``) and the submitted values.
+    """
 
-        self.task_input = discord.ui.TextInput(
+    def __init__(self, owner_id, date, ref, task):
+        super().__init__(custom_id=_custom_id("save", owner_id, date, ref))
+        self.add_item(discord.ui.TextInput(
+            custom_id="task",
             label="Task",
-            default=old_task,
+            default=task["task"],
             required=True,
             style=discord.TextStyle.long
-        )
-        self.time_input = discord.ui.TextInput(
+        ))
+        self.add_item(discord.ui.TextInput(
+            custom_id="time",
             label="Time Duration",
-            default=old_time,
+            default=task_time(task),
+            placeholder="e.g. 45m, 1h 30m, 1.5h or 1:30",
             required=True,
             style=discord.TextStyle.short
-        )
-
-        self.add_item(self.task_input)
-        self.add_item(self.time_input)
-
-    async def on_submit(self, interaction: discord.Interaction):
-        try:
-            tasks = load_tasks()
-            user_id = str(self.user.id)
-
-            if user_id in tasks and self.date in tasks[user_id]:
-                old_task = tasks[user_id][self.date][self.task_index]["task"]
-                old_time = tasks[user_id][self.date][self.task_index]["time"]
+        ))
+        self.stop()
 
-                # ✅ Update JSON
-                tasks[user_id][self.date][self.task_index]["task"] = str(self.task_input.value)
-                tasks[user_id][self.date][self.task_index]["time"] = str(self.time_input.value)
-                save_tasks(tasks)
 
-                await interaction.response.send_message(
-                    f"✅ Task updated:\n- Before: **{old_task}** ({old_time})\n- After: **{self.task_input.value}** ({self.time_input.value})",
-                    ephemeral=True
-                )
-
-                if interaction.guild is not None:
-                    await log_to_channel(
-                        self.bot,
-                        interaction.guild,
-                        f"✏️ {interaction.user.display_name} edited a task:\n"
-                        f"- Before: **{old_task}** ({old_time})\n"
-                        f"- After: **{self.task_input.value}** ({self.time_input.value})"
-                    )
-            else:
-                await interaction.response.send_message("❌ Failed to update task.", ephemeral=True)
-
-        except Exception as e:
-            if not interaction.response.is_done():
-                await interaction.response.send_message(f"⚠️ Error: {e}", ephemeral=True)
-            else:
-                await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
+def submitted_values(components):
+    """``{custom_id: value}`` of a modal submission's text inputs"""
+    values = {}
+    for component in components:
+        if "value" in component:
+            values[component["custom_id"]] = component["value"]
+        values.update(submitted_values(component.get("components", [])))
+        if "component" in component:
+            values.update(submitted_values([component["component"]]))
+    return values
 
 # ------------------------
-# Buttons + Dropdown
+# Persistent components
 # ------------------------
-class EditButton(discord.ui.Button):
-    def __init__(self, bot, user, date, task_index, task):
-        super().__init__(label="Edit", style=discord.ButtonStyle.primary, emoji="✏️")
-        self.bot, self.user, self.date, self.task_index, self.task = bot, user, date, task_index, task
+class TaskComponent(discord.ui.DynamicItem[discord.ui.Item], template=CUSTOM_ID):
+    """Every button and the select menu of the task manager.
 
-    async def callback(self, interaction: discord.Interaction):
-        modal = EditTaskModal(self.bot, self.user, self.date, self.task_index, self.task["task"], self.task["time"])
-        await interaction.response.send_modal(modal)
+    All state (owner, date, page or task) lives in the custom ID, so one
+    registered handler answers clicks on any task message, also after a
+    restart, and no view is kept per open menu.
+    """
 
-class DeleteButton(discord.ui.Button):
-    def __init__(self, bot, user, date, task_index):
-        super().__init__(label="Delete", style=discord.ButtonStyle.danger, emoji="🗑️")
-        self.bot = bot
-        self.user = user
-        self.date = date
-        self.task_index = task_index
+    def __init__(self, item, action=None, owner_id=None, date=None, arg=None):
+        super().__init__(item)
+        self.action, self.owner_id, self.date, self.arg = action, owner_id, date, arg
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(item, match["action"], int(match["owner"]), match["date"], match["arg"])
 
     async def callback(self, interaction: discord.Interaction):
-        try:
-            tasks = load_tasks()
-            user_id = str(self.user.id)
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("❌ This task menu belongs to someone else. Use /task to open yours.", ephemeral=True)
+            return
+        store = await open_store(TASKS_FILE, interaction.guild_id)
+        if self.action == "pick":
+            await self.pick(interaction, store)
+        elif self.action == "edit":
+            await self.edit(interaction, store)
+        elif self.action == "delete":
+            await self.delete(interaction, store)
+        else:
+            await self.show(interaction, store)
+
+    @timed("ui:task.page")
+    async def show(self, interaction, store):
+        date = datetime.now().strftime("%Y-%m-%d") if self.action == "today" else self.date
+        embed, view = task_list(store, interaction.user, date, int(self.arg))
+        await interaction.response.edit_message(content=None, embed=embed, view=view)
+
+    @timed("ui:task.pick")
+    async def pick(self, interaction, store):
+        user_id, ref = str(interaction.user.id), self.item.values[0]
+        task_index = locate_task(store, user_id, self.date, ref)
+        if task_index is None:
+            embed, view = task_list(store, interaction.user, self.date, int(self.arg))
+            await interaction.response.edit_message(content="❌ This task was changed or deleted by someone else.", embed=embed, view=view)
+            return
+        embed, view = task_detail(interaction.user, self.date, task_index, store.get(user_id, self.date, task_index))
+        await interaction.response.edit_message(content=None, embed=embed, view=view)
+
+    @timed("ui:task.edit")
+    async def edit(self, interaction, store):
+        user_id = str(interaction.user.id)
+        task_index = locate_task(store, user_id, self.date, self.arg)
+        if task_index is None:
+            embed, view = task_list(store, interaction.user, self.date, 0)
+            await interaction.response.edit_message(content="❌ This task was changed or deleted by someone else.", embed=embed, view=view)
+            return
+        current = store.get(user_id, self.date, task_index)
+        await interaction.response.send_modal(EditTaskModal(interaction.user.id, self.date, task_id(task_index, current), current))
 
-            if user_id in tasks and self.date in tasks[user_id]:
-                deleted_task = tasks[user_id][self.date].pop(self.task_index)
+    @timed("ui:task.delete")
+    async def delete(self, interaction, store):
+        try:
+            user_id = str(interaction.user.id)
 
-                if not tasks[user_id][self.date]:  # remove empty date
-                    del tasks[user_id][self.date]
-                if not tasks[user_id]:  # remove empty user
-                    del tasks[user_id]
+            async with store.transaction(user_id):
+                task_index = locate_task(store, user_id, self.date, self.arg)
+                if task_index is not None:
+                    # Empty date/user entries are pruned by the store
+                    deleted_task = store.delete(user_id, self.date, task_index)
 
-                save_tasks(tasks)
+            if task_index is None:
+                embed, view = task_list(store, interaction.user, self.date, 0)
+                await interaction.response.edit_message(content="❌ This task was changed or already deleted.", embed=embed, view=view)
+                return
 
-                await interaction.response.send_message(
-                    f"🗑️ Deleted task: **{deleted_task['task']}** ({deleted_task['time']})",
-                    ephemeral=True
+            embed, view = task_list(store, interaction.user, self.date, task_index // PAGE_SIZE)
+            await interaction.response.edit_message(
+                content=f"🗑️ Deleted task: **{deleted_task['task']}** ({task_time(deleted_task)})", embed=embed, view=view
+            )
+
+            if interaction.guild is not None:
+                log_to_channel(
+                    interaction.client,
+                    interaction.guild,
+                    f"🗑️ {interaction.user.display_name} deleted a task: "
+                    f"**{deleted_task['task']}** ({task_time(deleted_task)})"
                 )
 
-                if interaction.guild is not None:
-                    await log_to_channel(
-                        self.bot,
-                        interaction.guild,
-                        f"🗑️ {interaction.user.display_name} deleted a task: "
-                        f"**{deleted_task['task']}** ({deleted_task['time']})"
-                    )
-            else:
-                await interaction.response.send_message("❌ Failed to delete task.", ephemeral=True)
-
         except Exception as e:
             if not interaction.response.is_done():
                 await interaction.response.send_message(f"⚠️ Error: {e}", ephemeral=True)
@@ -141,80 +246,184 @@ class DeleteButton(discord.ui.Button):
                 await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
 
 
-
-class TaskDropdown(discord.ui.Select):
-    def __init__(self, bot, user, date, tasks):
-        self.bot, self.user, self.date, self.tasks = bot, user, date, tasks
-        options = [discord.SelectOption(label=f"{i+1}. {t['task']} ({t['time']})", value=str(i))
-                   for i, t in enumerate(tasks)]
-        super().__init__(placeholder="Select a task...", options=options)
-
-    async def callback(self, interaction: discord.Interaction):
-        task_index = int(self.values[0])
-        task = self.tasks[task_index]
-        view = discord.ui.View()
-        view.add_item(EditButton(self.bot, self.user, self.date, task_index, task))
-        view.add_item(DeleteButton(self.bot, self.user, self.date, task_index))
+@timed("ui:task.save")
+async def save_task(bot, interaction, date, ref):
+    """Apply an EditTaskModal submission"""
+    values = submitted_values(interaction.data.get("components", []))
+    new_task, minutes = values.get("task", ""), parse_duration(values.get("time", ""))
+    if minutes is None:
         await interaction.response.send_message(
-            f"✏️ Selected: **{task['task']}** ({task['time']})", view=view, ephemeral=True
+            f"❌ Couldn't read the duration **{values.get('time', '')}**. Use e.g. 45m, 1h 30m, 1.5h or 1:30.",
+            ephemeral=True
         )
+        return
+    new_time = format_minutes(minutes)
+
+    try:
+        store = await open_store(TASKS_FILE, interaction.guild_id)
+        user_id = str(interaction.user.id)
+
+        async with store.transaction(user_id):
+            task_index = locate_task(store, user_id, date, ref)
+            if task_index is not None:
+                current = store.get(user_id, date, task_index)
+                old_task, old_time = current["task"], task_time(current)
+
+                # ✅ Update store (durations are kept normalized, in minutes)
+                updated = dict(current, task=new_task, time=new_time, minutes=minutes)
+                updated.pop("duration", None)
+                store.set(user_id, date, task_index, value=updated)
+
+        if task_index is None:
+            await interaction.response.send_message("❌ This task was changed or deleted by someone else. Reopen /task and try again.", ephemeral=True)
+            return
+
+        content = f"✅ Task updated:\n- Before: **{old_task}** ({old_time})\n- After: **{new_task}** ({new_time})"
+        if interaction.message is not None:
+            embed, view = task_list(store, interaction.user, date, task_index // PAGE_SIZE)
+            await interaction.response.edit_message(content=content, embed=embed, view=view)
+        else:
+            await interaction.response.send_message(content, ephemeral=True)
+
+        if interaction.guild is not None:
+            log_to_channel(
+                bot,
+                interaction.guild,
+                f"✏️ {interaction.user.display_name} edited a task:\n"
+                f"- Before: **{old_task}** ({old_time})\n"
+                f"- After: **{new_task}** ({new_time})"
+            )
+
+    except Exception as e:
+        if not interaction.response.is_done():
+            await interaction.response.send_message(f"⚠️ Error: {e}", ephemeral=True)
+        else:
+            await interaction.followup.send(f"⚠️ Error: {e}", ephemeral=True)
 
 # ------------------------
 # Cog
 # ------------------------
 class Task(commands.Cog):
-    def __init__(self, bot): self.bot = bot
+    def __init__(self, bot):
+        self.bot = bot
+        add_store_hook(TASKS_FILE, get_user_dates)
+        add_store_hook(TASKS_FILE, get_task_search)
+
+    async def cog_load(self):
+        # One handler for every task message ever sent (see TaskComponent)
+        self.bot.add_dynamic_items(TaskComponent)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(TaskComponent)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # EditTaskModal is sent stopped, so discord.py leaves its submissions to us
+        if interaction.type is not discord.InteractionType.modal_submit:
+            return
+        match = CUSTOM_ID.fullmatch(interaction.data.get("custom_id", ""))
+        if match is None or match["action"] != "save":
+            return
+        if interaction.user.id != int(match["owner"]):
+            await interaction.response.send_message("❌ This task belongs to someone else.", ephemeral=True)
+            return
+        await save_task(self.bot, interaction, match["date"], match["arg"])
 
     @app_commands.command(name="task", description="View & manage your tasks")
-    async def task(self, interaction: discord.Interaction):
+    @app_commands.describe(date="Day to show (YYYY-MM-DD, default: today)")
+    async def task(self, interaction: discord.Interaction, date: typing.Optional[str] = None):
         user, user_id = interaction.user, str(interaction.user.id)
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        tasks = load_tasks()
-        if user_id not in tasks or today not in tasks[user_id]:
-            await interaction.response.send_message("❌ No tasks for today.", ephemeral=True)
+        try:
+            day = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d") if date else datetime.now().strftime("%Y-%m-%d")
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid date. Use YYYY-MM-DD.", ephemeral=True)
             return
 
-        task_list = tasks[user_id][today]
-        embed = discord.Embed(title=f"{user.display_name}'s Tasks ({today})", color=discord.Color.blue())
-        for i, t in enumerate(task_list, start=1):
-            embed.add_field(name=f"Task {i}", value=f"{t['task']} ({t['time']})", inline=False)
+        store = await open_store(TASKS_FILE, interaction.guild_id)
+        if store.get(user_id) is None:
+            await interaction.response.send_message("❌ You have no tasks yet.", ephemeral=True)
+            return
 
-        view = discord.ui.View()
-        view.add_item(TaskDropdown(self.bot, user, today, task_list))
+        embed, view = task_list(store, user, day, 0)
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
     @app_commands.command(name="task_view", description="View tasks of a user or role")
-    @app_commands.describe(user="User to check", role="Role/team to check")
-    async def task_view(self, interaction: discord.Interaction, user: discord.User = None, role: discord.Role = None): # type: ignore
+    @app_commands.describe(user="User to check", role="Role/team to check", query="Search task text across all days")
+    async def task_view(self, interaction: discord.Interaction, user: discord.User = None, role: discord.Role = None, query: typing.Optional[str] = None): # type: ignore
         today = datetime.now().strftime("%Y-%m-%d")
-        tasks = load_tasks()
+        store = await open_store(TASKS_FILE, interaction.guild_id)
 
-        if user:  # single user
-            user_id = str(user.id)
-            if user_id not in tasks or today not in tasks[user_id]:
+        if query:
+            await self._search(interaction, store, query, user, role)
+
+        elif user:  # single user
+            user_tasks = store.get(str(user.id), today)
+            if user_tasks is None:
                 await interaction.response.send_message(f"❌ No tasks for {user.display_name}.", ephemeral=True)
                 return
             embed = discord.Embed(title=f"Tasks for {user.display_name} ({today})", color=discord.Color.green())
-            for i, t in enumerate(tasks[user_id][today], start=1):
-                embed.add_field(name=f"Task {i}", value=f"{t['task']} ({t['time']})", inline=False)
+            for i, t in enumerate(user_tasks, start=1):
+                embed.add_field(name=f"Task {i}", value=f"{t['task']} ({task_time(t)})", inline=False)
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         elif role:  # whole role/team
+            if await needs_chunk(self.bot, interaction.guild):
+                await interaction.response.defer(ephemeral=True, thinking=True)
             embed = discord.Embed(title=f"Tasks for {role.name} ({today})", color=discord.Color.purple())
             found = False
-            for member in role.members:
-                uid = str(member.id)
-                if uid in tasks and today in tasks[uid]:
+            for member in await team_members(self.bot, interaction.guild, role):
+                member_tasks = store.get(str(member.id), today)
+                if member_tasks is not None:
                     found = True
-                    task_text = "\n".join([f"- {t['task']} ({t['time']})" for t in tasks[uid][today]])
-                    embed.add_field(name=member.display_name, value=task_text, inline=False)
+                    task_text = "\n".join([f"- {t['task']} ({task_time(t)})" for t in member_tasks])
+                    embed.add_field(name=member.name, value=task_text, inline=False)
+            if interaction.response.is_done():
+                send = interaction.followup.send
+            else:
+                send = interaction.response.send_message
             if not found:
-                await interaction.response.send_message(f"❌ No tasks found for role {role.name}.", ephemeral=True)
+                await send(f"❌ No tasks found for role {role.name}.", ephemeral=True)
                 return
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await send(embed=embed, ephemeral=True)
 
         else:
-            await interaction.response.send_message("❌ Please provide either a user or a role.", ephemeral=True)
+            await interaction.response.send_message("❌ Please provide a user, a role or a search query.", ephemeral=True)
+
+    @task_view.autocomplete("query")
+    async def task_view_query(self, interaction: discord.Interaction, current: str):
+        # Task texts containing the typed words (the last one as a prefix), from the in-memory index
+        store = await open_store(TASKS_FILE, interaction.guild_id)
+        user = interaction.namespace.user
+        user_ids = {str(user.id)} if user is not None else None
+        texts = get_task_search(store).texts(current, user_ids, limit=25)
+        return [app_commands.Choice(name=text[:100], value=text[:100]) for text in texts]
+
+    async def _search(self, interaction, store, query, user, role):
+        user_ids = None
+        if user:
+            user_ids = {str(user.id)}
+        elif role:
+            if await needs_chunk(self.bot, interaction.guild):
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            user_ids = {str(member.id) for member in await team_members(self.bot, interaction.guild, role)}
+        results = get_task_search(store).find(store, query, user_ids)
+
+        lines = []
+        for user_id, date, task in results[:MAX_SEARCH_RESULTS]:
+            member = interaction.guild.get_member(int(user_id)) if interaction.guild else None
+            name = member.display_name if member else f"<@{user_id}>"  # a mention renders without the member cache
+            lines.append(f"`{date}` **{name}**: {task['task']} ({task_time(task)})"[:250])
+        if len(results) > MAX_SEARCH_RESULTS:
+            lines.append(f"… and {len(results) - MAX_SEARCH_RESULTS} more")
+
+        embed = discord.Embed(
+            title=f"🔎 Tasks matching “{query[:100]}”" + (f" ({user.display_name if user else role.name})" if user or role else ""),
+            description="\n".join(lines) or "No matching tasks.",
+            color=discord.Color.green(),
+        )
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
 
 async def setup(bot): await bot.add_cog(Task(bot))
@@ -0,0 +1,138 @@
+# cogs/timesheet.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+from datetime import date, datetime, timedelta
+import typing
+from utils.matrix import month_range
+from utils.roles import needs_chunk, team_members
+from utils.storage import TASKS_FILE, add_store_hook, open_store
+from utils.timesheet import format_minutes, get_timesheet, week_range
+
+PERIODS = [
+    app_commands.Choice(name="Week", value="week"),
+    app_commands.Choice(name="Month", value="month"),
+]
+
+MAX_TEAM_LINES = 40  # keeps the embed under Discord's description limit
+
+
+def period_range(period, when=None):
+    """First and last day of the week or month containing ``when`` (YYYY-MM-DD, or YYYY-MM for a month)"""
+    if period == "month":
+        month = (when or datetime.now().strftime("%Y-%m"))[:7]
+        first, last = month_range(month)
+        return date.fromisoformat(first), date.fromisoformat(last)
+    return week_range(date.fromisoformat(when) if when else datetime.now().date())
+
+
+def period_title(period, first):
+    if period == "month":
+        return first.strftime("%B %Y")
+    return f"week {first.isocalendar()[1]} ({first.isoformat()})"
+
+
+# ----------------- Timesheet Cog -----------------
+class Timesheet(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        add_store_hook(TASKS_FILE, get_timesheet)
+
+    async def _timesheet(self, interaction):
+        return get_timesheet(await open_store(TASKS_FILE, interaction.guild_id))
+
+    async def _range(self, interaction, period, when):
+        try:
+            return period_range(period, when)
+        except ValueError:
+            await interaction.response.send_message("❌ Invalid date. Use YYYY-MM-DD (or YYYY-MM for a month).", ephemeral=True)
+            return None
+
+    # ----------------- /timesheet -----------------
+    @app_commands.command(name="timesheet", description="Logged task time for a user by week or month")
+    @app_commands.describe(
+        user="User to check (default: you)",
+        period="Week or month (default: week)",
+        when="A day in the week (YYYY-MM-DD) or the month (YYYY-MM); default: now",
+    )
+    @app_commands.choices(period=PERIODS)
+    async def timesheet(self, interaction: discord.Interaction, user: typing.Optional[discord.User] = None, period: typing.Optional[app_commands.Choice[str]] = None, when: typing.Optional[str] = None):
+        user = user or interaction.user
+        period = period.value if period else "week"
+        bounds = await self._range(interaction, period, when)
+        if bounds is None:
+            return
+        first, last = bounds
+        sheet, user_id = await self._timesheet(interaction), str(user.id)
+
+        lines = []
+        if period == "week":
+            for offset in range(7):
+                day = first + timedelta(days=offset)
+                minutes = sheet.day(user_id, day)
+                lines.append(f"`{day:%a %d %b}` {format_minutes(minutes) if minutes else '-'}")
+        else:
+            # One line per ISO week, clipped to the month
+            start = first
+            while start <= last:
+                end = min(week_range(start)[1], last)
+                minutes = sheet.total(user_id, start, end)
+                lines.append(f"`W{start.isocalendar()[1]:02d} {start:%d}–{end:%d %b}` {format_minutes(minutes) if minutes else '-'}")
+                start = end + timedelta(days=1)
+
+        total = sheet.total(user_id, first, last)
+        embed = discord.Embed(
+            title=f"🕒 {user.display_name} — {period_title(period, first)}",
+            description="\n".join(lines),
+            color=discord.Color.blue(),
+        )
+        embed.add_field(name="Total", value=format_minutes(total))
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ----------------- /timesheet_team -----------------
+    @app_commands.command(name="timesheet_team", description="Logged task time per member of a role by week or month")
+    @app_commands.describe(
+        role="Team to check",
+        period="Week or month (default: week)",
+        when="A day in the week (YYYY-MM-DD) or the month (YYYY-MM); default: now",
+    )
+    @app_commands.choices(period=PERIODS)
+    @app_commands.guild_only()
+    async def timesheet_team(self, interaction: discord.Interaction, role: discord.Role, period: typing.Optional[app_commands.Choice[str]] = None, when: typing.Optional[str] = None):
+        period = period.value if period else "week"
+        bounds = await self._range(interaction, period, when)
+        if bounds is None:
+            return
+        first, last = bounds
+
+        if await needs_chunk(self.bot, interaction.guild):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+        members = await team_members(self.bot, interaction.guild, role)
+        totals = (await self._timesheet(interaction)).team([str(m.id) for m in members], first, last)
+        names = {str(m.id): m.name for m in members}
+
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        lines = [f"**{names[user_id]}**: {format_minutes(minutes)}" for user_id, minutes in ranked[:MAX_TEAM_LINES]]
+        if len(ranked) > MAX_TEAM_LINES:
+            lines.append(f"… and {len(ranked) - MAX_TEAM_LINES} more")
+
+        embed = discord.Embed(
+            title=f"🕒 {role.name} — {period_title(period, first)}",
+            description="\n".join(lines) or "No time logged.",
+            color=discord.Color.purple(),
+        )
+        team_total = sum(totals.values())
+        embed.add_field(name="Total", value=format_minutes(team_total))
+        embed.add_field(name="Members logging", value=f"{len(totals)}/{len(members)}")
+        if totals:
+            embed.add_field(name="Average", value=format_minutes(team_total // len(totals)))
+
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+# ----------------- Setup Function -----------------
+async def setup(bot):
+    await bot.add_cog(Timesheet(bot))
@@ -0,0 +1,70 @@
+# export.py
+"""Command-line attendance/task export and attendance import.
+
+Run from the Discord_Bot folder (stop the bot first, or set STORAGE_FILE_LOCK=1):
+    python export.py export attendance --since 2024-01-01 --until 2024-01-31 -o jan.csv
+    python export.py export tasks --format columnar --user 1234 -o tasks.atcol
+    python export.py import hr_corrections.csv
+
+Role filters need a Discord connection and are only available through
+/attendance_export; use --user (repeatable) here instead.
+"""
+import argparse
+import asyncio
+import sys
+from utils.export import export, import_attendance, parse_attendance_csv
+from utils.storage import ATTENDANCE_FILE, TASKS_FILE, close_stores, get_store
+
+
+def run_export(args):
+    store = get_store(ATTENDANCE_FILE if args.kind == "attendance" else TASKS_FILE, args.guild)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        count = export(store.view(), args.kind, args.format, out, args.since, args.until, args.user)
+    finally:
+        if args.output:
+            out.close()
+    print(f"📤 Exported {count} {args.kind} row(s)", file=sys.stderr)
+
+
+async def run_import(args):
+    with open(args.file, "r", encoding="utf-8-sig", newline="") as f:
+        rows, errors = parse_attendance_csv(f)
+    if errors:
+        print("❌ Nothing imported:", *errors, sep="\n", file=sys.stderr)
+        return 1
+    count = await import_attendance(get_store(ATTENDANCE_FILE, args.guild), rows)
+    print(f"✅ Imported {count} attendance row(s)", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("export", help="Stream records to CSV or columnar")
+    p.add_argument("kind", choices=("attendance", "tasks"))
+    p.add_argument("--format", choices=("csv", "columnar"), default="csv")
+    p.add_argument("--since", help="First date to include (YYYY-MM-DD)")
+    p.add_argument("--until", help="Last date to include (YYYY-MM-DD)")
+    p.add_argument("--user", action="append", help="Only export this user ID (repeatable)")
+    p.add_argument("-o", "--output", help="Output file (default: stdout)")
+
+    p = commands.add_parser("import", help="Validate and upsert attendance rows from a CSV")
+    p.add_argument("file", help="CSV with columns user_id,date,status")
+
+    for p in commands.choices.values():
+        p.add_argument("--guild", type=int, help="Guild partition (with STORAGE_PARTITION=guild)")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "export":
+            run_export(args)
+            return 0
+        return asyncio.run(run_import(args))
+    finally:
+        close_stores()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,67 +1,122 @@
 # main.py
+import time
+STARTED = time.perf_counter()  # cold-start reference for the startup report
+
 import discord
 from discord.ext import commands
+import argparse
 import os
 from dotenv import load_dotenv
 import asyncio
+from pathlib import Path
+from utils.aio import shutdown_io
+from utils.command_sync import sync_commands
+from utils.loader import load_cogs, save_report
+from utils.metrics import METRICS_ENABLED, install_metrics, make_tree_cls
+from utils.render import shutdown_renderer
+from utils.roles import MEMBER_CACHE, close_role_indexes
+from utils.storage import close_stores
 
 # ----------------- Load Environment Variables -----------------
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")  # Your bot token in .env
 GUILD_ID = os.getenv("GUILD_ID")    # Optional: restrict commands to one server (faster sync)
 
+# Optional sharding: SHARD_COUNT alone runs every shard in this process;
+# with SHARD_IDS (e.g. "0-3" or "4,5") each process runs its own slice.
+# Pair several processes with STORAGE_PARTITION=guild (or STORAGE_FILE_LOCK=1).
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = os.getenv("SHARD_IDS")
+
+# Cogs live next to this file, whatever the working directory
+COGS_DIR = Path(__file__).resolve().parent / "cogs"
+
+
+def parse_shard_ids(spec):
+    """"0-3,6" -> [0, 1, 2, 3, 6]"""
+    ids = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        ids.extend(range(int(first), int(last or first) + 1))
+    return ids
+
 # ----------------- Bot Setup -----------------
 intents = discord.Intents.default()
 intents.message_content = True  # Required to read messages
-intents.members = True          # Required for attendance, punch-in tracking
+intents.members = True          # Member events keep the role index (utils/roles.py) current
+
+# Guilds are chunked lazily, the first time a team command needs their members
+BOT_OPTIONS = {"chunk_guilds_at_startup": False}
+if MEMBER_CACHE == "minimal":
+    # Cache no members; team queries read the role index instead
+    BOT_OPTIONS["member_cache_flags"] = discord.MemberCacheFlags.none()
+if METRICS_ENABLED:
+    # Times every app command; nothing is wrapped when metrics are off
+    BOT_OPTIONS["tree_cls"] = make_tree_cls()
+
+if SHARD_COUNT or SHARD_IDS:
+    if SHARD_IDS and not SHARD_COUNT:
+        raise ValueError("SHARD_IDS needs SHARD_COUNT (the total across all processes).")
+    bot = commands.AutoShardedBot(
+        command_prefix="!",
+        intents=intents,
+        **BOT_OPTIONS,
+        shard_count=int(SHARD_COUNT),
+        shard_ids=parse_shard_ids(SHARD_IDS) if SHARD_IDS else None,
+    )
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents, **BOT_OPTIONS)
+
+FORCE_SYNC = False  # set by --sync
+startup_report = None  # filled by load_cogs(), completed in on_ready
+
+# ----------------- Command Sync (once per process) -----------------
+async def setup_hook():
+    """Runs once after login, before connecting; cogs are already loaded"""
+    if METRICS_ENABLED:
+        await install_metrics(bot)
+    try:
+        # Only syncs when the command tree changed since the last sync
+        await sync_commands(bot, GUILD_ID, force=FORCE_SYNC)
+    except Exception as e:
+        print(f"❌ Failed to sync commands: {e}")
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot.setup_hook = setup_hook
 
 # ----------------- Startup Event -----------------
 @bot.event
 async def on_ready():
-    """Runs when the bot is online"""
+    """Runs when the bot is online (again after every reconnect)"""
     if bot.user is not None:
         print(f"✅ Logged in as {bot.user} (ID: {bot.user.id})")
     else:
         print("✅ Logged in, but bot.user is None")
+    if startup_report is not None and startup_report["ready_ms"] is None:
+        startup_report["ready_ms"] = (time.perf_counter() - STARTED) * 1000
+        await save_report(startup_report)
+        print(f"⏱️ Cold start to ready: {startup_report['ready_ms']:.0f} ms")
     print("------")
 
-    try:
-        # Sync slash commands
-        if GUILD_ID:
-            guild = discord.Object(id=int(GUILD_ID))
-            bot.tree.copy_global_to(guild=guild)
-            await bot.tree.sync(guild=guild)
-            print(f"🔄 Synced slash commands to guild {GUILD_ID}")
-        else:
-            await bot.tree.sync()
-            print("🔄 Synced global slash commands")
-
-    except Exception as e:
-        print(f"❌ Failed to sync commands: {e}")
-
-
-# ----------------- Load Cogs -----------------
-async def load_cogs():
-    """Load all cogs from cogs/ folder"""
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py"):
-            try:
-                await bot.load_extension(f"cogs.{filename[:-3]}")
-                print(f"✅ Loaded cog: {filename}")
-            except Exception as e:
-                print(f"❌ Failed to load cog {filename}: {e}")
-
 
 # ----------------- Run Bot -----------------
 async def main():
+    global startup_report
     if TOKEN is None:
         raise ValueError("DISCORD_TOKEN environment variable not set.")
-    async with bot:
-        await load_cogs()
-        await bot.start(TOKEN)
+    try:
+        async with bot:
+            startup_report = await load_cogs(bot, COGS_DIR)
+            await bot.start(TOKEN)
+    finally:
+        # Write any pending data before the process exits
+        shutdown_io()  # let queued background writes land first
+        close_stores()
+        close_role_indexes()
+        shutdown_renderer()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bot")
+    parser.add_argument("--sync", action="store_true", help="Sync slash commands even if they look unchanged")
+    FORCE_SYNC = parser.parse_args().sync
     asyncio.run(main())
@@ -0,0 +1,67 @@
+# tests/test_closeout.py
+import asyncio
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+import pytest
+import cogs.closeout as closeout_cog
+from utils import storage
+from utils.closeout import days_to_close, expected_on, load_last_closed
+from utils.policy import Policy
+from utils.roles import IndexedMember
+from utils.storage import ATTENDANCE_FILE, get_store
+
+GUILD = SimpleNamespace(id=1, name="Test")
+MEMBERS = [IndexedMember(10, "a", ()), IndexedMember(11, "b", ())]
+
+
+@pytest.fixture
+def cog(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage, "_stores", {})
+
+    async def team_members(bot, guild, role=None):
+        return MEMBERS
+
+    monkeypatch.setattr(closeout_cog, "team_members", team_members)
+    monkeypatch.setattr(closeout_cog, "log_to_channel", lambda bot, guild, message: None)
+    cog = closeout_cog.CloseOut.__new__(closeout_cog.CloseOut)  # without starting the daily loop
+    cog.bot, cog.policy = None, Policy(str(tmp_path / "policy.json"))
+    return cog
+
+
+def test_days_to_close_skips_holidays():
+    days = list(days_to_close("2024-01-04", date(2024, 1, 9), {"2024-01-08"}))
+    assert days == [date(2024, 1, 5), date(2024, 1, 6), date(2024, 1, 7), date(2024, 1, 9)]
+
+
+def test_default_shift_expects_nobody_on_weekends():
+    shifts = {"10": Policy("missing.json").shift_for()}
+    assert list(expected_on(shifts, date(2024, 1, 5))) == ["10"]  # Friday
+    assert expected_on(shifts, date(2024, 1, 6)) == {}
+    assert expected_on(shifts, date(2024, 1, 7)) == {}
+
+
+def test_close_marks_absent_on_workdays_only(cog):
+    # Thu 2024-01-04 closed; Fri and Mon are workdays, Sat/Sun are not, Tue is a holiday
+    days = list(days_to_close("2024-01-04", date(2024, 1, 9), {"2024-01-09"}))
+    now = datetime(2024, 1, 10, tzinfo=timezone.utc)
+    store = get_store(ATTENDANCE_FILE, GUILD.id)
+    store.set("10", "2024-01-05", value="Present")
+
+    marked, open_until = asyncio.run(cog.close(GUILD, days, now=now))
+    assert (marked, open_until) == (3, None)
+    assert store.get("11", "2024-01-05") == "Absent"
+    assert store.get("10", "2024-01-05") == "Present"
+    assert store.get("10", "2024-01-08") == store.get("11", "2024-01-08") == "Absent"
+    assert store.get("10", "2024-01-06") is None and store.get("10", "2024-01-07") is None
+    assert store.get("10", "2024-01-09") is None
+    assert asyncio.run(load_last_closed(GUILD.id)) == "2024-01-08"
+
+
+def test_close_waits_for_the_shift_to_end(cog):
+    # Default window ends 10:30 server time; a minute before, the day stays open
+    friday = date(2024, 1, 5)
+    end = cog.policy.shift_for().ends_at(friday)
+    marked, open_until = asyncio.run(cog.close(GUILD, [friday], now=end.replace(minute=end.minute - 2)))
+    assert (marked, open_until) == (0, end)
+    assert get_store(ATTENDANCE_FILE, GUILD.id).get("10", friday.isoformat()) is None
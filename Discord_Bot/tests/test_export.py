@@ -0,0 +1,20 @@
+# tests/test_export.py
+import io
+from utils.export import export, read_columnar, snapshot
+from utils.storage import JsonFileBackend, Store
+
+
+def test_export_pads_legacy_date_keys_and_skips_unreadable_ones(tmp_path):
+    path = str(tmp_path / "attendance.json")
+    store = Store(path, backend=JsonFileBackend(path))
+    store.set("1", "2024-1-5", value="Late")
+    store.set("1", "2024-01-04", value="Present")
+    store.set("1", "someday", value="Absent")
+
+    data = snapshot(store, since="2024-01-05")
+    assert data == {"1": {"2024-01-05": "Late"}}
+
+    f = io.BytesIO()
+    assert export(store.view(), "attendance", "columnar", f) == 2
+    f.seek(0)
+    assert list(read_columnar(f)) == [("1", "2024-01-04", "Present"), ("1", "2024-01-05", "Late")]
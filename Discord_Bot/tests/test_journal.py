@@ -0,0 +1,51 @@
+# tests/test_journal.py
+import os
+from utils.journal import JournalBackend
+from utils.storage import Store
+
+
+def open_store(path):
+    return Store(str(path), backend=JournalBackend(str(path)))
+
+
+def test_replay_drops_torn_write(tmp_path):
+    path = tmp_path / "attendance.json"
+    store = open_store(path)
+    store.set("1", "2024-01-05", value="Present")
+    store.set("2", "2024-01-05", value="Late")
+    store.flush_sync()
+    journal = store.backend.journal_path
+    intact = os.path.getsize(journal)
+
+    # A crash mid-append leaves half a record at the end of the journal
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('[3,"set",["3","2024-01-05"],"Pre')
+
+    store = open_store(path)
+    assert store.get("1", "2024-01-05") == "Present"
+    assert store.get("2", "2024-01-05") == "Late"
+    assert store.get("3") is None
+    assert os.path.getsize(journal) == intact
+
+    # New records follow the intact ones and replay cleanly
+    store.set("3", "2024-01-06", value="Absent")
+    store.close()
+    store = open_store(path)
+    assert store.get("3", "2024-01-06") == "Absent"
+    assert store.get("1", "2024-01-05") == "Present"
+
+
+def test_replay_skips_records_in_snapshot(tmp_path):
+    path = tmp_path / "attendance.json"
+    store = open_store(path)
+    store.set("1", "2024-01-05", value="Present")
+    store.flush_sync()
+    store.close()  # folds the journal into the snapshot
+
+    # Crash between writing the snapshot and truncating the journal
+    with open(store.backend.journal_path, "w", encoding="utf-8") as f:
+        f.write('[1,"set",["1","2024-01-05"],"Late"]\n')
+
+    store = open_store(path)
+    assert store.get("1", "2024-01-05") == "Present"
+    assert store.backend.seq == 1
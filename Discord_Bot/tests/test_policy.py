@@ -0,0 +1,76 @@
+# tests/test_policy.py
+import json
+from datetime import date, datetime, timezone
+import pytest
+from utils.policy import DEFAULT_SHIFT, Policy, Shift
+
+
+def shift(**spec):
+    return Shift({**DEFAULT_SHIFT, **spec})
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# 09:30-10:30 local: Present to 09:45, Late to 09:50, then Half-Day
+WINDOW = {"start": "09:30", "end": "10:30", "grace_minutes": 15, "half_day_after": "09:50"}
+
+
+@pytest.mark.parametrize("tz, now, expected", [
+    ("Europe/London", utc(2024, 1, 8, 9, 40), "Present"),    # GMT 09:40
+    ("Europe/London", utc(2024, 7, 8, 9, 40), None),         # BST 10:40, after the window
+    ("Europe/London", utc(2024, 7, 8, 8, 40), "Present"),    # BST 09:40
+    ("America/New_York", utc(2024, 1, 8, 14, 50), "Late"),   # EST 09:50
+    ("America/New_York", utc(2024, 7, 8, 13, 50), "Late"),   # EDT 09:50
+    ("Asia/Kolkata", utc(2024, 1, 8, 4, 25), "Half-Day"),    # IST 09:55
+    ("Asia/Kolkata", utc(2024, 1, 8, 3, 0), None),           # IST 08:30, before the window
+])
+def test_classify_in_shift_timezone(tz, now, expected):
+    status, local = shift(timezone=tz, **WINDOW).classify(now)
+    assert status == expected
+    assert local.tzinfo.key == tz
+
+
+def test_local_date_follows_shift_timezone():
+    # 23:30 UTC Sunday is already Monday morning in Tokyo
+    s = shift(timezone="Asia/Tokyo", start="08:00", end="09:00", punch_in_days=[0])
+    status, local = s.classify(utc(2024, 1, 7, 23, 30))
+    assert (status, local.date()) == ("Present", date(2024, 1, 8))
+
+
+def test_default_shift_allows_weekends():
+    status, _ = shift(timezone="UTC").classify(utc(2024, 1, 6, 9, 45))  # Saturday
+    assert status == "Present"
+
+
+def test_refused_outside_punch_in_days():
+    status, _ = shift(timezone="UTC", punch_in_days=[0, 1, 2, 3, 4]).classify(utc(2024, 1, 6, 9, 45))
+    assert status is None
+
+
+def test_default_workdays_are_weekdays():
+    s = shift()
+    assert [s.works_on(date(2024, 1, d)) for d in range(5, 8)] == [True, False, False]  # Fri, Sat, Sun
+
+
+@pytest.mark.parametrize("spec", [
+    {"end": "24:00"},
+    {"start": "9:75"},
+    {"half_day_after": "noon"},
+    {"start": "11:00", "end": "10:00"},
+])
+def test_invalid_times_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        shift(**spec)
+
+
+def test_bad_file_keeps_previous_policy(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"default": {"start": "08:00", "end": "09:00"}}))
+    policy = Policy(str(path), reload_interval=0)
+    assert policy.shift_for().window() == "08:00–09:00"
+
+    path.write_text(json.dumps({"default": {"start": "08:00", "end": "24:00"}}))
+    policy._maybe_reload(force=True)
+    assert policy.shift_for().window() == "08:00–09:00"
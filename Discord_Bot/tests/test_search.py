@@ -0,0 +1,98 @@
+# tests/test_search.py
+import random
+from utils import search
+from utils.search import TaskSearch, UserDates, get_task_search, get_user_dates
+from utils.storage import JsonFileBackend, Store
+
+
+def open_store(tmp_path, name="tasks.json"):
+    path = str(tmp_path / name)
+    return Store(path, backend=JsonFileBackend(path))
+
+
+def test_user_dates_prefix_and_around():
+    index = UserDates()
+    index.rebuild({"1": {"2024-01-05": "Present", "2023-12-31": "Late", "2024-02-01": "Absent"}})
+    assert index.prefix("1") == ["2024-02-01", "2024-01-05", "2023-12-31"]
+    assert index.prefix("1", "2024-0") == ["2024-02-01", "2024-01-05"]
+    assert index.prefix("1", "2024", limit=1) == ["2024-02-01"]
+    assert index.prefix("2") == []
+    assert index.around("1", "2024-01-05") == ("2023-12-31", "2024-02-01")
+    assert index.around("1", "2024-01-10") == ("2024-01-05", "2024-02-01")
+    assert index.around("1", "2025-01-01") == ("2024-02-01", None)
+
+
+def test_user_dates_follow_store_writes(tmp_path):
+    store = open_store(tmp_path, "attendance.json")
+    index = get_user_dates(store)
+    store.set("1", "2024-01-05", value="Present")
+    store.set("1", "2024-01-03", value="Late")
+    store.set("1", "2024-01-05", value="Late")  # changed in place
+    assert index.prefix("1") == ["2024-01-05", "2024-01-03"]
+    store.delete("1", "2024-01-05")
+    assert index.prefix("1") == ["2024-01-03"]
+    store.delete("1")
+    assert "1" not in index.dates
+
+
+def test_task_search_matches_all_words_within_one_task(tmp_path):
+    store = open_store(tmp_path)
+    index = get_task_search(store)
+    store.append("1", "2024-01-05", value={"task": "Fix login bug", "time": "1h"})
+    store.append("1", "2024-01-05", value={"task": "Write report", "time": "30m"})
+    store.append("2", "2024-01-06", value={"task": "Login page review", "time": "45m"})
+
+    assert sorted(index.texts("login")) == ["Fix login bug", "Login page review"]
+    assert index.texts("login report") == []  # words from two different tasks
+    assert index.texts("fix lo") == ["Fix login bug"]  # last word is a prefix
+    assert index.texts("login", user_ids={"2"}) == ["Login page review"]
+    assert [(u, d) for u, d, _ in index.find(store, "login")] == [("2", "2024-01-06"), ("1", "2024-01-05")]
+
+
+def test_task_search_prefix_cap_only_limits_autocomplete(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "MAX_PREFIX_WORDS", 2)
+    store = open_store(tmp_path)
+    index = get_task_search(store)
+    for word in ("task1", "task2", "task3"):
+        store.append("1", "2024-01-05", value={"task": word, "time": "1h"})
+
+    assert len(index.texts("task")) == 2
+    assert len(index.find(store, "task")) == 3
+
+
+def test_task_search_follows_edits_and_deletes(tmp_path):
+    store = open_store(tmp_path)
+    index = get_task_search(store)
+    store.append("1", "2024-01-05", value={"task": "Deploy api", "time": "1h"})
+    store.append("1", "2024-01-05", value={"task": "Deploy api", "time": "1h"})
+    store.set("1", "2024-01-05", 0, "task", value="Deploy web")
+    assert sorted(index.texts("deploy")) == ["Deploy api", "Deploy web"]
+    assert len(index.find(store, "deploy api")) == 1
+
+    store.delete("1", "2024-01-05", 1)
+    assert index.texts("api") == []
+    assert "api" not in index.words
+    store.delete("1")
+    assert index.postings == {} and index.words == []
+
+
+def test_task_search_updates_match_rebuild(tmp_path):
+    rng = random.Random(3)
+    vocab = ["fix", "bug", "login", "report", "deploy", "api", "review", "meeting"]
+    store = open_store(tmp_path)
+    index = get_task_search(store)
+    for _ in range(300):
+        user_id, day = str(rng.randint(1, 4)), f"2024-01-0{rng.randint(1, 5)}"
+        tasks = store.get(user_id, day)
+        if tasks and rng.random() < 0.3:
+            store.delete(user_id, day, rng.randrange(len(tasks)))
+        elif tasks and rng.random() < 0.3:
+            store.set(user_id, day, rng.randrange(len(tasks)), "task", value=" ".join(rng.sample(vocab, 2)))
+        else:
+            store.append(user_id, day, value={"task": " ".join(rng.sample(vocab, rng.randint(1, 3))), "time": "1h"})
+
+    fresh = TaskSearch()
+    fresh.rebuild(store.view())
+    assert index.postings == fresh.postings
+    assert index.sizes == fresh.sizes
+    assert index.words == fresh.words
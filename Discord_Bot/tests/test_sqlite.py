@@ -0,0 +1,46 @@
+# tests/test_sqlite.py
+import json
+from utils.sqlite import SqliteBackend
+from utils.storage import Store
+
+
+def open_store(tmp_path):
+    path = tmp_path / "attendance.json"
+    backend = SqliteBackend(str(path), db_path=str(tmp_path / "bot.db"))
+    return Store(str(path), backend=backend)
+
+
+def test_legacy_file_migrates_once(tmp_path):
+    (tmp_path / "attendance.json").write_text(json.dumps({"1": {"2024-01-05": "Present"}}))
+    store = open_store(tmp_path)
+    assert store.get("1", "2024-01-05") == "Present"
+
+    # Emptying the table must not bring the legacy data back on restart
+    store.delete("1")
+    store.close()
+    store = open_store(tmp_path)
+    assert store.get("1") is None
+    store.close()
+
+
+def test_no_legacy_file_is_recorded(tmp_path):
+    store = open_store(tmp_path)
+    store.close()
+
+    # A legacy file appearing later is not imported over live data
+    (tmp_path / "attendance.json").write_text(json.dumps({"1": {"2024-01-05": "Present"}}))
+    store = open_store(tmp_path)
+    assert store.get("1") is None
+    store.close()
+
+
+def test_existing_rows_skip_migration(tmp_path):
+    store = open_store(tmp_path)
+    store.set("2", "2024-01-06", value="Late")
+    store.close()
+    (tmp_path / "attendance.json").write_text(json.dumps({"1": {"2024-01-05": "Present"}}))
+
+    store = open_store(tmp_path)
+    assert store.get("1") is None
+    assert store.get("2", "2024-01-06") == "Late"
+    store.close()
@@ -0,0 +1,47 @@
+# tests/test_storage.py
+import json
+import os
+from utils import storage
+from utils.aio import atomic_write
+from utils.storage import JsonFileBackend, Store
+
+
+def test_json_backend_rewrites_changed_users(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text(json.dumps({"1": {"2024-01-05": [{"task": "a"}]}, "2": {"2024-01-05": "x"}}))
+    store = Store(str(path), backend=JsonFileBackend(str(path)))
+
+    store.append("1", "2024-01-05", value={"task": "b"})
+    store.set("3", "2024-01-06", value="y")
+    store.delete("2", "2024-01-05")
+    store.flush_sync()
+    assert json.loads(path.read_text()) == {"1": {"2024-01-05": [{"task": "a"}, {"task": "b"}]}, "3": {"2024-01-06": "y"}}
+
+    # Later in-place edits are picked up by the next flush
+    store.set("1", "2024-01-05", 0, "task", value="c")
+    store.flush_sync()
+    assert json.loads(path.read_text())["1"] == {"2024-01-05": [{"task": "c"}, {"task": "b"}]}
+    assert json.loads(path.read_text()) == dict(store.view())
+
+
+def test_guild_partition_seeds_only_its_members(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_PARTITION", "guild")
+    legacy = tmp_path / "attendance.json"
+    legacy.write_text(json.dumps({"1": {"2024-01-05": "Present"}, "2": {"2024-01-05": "Absent"}, "3": {"2024-01-05": "Late"}}))
+
+    store = storage._load_store(str(legacy), 42, frozenset({"1"}), complete=False)
+    assert dict(store.view()) == {"1": {"2024-01-05": "Present"}}
+    assert not os.path.exists(f"{store.path}.seeded")
+
+    # A later open with a chunked index adds members it had missed, and marks the seed done
+    store = storage._load_store(str(legacy), 42, frozenset({"1", "3"}), complete=True)
+    assert sorted(store.view()) == ["1", "3"]
+    assert os.path.exists(f"{store.path}.seeded")
+
+
+def test_atomic_write_uses_its_own_temp_file(tmp_path):
+    path = tmp_path / "data.json"
+    atomic_write(str(path), "{}")
+    atomic_write(str(path), '{"a":1}')
+    assert path.read_text() == '{"a":1}'
+    assert os.listdir(tmp_path) == ["data.json"]
@@ -0,0 +1,97 @@
+# tests/test_timesheet.py
+import random
+from datetime import date
+import pytest
+from utils.storage import JsonFileBackend, Store
+from utils.timesheet import Timesheet, format_minutes, get_timesheet, parse_duration
+
+
+def open_store(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    return Store(path, backend=JsonFileBackend(path))
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("45m", 45),
+    ("45 mins", 45),
+    ("90", 90),
+    ("1h", 60),
+    ("1h 30m", 90),
+    ("1h30", 90),
+    ("1.5h", 90),
+    ("2 hours", 120),
+    ("1 hour and 15 minutes", 75),
+    ("1h, 15m", 75),
+    ("1:30", 90),
+    ("0:05", 5),
+    ("  2H  ", 120),
+    ("0.25 h", 15),
+])
+def test_parse_duration(text, minutes):
+    assert parse_duration(text) == minutes
+
+
+@pytest.mark.parametrize("text", ["", "soon", "1x", "2 days", "1:75", "h", "-30m"])
+def test_parse_duration_rejects_unreadable(text):
+    assert parse_duration(text) is None
+
+
+@pytest.mark.parametrize("minutes, text", [(45, "45m"), (60, "1h"), (90, "1h 30m"), (0, "0m")])
+def test_format_minutes_round_trips(minutes, text):
+    assert format_minutes(minutes) == text
+    assert parse_duration(text) == minutes
+
+
+def test_timesheet_rebuild_totals_days_and_weeks():
+    index = Timesheet()
+    index.rebuild({
+        "1": {
+            "2024-01-01": [{"task": "a", "time": "1h", "minutes": 60}, {"task": "b", "time": "30m", "minutes": 30}],
+            "2024-01-07": [{"task": "c", "time": "45 mins"}],  # legacy text only
+            "2024-01-08": [{"task": "d", "duration": "2h"}],
+        },
+        "2": {"2024-01-03": [{"task": "e", "time": "soon"}]},  # unreadable counts as 0
+    })
+    assert index.day("1", date(2024, 1, 1)) == 90
+    assert index.week("1", date(2024, 1, 3)) == 135  # Mon 1st .. Sun 7th
+    assert index.week("1", date(2024, 1, 8)) == 120
+    assert index.total("1", date(2024, 1, 1), date(2024, 1, 8)) == 255
+    assert index.total("1", date(2024, 1, 2), date(2024, 1, 7)) == 45
+    assert index.team(["1", "2", "3"], date(2024, 1, 1), date(2024, 1, 7)) == {"1": 135}
+
+
+def test_timesheet_follows_edits_and_deletes(tmp_path):
+    store = open_store(tmp_path)
+    index = get_timesheet(store)
+    store.append("1", "2024-01-05", value={"task": "a", "time": "1h", "minutes": 60})
+    store.append("1", "2024-01-05", value={"task": "b", "time": "30m", "minutes": 30})
+    store.set("1", "2024-01-05", 0, "minutes", value=15)
+    assert index.day("1", date(2024, 1, 5)) == 45
+
+    store.delete("1", "2024-01-05", 1)
+    assert index.week("1", date(2024, 1, 5)) == 15
+    store.delete("1")
+    assert index.days == {} and index.weeks == {}
+
+
+def test_timesheet_updates_match_rebuild(tmp_path):
+    rng = random.Random(5)
+    store = open_store(tmp_path)
+    index = get_timesheet(store)
+    for _ in range(300):
+        user_id, day = str(rng.randint(1, 4)), f"2024-01-{rng.randint(1, 20):02d}"
+        tasks = store.get(user_id, day)
+        roll = rng.random()
+        if tasks and roll < 0.25:
+            store.delete(user_id, day, rng.randrange(len(tasks)))
+        elif tasks and roll < 0.5:
+            store.set(user_id, day, rng.randrange(len(tasks)), "minutes", value=rng.randint(5, 120))
+        elif store.get(user_id) and roll < 0.55:
+            store.delete(user_id, rng.choice(list(store.get(user_id))))
+        else:
+            store.append(user_id, day, value={"task": "t", "time": f"{rng.randint(1, 90)}m"})
+
+    fresh = Timesheet()
+    fresh.rebuild(store.view())
+    assert index.days == fresh.days
+    assert index.weeks == fresh.weeks
@@ -0,0 +1,159 @@
+# utils/aio.py
+"""Storage I/O layer: blocking file work off the event loop.
+
+Reads, atomic writes, fsyncs and SQLite calls run in a dedicated pool of
+STORAGE_IO_WORKERS threads. A slow disk then delays only the call waiting
+on it, never gateway heartbeats or other interactions. A burst of flushes
+is also bounded and cannot take over asyncio's default executor.
+
+Every storage call is timed, including the few steps that must stay on the
+loop (building a consistent snapshot of the data). Any call slower than
+STORAGE_LATENCY_BUDGET is logged.
+
+JSON goes through orjson when it is installed, then ujson, falling back to
+the stdlib json module. Files are always UTF-8.
+"""
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils import metrics
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+try:
+    import ujson
+except ImportError:  # optional fast path
+    ujson = None
+
+# Threads doing storage I/O (bounds concurrent reads/writes/fsyncs)
+STORAGE_IO_WORKERS = int(os.getenv("STORAGE_IO_WORKERS", "4"))
+
+# Seconds a storage call may take (queueing included) before it is logged
+STORAGE_LATENCY_BUDGET = float(os.getenv("STORAGE_LATENCY_BUDGET", "0.25"))
+
+_executor = None
+
+
+# ----------------- JSON -----------------
+if orjson is not None:
+    JSON_LIBRARY = "orjson"
+
+    def dumps(obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode()
+
+    loads = orjson.loads
+elif ujson is not None:
+    JSON_LIBRARY = "ujson"
+
+    def dumps(obj, indent=False):
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, indent=2 if indent else 0)
+
+    loads = ujson.loads
+else:
+    JSON_LIBRARY = "json"
+
+    def dumps(obj, indent=False):
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    loads = json.loads
+
+
+# ----------------- Blocking Helpers -----------------
+def atomic_write(path, payload):
+    """Write ``payload`` to ``path`` via temp file + fsync + rename.
+
+    Each call gets its own temp file, so concurrent writers never share one.
+    """
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            try:
+                os.fchmod(fd, os.stat(path).st_mode & 0o777)  # mkstemp creates 0600; keep the file's mode
+            except FileNotFoundError:
+                os.fchmod(fd, 0o644)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            metrics.count_bytes("written", f.tell())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+        raise
+
+
+def read_json(path, default=None):
+    """Parse a JSON file, or return ``default`` if it does not exist"""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return default
+    metrics.count_bytes("read", len(raw))
+    return loads(raw)
+
+
+def write_json(path, obj, indent=False):
+    """Atomically replace ``path`` with ``obj`` as JSON"""
+    atomic_write(path, dumps(obj, indent))
+
+
+# ----------------- Async API -----------------
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=STORAGE_IO_WORKERS, thread_name_prefix="storage-io")
+    return _executor
+
+
+def _check_budget(label, seconds):
+    metrics.storage_call(seconds)
+    if seconds > STORAGE_LATENCY_BUDGET:
+        print(f"⚠️ Slow storage call: {label} took {seconds * 1000:.0f} ms (budget {STORAGE_LATENCY_BUDGET * 1000:.0f} ms)")
+
+
+async def run(fn, *args, label=None):
+    """Run blocking ``fn(*args)`` in the storage pool and return its result"""
+    t = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), functools.partial(fn, *args))
+    finally:
+        _check_budget(label or fn.__name__, time.perf_counter() - t)
+
+
+@contextlib.contextmanager
+def budget(label):
+    """Time a storage step that has to run on the loop (e.g. snapshotting data to write)"""
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        _check_budget(label, time.perf_counter() - t)
+
+
+async def load_json(path, default=None):
+    return await run(read_json, path, default, label=f"read {path}")
+
+
+async def save_json(path, obj, indent=False):
+    await run(write_json, path, obj, indent, label=f"write {path}")
+
+
+def shutdown_io():
+    """Wait for queued storage I/O to finish; used at shutdown"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
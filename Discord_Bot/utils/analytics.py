@@ -0,0 +1,108 @@
+# utils/analytics.py
+"""Team attendance analytics computed as array operations over the attendance matrix.
+
+Everything is derived from one ``members x days`` uint8 block (see
+``AttendanceMatrix.block``), so the cost is a handful of NumPy passes
+rather than Python loops over every member and day.
+"""
+from datetime import date, timedelta
+import numpy as np
+from utils.matrix import CODES, STATUSES, day_number
+
+PRESENT, LATE, HALF_DAY = CODES["Present"], CODES["Late"], CODES["Half-Day"]
+
+# Days that count towards a streak, and the share of a day each status is worth
+ATTENDED = (PRESENT, LATE, HALF_DAY)
+CREDIT = np.zeros(256, dtype=np.float32)
+CREDIT[PRESENT], CREDIT[LATE], CREDIT[HALF_DAY] = 1.0, 1.0, 0.5
+
+
+# Weekdays (Monday = 0) for members without a shift, as DEFAULT_SHIFT in utils/policy.py
+DEFAULT_WORKDAYS = frozenset(range(5))
+
+
+def workday_mask(since, until, weekdays=DEFAULT_WORKDAYS):
+    """Boolean array over the inclusive range, True on the given weekdays"""
+    first = day_number(since)
+    days = np.arange(first, day_number(until) + 1)
+    return np.isin((days - 1) % 7, list(weekdays))  # ordinal 1 (0001-01-01) is a Monday
+
+
+def run_lengths(flags):
+    """Per-cell length of the run of True ending at that cell, row-wise"""
+    counts = np.cumsum(flags, axis=1)
+    resets = np.maximum.accumulate(np.where(flags, 0, counts), axis=1)
+    return counts - resets
+
+
+def team_stats(matrix, user_ids, since, until, workdays=None):
+    """Attendance rate and punctuality per week, status totals and streaks.
+
+    Rate is (Present + Late + ½ Half-Day) over recorded workday person-days (the
+    daily close-out writes Absent for missing members, so days before someone
+    joined, holidays and unclosed days are not counted); punctuality is Present
+    (on time) over attended days. ``workdays`` maps user ID -> the weekdays
+    their shift expects attendance (``Shift.workdays``), so the rate counts the
+    same days close-out does; missing users get DEFAULT_WORKDAYS.
+    """
+    user_ids = list(user_ids)
+    block = matrix.block(user_ids, since, until)
+    workdays = workdays or {}
+
+    # Members sharing a set of workdays share a column mask
+    groups = {}
+    for row, user_id in enumerate(user_ids):
+        groups.setdefault(frozenset(workdays.get(user_id, DEFAULT_WORKDAYS)), []).append(row)
+    work = np.zeros(block.shape, dtype=bool)
+    masks = {weekdays: workday_mask(since, until, weekdays) for weekdays in groups}
+    for weekdays, rows in groups.items():
+        work[rows] = masks[weekdays]
+
+    # Weeks start on the Monday on/before ``since``
+    first = date.fromisoformat(since)
+    offset = first.weekday()
+    week_of_day = (np.arange(block.shape[1]) + offset) // 7
+    weeks = int(week_of_day[-1]) + 1 if block.shape[1] else 0
+
+    credit = (CREDIT[block] * work).sum(axis=0)  # records on days off do not raise the rate
+    present = (block == PRESENT).sum(axis=0)
+    attended = np.isin(block, ATTENDED).sum(axis=0)
+    expected = ((block != 0) & work).sum(axis=0)
+
+    by_week = lambda values: np.bincount(week_of_day, weights=values, minlength=weeks)
+    week_credit, week_expected = by_week(credit), by_week(expected)
+    week_present, week_attended = by_week(present), by_week(attended)
+
+    weekly = []
+    for w in range(weeks):
+        weekly.append({
+            "week": (first - timedelta(days=offset) + timedelta(weeks=w)).isoformat(),
+            "rate": float(week_credit[w] / week_expected[w]) if week_expected[w] else None,
+            "punctuality": float(week_present[w] / week_attended[w]) if week_attended[w] else None,
+        })
+
+    # Streaks run over each member's own workdays, so days off neither count nor break them
+    longest = np.zeros(len(user_ids), dtype=int)
+    current = np.zeros(len(user_ids), dtype=int)
+    for weekdays, rows in groups.items():
+        runs = run_lengths(np.isin(block[rows][:, masks[weekdays]], ATTENDED))
+        if runs.shape[1]:
+            longest[rows], current[rows] = runs.max(axis=1), runs[:, -1]
+
+    totals = np.bincount(block.ravel(), minlength=len(STATUSES) + 1)
+    return {
+        "members": len(user_ids),
+        "totals": {status: int(totals[code]) for status, code in CODES.items()},
+        "rate": float(credit.sum() / expected.sum()) if expected.sum() else None,
+        "punctuality": float(present.sum() / attended.sum()) if attended.sum() else None,
+        "weekly": weekly,
+        "longest_streak": dict(zip(user_ids, longest.tolist())),
+        "current_streak": dict(zip(user_ids, current.tolist())),
+    }
+
+
+def heatmap_rows(matrix, user_ids, since, until):
+    """Per-member status names (None = no record) for the team heatmap renderer"""
+    block = matrix.block(list(user_ids), since, until)
+    names = np.array((None,) + STATUSES, dtype=object)
+    return names[block].tolist()
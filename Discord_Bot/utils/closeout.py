@@ -0,0 +1,95 @@
+# utils/closeout.py
+"""Daily close-out: turn "no punch-in" into explicit Absent records.
+
+Once every expected member's punch-in window has ended (in their shift's own
+timezone), each member without a record for the day gets "Absent", written
+in one transaction. Holidays and days outside a member's shift ``workdays``
+(Monday-Friday by default, however many days punch-in is open) are skipped,
+so a missing record always means "not a workday" (or "not closed yet"),
+never an implicit absence.
+"""
+import os
+from datetime import date, timedelta, timezone
+from zoneinfo import ZoneInfo
+from utils.aio import load_json, save_json
+
+HOLIDAYS_FILE = "data/holidays.json"  # ["2024-12-25", ...]
+CLOSEOUT_STATE_DIR = "data/closeout"  # one <guild_id>.json per guild, so shard processes never share one
+
+# Extra comma-separated ISO dates, e.g. HOLIDAYS=2024-12-25,2024-12-26
+HOLIDAYS_ENV = os.getenv("HOLIDAYS", "")
+
+# Time the daily job runs, in CLOSEOUT_TIMEZONE. Days whose shifts have not all
+# ended yet are left open and closed by the next run.
+CLOSEOUT_TIME = os.getenv("CLOSEOUT_TIME", "10:31")
+
+# IANA zone for CLOSEOUT_TIME, e.g. Europe/London (default: the server's zone)
+CLOSEOUT_TIMEZONE = os.getenv("CLOSEOUT_TIMEZONE", "")
+
+# Missed days (bot offline) closed on the next run, at most this many back
+CLOSEOUT_CATCH_UP_DAYS = int(os.getenv("CLOSEOUT_CATCH_UP_DAYS", "7"))
+
+
+async def load_holidays(path=HOLIDAYS_FILE):
+    holidays = {d.strip() for d in HOLIDAYS_ENV.split(",") if d.strip()}
+    holidays.update(await load_json(path, []))
+    return holidays
+
+
+def closeout_zone():
+    """CLOSEOUT_TIMEZONE, else the server's zone (with its DST rules), else UTC"""
+    if CLOSEOUT_TIMEZONE:
+        return ZoneInfo(CLOSEOUT_TIMEZONE)
+    try:
+        with open("/etc/localtime", "rb") as f:
+            return ZoneInfo.from_file(f, key="localtime")
+    except (OSError, ValueError):
+        return timezone.utc
+
+
+def is_holiday(day, holidays):
+    return day.isoformat() in holidays
+
+
+def expected_on(shifts, day):
+    """The ``{user_id: shift}`` entries whose shift expects attendance on ``day``"""
+    return {user_id: shift for user_id, shift in shifts.items() if shift.works_on(day)}
+
+
+def days_to_close(last_closed, today, holidays, catch_up=CLOSEOUT_CATCH_UP_DAYS):
+    """Non-holiday days after ``last_closed`` up to and including ``today`` (only today on the first run).
+
+    Weekdays are not filtered here: each member's shift workdays decide (see :func:`expected_on`).
+    """
+    first = today
+    if last_closed is not None:
+        first = max(today - timedelta(days=catch_up - 1), date.fromisoformat(last_closed) + timedelta(days=1))
+    day = first
+    while day <= today:
+        if not is_holiday(day, holidays):
+            yield day
+        day += timedelta(days=1)
+
+
+def _state_path(guild_id):
+    return os.path.join(CLOSEOUT_STATE_DIR, f"{guild_id}.json")
+
+
+async def load_last_closed(guild_id):
+    return (await load_json(_state_path(guild_id), {})).get("last_closed")
+
+
+async def save_last_closed(guild_id, day):
+    await save_json(_state_path(guild_id), {"last_closed": day})
+
+
+async def close_day(store, user_ids, day):
+    """Write Absent for every user in ``user_ids`` without a record on ``day``. Returns the count."""
+    marked = 0
+    async with store.transaction("__bulk__"):
+        for user_id in user_ids:
+            if store.get(user_id, day) is None:
+                store.set(user_id, day, value="Absent")
+                marked += 1
+    await store.flush()
+    return marked
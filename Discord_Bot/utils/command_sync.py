@@ -0,0 +1,40 @@
+# utils/command_sync.py
+"""Sync slash commands only when the command tree actually changed.
+
+The payload ``tree.sync()`` would upload is hashed and compared with the
+hash stored in ``data/command_sync.json`` for the same application and
+scope (global or one guild), so restarts and reconnects make no sync call
+unless a command, option or description changed.
+"""
+import hashlib
+import json
+import discord
+from utils.aio import load_json, save_json
+
+COMMAND_SYNC_FILE = "data/command_sync.json"
+
+
+def tree_hash(tree, guild=None):
+    """Stable hash of the commands ``tree.sync(guild=guild)`` would upload"""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)), key=lambda c: (c.get("type", 1), c["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+async def sync_commands(bot, guild_id=None, force=False, path=COMMAND_SYNC_FILE):
+    """Sync the tree (globally, or copied to one guild) if its hash changed. Returns True if synced."""
+    guild = discord.Object(id=int(guild_id)) if guild_id else None
+    if guild is not None:
+        bot.tree.copy_global_to(guild=guild)
+
+    key = f"{bot.application_id}:{guild_id or 'global'}"
+    digest = tree_hash(bot.tree, guild)
+    hashes = await load_json(path, {})
+    if not force and hashes.get(key) == digest:
+        print(f"⏭️ Slash commands unchanged ({guild_id or 'global'}), skipping sync")
+        return False
+
+    await bot.tree.sync(guild=guild)
+    hashes[key] = digest
+    await save_json(path, hashes, indent=True)
+    print(f"🔄 Synced slash commands ({guild_id or 'global'})")
+    return True
@@ -0,0 +1,148 @@
+# utils/events.py
+import bisect
+import heapq
+import os
+from collections import deque, namedtuple
+from datetime import datetime
+from utils.timesheet import task_time
+
+# How many recent changes to keep per data file
+RECENT_EVENTS = int(os.getenv("RECENT_EVENTS", "500"))
+
+# ts is a datetime for live events and None for entries read back from history
+Event = namedtuple("Event", "ts kind user_id date text")
+
+
+def describe(kind, date, old, new):
+    """Human-readable lines for one entry changing from ``old`` to ``new``"""
+    if kind == "attendance":
+        if new is None:
+            return [f"attendance record removed for {date}"]
+        return [f"{new} on {date}"]
+
+    old, new = old or [], new or []
+    if len(new) > len(old):
+        return [f"added task: {t['task']} ({task_time(t)}) on {date}" for t in new[len(old):]]
+    if len(new) < len(old):
+        return [f"deleted task: {t['task']} ({task_time(t)}) on {date}" for t in old if t not in new]
+    return [
+        f"edited task: {b['task']} ({task_time(b)}) on {date}"
+        for a, b in zip(old, new) if a != b
+    ]
+
+
+def history_text(kind, date, value):
+    if kind == "attendance":
+        return f"{value} on {date}"
+    return "; ".join(f"{t['task']} ({task_time(t)})" for t in value) + f" on {date}"
+
+
+# ----------------- Store Indexes -----------------
+class RecentEvents:
+    """Bounded ring buffer of the latest changes to one store, with real timestamps"""
+
+    def __init__(self, kind, maxlen=RECENT_EVENTS):
+        self.kind = kind
+        self.events = deque(maxlen=maxlen)
+
+    def rebuild(self, data):
+        pass  # only live changes have timestamps; older entries come from history
+
+    def update(self, user_id, date, old, new):
+        now = datetime.now()
+        for text in describe(self.kind, date, old, new):
+            self.events.append(Event(now, self.kind, user_id, date, text))
+
+
+class DateIndex:
+    """Sorted list of dates with, per date, the users that have an entry"""
+
+    def __init__(self):
+        self.dates = []
+        self.users = {}  # date -> {user_id: None} (insertion-ordered set)
+
+    def rebuild(self, data):
+        self.users.clear()
+        for user_id, dates in data.items():
+            for date in dates:
+                self.users.setdefault(date, {})[user_id] = None
+        self.dates = sorted(self.users)
+
+    def update(self, user_id, date, old, new):
+        if new is not None and old is None:
+            if date not in self.users:
+                bisect.insort(self.dates, date)
+                self.users[date] = {}
+            self.users[date][user_id] = None
+        elif new is None and old is not None:
+            users = self.users.get(date, {})
+            users.pop(user_id, None)
+            if not users:
+                self.users.pop(date, None)
+                i = bisect.bisect_left(self.dates, date)
+                if i < len(self.dates) and self.dates[i] == date:
+                    del self.dates[i]
+
+
+def attach_events(store, kind):
+    """Attach the recent-events buffer and date index to ``store`` (idempotent)"""
+    if "events" not in store.indexes:
+        store.add_index("events", RecentEvents(kind))
+        store.add_index("dates", DateIndex())
+    return store
+
+
+# ----------------- Reading -----------------
+def iter_events(stores, user_id=None, since=None, until=None):
+    """Yield events newest first: live changes, then older entries from storage.
+
+    ``stores`` maps kind -> store with :func:`attach_events` applied. Filters
+    are applied while walking, so each page costs about its own size
+    regardless of how much history is stored.
+    """
+    seen = set()
+
+    def wanted(event):
+        return ((user_id is None or event.user_id == user_id)
+                and (since is None or event.date >= since)
+                and (until is None or event.date <= until))
+
+    # Copy the (bounded) buffers: the view reads this generator across button clicks
+    live = [list(reversed(store.indexes["events"].events)) for store in stores.values()]
+    for event in heapq.merge(*live, key=lambda e: e.ts, reverse=True):
+        if wanted(event):
+            seen.add((event.kind, event.user_id, event.date))
+            yield event
+
+    history = [_iter_history(kind, store, user_id, since, until) for kind, store in stores.items()]
+    for event in heapq.merge(*history, key=lambda e: e.date, reverse=True):
+        if (event.kind, event.user_id, event.date) not in seen:
+            yield event
+
+
+def _iter_history(kind, store, user_id, since, until):
+    if user_id is not None:
+        # One user's history is small enough to sort directly
+        dates = sorted(store.get(user_id, default={}), reverse=True)
+        pairs = ((date, (user_id,)) for date in dates)
+    else:
+        pairs = _iter_dates(store.indexes["dates"], until)
+
+    for date, users in pairs:
+        if until is not None and date > until:
+            continue
+        if since is not None and date < since:
+            return
+        for uid in users:
+            value = store.get(uid, date)
+            if value is not None:
+                yield Event(None, kind, uid, date, history_text(kind, date, value))
+
+
+def _iter_dates(index, until):
+    end = len(index.dates) if until is None else bisect.bisect_right(index.dates, until)
+    for i in range(end - 1, -1, -1):
+        if i >= len(index.dates):
+            continue  # dates removed while a /logs view was open
+        date = index.dates[i]
+        yield date, tuple(reversed(index.users.get(date, {})))
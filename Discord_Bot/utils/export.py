@@ -0,0 +1,253 @@
+# utils/export.py
+"""Streaming attendance/task export (CSV or columnar) and bulk attendance import.
+
+Rows are generated one at a time from the store and written as they are
+produced, so an export never holds the full table in memory.
+"""
+import csv
+import io
+import json
+import struct
+import zlib
+from datetime import date
+from utils.matrix import STATUSES, record_day
+from utils.timesheet import task_time
+
+ATTENDANCE_COLUMNS = (("user_id", "dict"), ("date", "date"), ("status", "dict"))
+TASK_COLUMNS = (("user_id", "dict"), ("date", "date"), ("position", "int"), ("task", "str"), ("time", "str"))
+
+COLUMNAR_MAGIC = b"ATCOL1\n"
+ROW_GROUP_SIZE = 8192
+EPOCH = date(1970, 1, 1).toordinal()
+
+
+# ----------------- Row Sources -----------------
+def _users(data, user_ids):
+    return data.keys() if user_ids is None else user_ids
+
+
+def _in_range(day, since, until):
+    return (since is None or day >= since) and (until is None or day <= until)
+
+
+def _days(items, since, until):
+    """``(YYYY-MM-DD, value)`` pairs in range, in date order.
+
+    Older files may hold unpadded keys ("2024-1-5"); those are written as the
+    same padded day, as the status matrix reads them. Unreadable keys are skipped.
+    """
+    days = []
+    for key, value in items:
+        number = record_day(key)
+        if number is not None:
+            day = date.fromordinal(number).isoformat()
+            if _in_range(day, since, until):
+                days.append((day, value))
+    days.sort(key=lambda item: item[0])
+    return days
+
+
+def snapshot(store, since=None, until=None, user_ids=None):
+    """Plain copy of the entries an export reads, for the storage pool to encode.
+
+    Runs in the pool itself while the loop keeps writing: every user's entries
+    and every task list is copied with one ``list()``/``dict()`` call, which
+    never lets the loop in midway, so each user is read in a consistent state.
+    Only users and dates in range are copied.
+    """
+    data = {}
+    for user_id in list(_users(store.view(), user_ids)):
+        entries = store.get(user_id)
+        if entries is None:
+            continue
+        days = {
+            day: [dict(task) for task in list(value)] if isinstance(value, list) else value
+            for day, value in _days(list(entries.items()), since, until)
+        }
+        if days:
+            data[user_id] = days
+    return data
+
+
+def iter_attendance_rows(data, since=None, until=None, user_ids=None):
+    """Yield ``(user_id, date, status)`` rows of ``{user_id: {date: status}}``, optionally filtered"""
+    for user_id in _users(data, user_ids):
+        for day, status in _days(data.get(user_id, {}).items(), since, until):
+            yield user_id, day, status
+
+
+def iter_task_rows(data, since=None, until=None, user_ids=None):
+    """Yield ``(user_id, date, position, task, time)`` rows, optionally filtered"""
+    for user_id in _users(data, user_ids):
+        for day, tasks in _days(data.get(user_id, {}).items(), since, until):
+            for position, task in enumerate(tasks):
+                yield user_id, day, position, task.get("task", ""), task_time(task)
+
+
+# ----------------- Writers -----------------
+def write_csv(rows, columns, f):
+    """Write rows to a text file object as CSV. Returns the row count."""
+    writer = csv.writer(f)
+    writer.writerow([name for name, _ in columns])
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_columnar(rows, columns, f):
+    """Write rows to a binary file object in a compact column-oriented format.
+
+    Layout: magic, one JSON header line with the column names/types, then row
+    groups of up to ROW_GROUP_SIZE rows. Each group is ``u32 row count`` followed
+    by one zlib-compressed block per column (``u32 length`` + bytes):
+    - dict: u32 dictionary size, length-prefixed UTF-8 values, then u32 codes
+    - date: i32 days since 1970-01-01
+    - int:  i64 values
+    - str:  length-prefixed UTF-8 values
+    Returns the row count.
+    """
+    f.write(COLUMNAR_MAGIC)
+    f.write(json.dumps({"columns": [{"name": n, "type": t} for n, t in columns]}).encode() + b"\n")
+
+    count, group = 0, []
+    for row in rows:
+        group.append(row)
+        if len(group) == ROW_GROUP_SIZE:
+            _write_group(group, columns, f)
+            count += len(group)
+            group = []
+    if group:
+        _write_group(group, columns, f)
+        count += len(group)
+    return count
+
+
+def _pack_strings(values):
+    out = bytearray()
+    for value in values:
+        data = value.encode()
+        out += struct.pack("<I", len(data)) + data
+    return out
+
+
+def _write_group(group, columns, f):
+    f.write(struct.pack("<I", len(group)))
+    for i, (_, kind) in enumerate(columns):
+        values = [row[i] for row in group]
+        if kind == "dict":
+            codes = {}
+            for value in values:
+                codes.setdefault(value, len(codes))
+            block = struct.pack("<I", len(codes)) + _pack_strings(codes) + struct.pack(f"<{len(values)}I", *(codes[v] for v in values))
+        elif kind == "date":
+            block = struct.pack(f"<{len(values)}i", *(date.fromisoformat(v).toordinal() - EPOCH for v in values))
+        elif kind == "int":
+            block = struct.pack(f"<{len(values)}q", *values)
+        else:
+            block = _pack_strings(values)
+        block = zlib.compress(bytes(block))
+        f.write(struct.pack("<I", len(block)) + block)
+
+
+def _unpack_strings(buf, offset, n):
+    values = []
+    for _ in range(n):
+        (size,) = struct.unpack_from("<I", buf, offset)
+        offset += 4
+        values.append(buf[offset:offset + size].decode())
+        offset += size
+    return values, offset
+
+
+def read_columnar(f):
+    """Yield rows back from :func:`write_columnar` output, one row group at a time"""
+    if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar export file")
+    columns = [(c["name"], c["type"]) for c in json.loads(f.readline())["columns"]]
+
+    while True:
+        head = f.read(4)
+        if not head:
+            return
+        (n,) = struct.unpack("<I", head)
+        decoded = []
+        for _, kind in columns:
+            (size,) = struct.unpack("<I", f.read(4))
+            block = zlib.decompress(f.read(size))
+            if kind == "dict":
+                (size,) = struct.unpack_from("<I", block)
+                dictionary, offset = _unpack_strings(block, 4, size)
+                decoded.append([dictionary[c] for c in struct.unpack_from(f"<{n}I", block, offset)])
+            elif kind == "date":
+                decoded.append([date.fromordinal(d + EPOCH).isoformat() for d in struct.unpack(f"<{n}i", block)])
+            elif kind == "int":
+                decoded.append(list(struct.unpack(f"<{n}q", block)))
+            else:
+                decoded.append(_unpack_strings(block, 0, n)[0])
+        yield from zip(*decoded)
+
+
+def export(data, kind, fmt, f, since=None, until=None, user_ids=None):
+    """Stream an export of ``kind`` ("attendance"/"tasks") into binary file ``f``. Returns the row count.
+
+    ``data`` is a store's ``view()`` or a :func:`snapshot` of it.
+    """
+    if kind == "attendance":
+        rows, columns = iter_attendance_rows(data, since, until, user_ids), ATTENDANCE_COLUMNS
+    else:
+        rows, columns = iter_task_rows(data, since, until, user_ids), TASK_COLUMNS
+
+    if fmt == "columnar":
+        return write_columnar(rows, columns, f)
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        return write_csv(rows, columns, text)
+    finally:
+        text.flush()
+        text.detach()  # leave ``f`` open for the caller
+
+
+# ----------------- Import -----------------
+def parse_attendance_csv(f, max_errors=10):
+    """Read and validate ``user_id,date,status`` rows from a text file object.
+
+    Returns ``(rows, errors)``; nothing should be written if ``errors`` is non-empty.
+    """
+    rows, errors = [], []
+    reader = csv.DictReader(f)
+    missing = {"user_id", "date", "status"} - set(reader.fieldnames or ())
+    if missing:
+        return [], [f"missing column(s): {', '.join(sorted(missing))}"]
+
+    for line, record in enumerate(reader, start=2):
+        user_id = (record["user_id"] or "").strip()
+        day = (record["date"] or "").strip()
+        status = (record["status"] or "").strip()
+        try:
+            date.fromisoformat(day)
+        except ValueError:
+            errors.append(f"line {line}: invalid date {day!r} (use YYYY-MM-DD)")
+        else:
+            if not user_id.isdigit():
+                errors.append(f"line {line}: invalid user_id {user_id!r}")
+            elif status not in STATUSES:
+                errors.append(f"line {line}: invalid status {status!r}")
+            else:
+                rows.append((user_id, day, status))
+        if len(errors) >= max_errors:
+            break
+    return rows, errors
+
+
+async def import_attendance(store, rows):
+    """Upsert validated rows in one transaction (one flush, one lock hold)"""
+    # The loop below never awaits, so no other command can interleave with it;
+    # the transaction adds the cross-process lock when STORAGE_FILE_LOCK is set.
+    async with store.transaction("__bulk__"):
+        for user_id, day, status in rows:
+            if store.get(user_id, day) != status:
+                store.set(user_id, day, value=status)
+    await store.flush()
+    return len(rows)
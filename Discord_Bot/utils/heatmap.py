@@ -0,0 +1,228 @@
+# utils/heatmap.py
+"""Attendance heatmaps drawn straight into an RGB buffer and encoded as PNG.
+
+Only stdlib (zlib/struct) is used, so the bot never has to import
+matplotlib just to colour a few dozen squares.
+"""
+import struct
+import zlib
+from datetime import date, timedelta
+
+# ----------------- Colours -----------------
+BACKGROUND = (255, 255, 255)
+TEXT = (36, 41, 47)
+MUTED = (101, 109, 118)
+
+STATUS_COLORS = {
+    "Present": (45, 164, 78),
+    "Late": (240, 180, 60),
+    "Half-Day": (155, 233, 168),
+    "Absent": (232, 93, 93),
+    None: (235, 237, 240),  # no record
+}
+LEGEND = (("Present", "PRESENT"), ("Late", "LATE"), ("Half-Day", "HALF-DAY"), ("Absent", "ABSENT"), (None, "NO RECORD"))
+
+# ----------------- Font -----------------
+# 5x7 bitmap glyphs, one string per row. Text is drawn upper-case; anything
+# without a glyph is drawn as a space.
+GLYPH_W, GLYPH_H = 5, 7
+_GLYPHS = {
+    "A": ".###. #...# #...# ##### #...# #...# #...#",
+    "B": "####. #...# #...# ####. #...# #...# ####.",
+    "C": ".###. #...# #.... #.... #.... #...# .###.",
+    "D": "####. #...# #...# #...# #...# #...# ####.",
+    "E": "##### #.... #.... ####. #.... #.... #####",
+    "F": "##### #.... #.... ####. #.... #.... #....",
+    "G": ".###. #...# #.... #.### #...# #...# .####",
+    "H": "#...# #...# #...# ##### #...# #...# #...#",
+    "I": ".###. ..#.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "J": "..### ...#. ...#. ...#. ...#. #..#. .##..",
+    "K": "#...# #..#. #.#.. ##... #.#.. #..#. #...#",
+    "L": "#.... #.... #.... #.... #.... #.... #####",
+    "M": "#...# ##.## #.#.# #.#.# #...# #...# #...#",
+    "N": "#...# #...# ##..# #.#.# #..## #...# #...#",
+    "O": ".###. #...# #...# #...# #...# #...# .###.",
+    "P": "####. #...# #...# ####. #.... #.... #....",
+    "Q": ".###. #...# #...# #...# #.#.# #..#. .##.#",
+    "R": "####. #...# #...# ####. #.#.. #..#. #...#",
+    "S": ".#### #.... #.... .###. ....# ....# ####.",
+    "T": "##### ..#.. ..#.. ..#.. ..#.. ..#.. ..#..",
+    "U": "#...# #...# #...# #...# #...# #...# .###.",
+    "V": "#...# #...# #...# #...# #...# .#.#. ..#..",
+    "W": "#...# #...# #...# #.#.# #.#.# #.#.# .#.#.",
+    "X": "#...# #...# .#.#. ..#.. .#.#. #...# #...#",
+    "Y": "#...# #...# .#.#. ..#.. ..#.. ..#.. ..#..",
+    "Z": "##### ....# ...#. ..#.. .#... #.... #####",
+    "0": ".###. #...# #..## #.#.# ##..# #...# .###.",
+    "1": "..#.. .##.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "2": ".###. #...# ....# ...#. ..#.. .#... #####",
+    "3": "####. ....# ....# .###. ....# ....# ####.",
+    "4": "...#. ..##. .#.#. #..#. ##### ...#. ...#.",
+    "5": "##### #.... ####. ....# ....# #...# .###.",
+    "6": ".###. #.... #.... ####. #...# #...# .###.",
+    "7": "##### ....# ...#. ..#.. .#... .#... .#...",
+    "8": ".###. #...# #...# .###. #...# #...# .###.",
+    "9": ".###. #...# #...# .#### ....# ....# .###.",
+    "-": "..... ..... ..... ##### ..... ..... .....",
+    "_": "..... ..... ..... ..... ..... ..... #####",
+    ".": "..... ..... ..... ..... ..... .##.. .##..",
+    ",": "..... ..... ..... ..... .##.. ..#.. .#...",
+    ":": "..... .##.. .##.. ..... .##.. .##.. .....",
+    "(": "...#. ..#.. .#... .#... .#... ..#.. ...#.",
+    ")": ".#... ..#.. ...#. ...#. ...#. ..#.. .#...",
+    "/": "....# ...#. ...#. ..#.. .#... .#... #....",
+    "'": "..#.. ..#.. .#... ..... ..... ..... .....",
+    "#": ".#.#. .#.#. ##### .#.#. ##### .#.#. .#.#.",
+    "?": ".###. #...# ....# ...#. ..#.. ..... ..#..",
+}
+GLYPHS = {
+    char: tuple(tuple(x for x, bit in enumerate(row) if bit == "#") for row in rows.split())
+    for char, rows in _GLYPHS.items()
+}
+
+
+# ----------------- Canvas -----------------
+class Canvas:
+    """Minimal RGB raster with rectangles and bitmap text"""
+
+    def __init__(self, width, height, background=BACKGROUND):
+        self.width, self.height = width, height
+        self.pixels = bytearray(bytes(background) * (width * height))
+
+    def rect(self, x, y, w, h, color):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        span = bytes(color) * (x1 - x0)
+        for row in range(y0, y1):
+            start = (row * self.width + x0) * 3
+            self.pixels[start:start + len(span)] = span
+
+    def text(self, x, y, text, color=TEXT, scale=1):
+        """Draw ``text`` with its top-left corner at (x, y). Returns the width drawn."""
+        advance = (GLYPH_W + 1) * scale
+        for i, char in enumerate(text.upper()):
+            for row, cols in enumerate(GLYPHS.get(char, ())):
+                for col in cols:
+                    self.rect(x + i * advance + col * scale, y + row * scale, scale, scale, color)
+        return len(text) * advance
+
+    def png(self):
+        return encode_png(self.width, self.height, self.pixels)
+
+
+def text_width(text, scale=1):
+    return len(text) * (GLYPH_W + 1) * scale
+
+
+def encode_png(width, height, rgb):
+    """Encode 8-bit RGB pixels as a PNG file"""
+    stride = width * 3
+    raw = b"".join(b"\x00" + bytes(rgb[y * stride:(y + 1) * stride]) for y in range(height))
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _legend(canvas, x, y):
+    for status, label in LEGEND:
+        canvas.rect(x, y, 9, 9, STATUS_COLORS[status])
+        x += 13 + canvas.text(x + 13, y + 1, label, MUTED) + 8
+
+
+# ----------------- Charts -----------------
+CELL, GAP, PAD = 22, 3, 12
+
+
+def render_strip(title, dates, statuses):
+    """30-day strip: one square per day with its day number and month markers.
+
+    ``dates`` are ISO date strings, ``statuses`` the matching status or None.
+    """
+    width = max(PAD * 2 + len(dates) * (CELL + GAP) - GAP, PAD * 2 + text_width(title, 2), 380)
+    canvas = Canvas(width, 124)
+    canvas.text(PAD, PAD, title, scale=2)
+
+    top = PAD + 14 * 2
+    previous_month = None
+    for i, (day, status) in enumerate(zip(dates, statuses)):
+        x = PAD + i * (CELL + GAP)
+        canvas.rect(x, top, CELL, CELL, STATUS_COLORS.get(status, STATUS_COLORS[None]))
+        canvas.text(x + (CELL - text_width(day[8:10])) // 2 + 1, top + CELL + 4, day[8:10], MUTED)
+        month = date.fromisoformat(day).strftime("%b")
+        if month != previous_month:
+            canvas.text(x, top + CELL + 14, month)
+            previous_month = month
+
+    _legend(canvas, PAD, top + CELL + 32)
+    return canvas.png()
+
+
+def render_year(title, end, statuses_by_date):
+    """GitHub-style grid: one column per week (Mon-Sun) for the year ending ``end``.
+
+    ``end`` is an ISO date string; ``statuses_by_date`` maps ISO dates to statuses.
+    """
+    cell, gap = 11, 2
+    end_day = date.fromisoformat(end)
+    first = end_day - timedelta(days=364)
+    first -= timedelta(days=first.weekday())  # start on a Monday
+    weeks = (end_day - first).days // 7 + 1
+
+    left = PAD + text_width("MON") + 6
+    width = max(left + weeks * (cell + gap) + PAD, PAD * 2 + text_width(title, 2))
+    top = PAD + 14 * 2 + 12
+    canvas = Canvas(width, top + 7 * (cell + gap) + 34)
+    canvas.text(PAD, PAD, title, scale=2)
+
+    for row, label in ((0, "MON"), (2, "WED"), (4, "FRI")):
+        canvas.text(PAD, top + row * (cell + gap) + 2, label, MUTED)
+
+    day, previous_month = first, None
+    while day <= end_day:
+        week, weekday = (day - first).days // 7, day.weekday()
+        x = left + week * (cell + gap)
+        if weekday == 0 and day.month != previous_month:
+            canvas.text(x, top - 11, day.strftime("%b"), MUTED)
+            previous_month = day.month
+        status = statuses_by_date.get(day.isoformat())
+        canvas.rect(x, top + weekday * (cell + gap), cell, cell, STATUS_COLORS.get(status, STATUS_COLORS[None]))
+        day += timedelta(days=1)
+
+    _legend(canvas, left, top + 7 * (cell + gap) + 12)
+    return canvas.png()
+
+
+def render_team(title, dates, names, rows):
+    """Members x days grid for one team.
+
+    ``dates`` are ISO date strings, ``names`` the member labels and ``rows``
+    one list of statuses (or None) per member, aligned with ``dates``.
+    """
+    cell, gap = 12, 2
+    label_w = text_width("M" * 16) + 8
+    left, top = PAD + label_w, PAD + 14 * 2 + 12
+    width = max(left + len(dates) * (cell + gap) + PAD, PAD * 2 + text_width(title, 2), 380)
+    canvas = Canvas(width, top + len(names) * (cell + gap) + 34)
+    canvas.text(PAD, PAD, title, scale=2)
+
+    for col, day in enumerate(dates):
+        if col % 7 == 0 or col == len(dates) - 1:
+            canvas.text(left + col * (cell + gap), top - 11, day[8:10], MUTED)
+
+    for i, (name, statuses) in enumerate(zip(names, rows)):
+        y = top + i * (cell + gap)
+        canvas.text(PAD, y + 3, name[:16], TEXT)
+        for col, status in enumerate(statuses):
+            canvas.rect(left + col * (cell + gap), y, cell, cell, STATUS_COLORS.get(status, STATUS_COLORS[None]))
+
+    _legend(canvas, left, top + len(names) * (cell + gap) + 12)
+    return canvas.png()
@@ -0,0 +1,124 @@
+# utils/journal.py
+import os
+from utils import metrics
+from utils.aio import dumps, loads, read_json
+from utils.storage import apply_op, atomic_write, file_stamp
+
+# Seconds of writes batched into one fsync
+JOURNAL_FSYNC_DELAY = float(os.getenv("JOURNAL_FSYNC_DELAY", "0.2"))
+
+# Fold the journal into a fresh snapshot after this many records
+JOURNAL_COMPACT_EVERY = int(os.getenv("JOURNAL_COMPACT_EVERY", "10000"))
+
+
+# ----------------- Journal Backend -----------------
+class JournalBackend:
+    """Append-only journal + periodic snapshot.
+
+    For ``data/attendance.json`` the files are:
+    - ``data/attendance.snapshot.json``: ``{"seq": n, "data": {...}}``
+    - ``data/attendance.journal``: one ``[seq, op, keys, value]`` JSON line per change
+
+    Each flush appends the batched records and fsyncs once. Records with a seq
+    already folded into the snapshot are skipped on replay, so a crash between
+    writing the snapshot and truncating the journal is harmless.
+    """
+
+    journaled = True
+    flush_delay = JOURNAL_FSYNC_DELAY
+
+    def __init__(self, path, compact_every=JOURNAL_COMPACT_EVERY):
+        base = os.path.splitext(path)[0]
+        self.legacy_path = path
+        self.snapshot_path = f"{base}.snapshot.json"
+        self.journal_path = f"{base}.journal"
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0  # journal records since the last snapshot
+        self._file = None
+
+    # ----------------- Startup -----------------
+    def load(self):
+        if not os.path.exists(self.snapshot_path) and not os.path.exists(self.journal_path):
+            return self._migrate()
+
+        data, self.seq, self.pending = {}, 0, 0
+        if os.path.exists(self.snapshot_path):
+            snapshot = read_json(self.snapshot_path)
+            data, self.seq = snapshot["data"], snapshot["seq"]
+
+        if os.path.exists(self.journal_path):
+            good = 0  # byte offset after the last intact record
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        seq, op, keys, value = loads(line)
+                    except ValueError:
+                        break
+                    good += len(line)
+                    if seq <= self.seq:
+                        continue
+                    apply_op(data, op, keys, value)
+                    self.seq = seq
+                    self.pending += 1
+            metrics.count_bytes("read", good)
+            if good < os.path.getsize(self.journal_path):
+                # Torn final write from a crash: drop it so new records follow intact ones
+                os.truncate(self.journal_path, good)
+        return data
+
+    def _migrate(self):
+        """One-shot import of the old whole-file layout into a snapshot"""
+        data = {}
+        if os.path.exists(self.legacy_path):
+            data = read_json(self.legacy_path)
+            atomic_write(self.snapshot_path, dumps({"seq": 0, "data": data}))
+            print(f"🔄 Migrated {self.legacy_path} to {self.snapshot_path}")
+        return data
+
+    # ----------------- Writes -----------------
+    def prepare(self, data, records):
+        lines = []
+        for record in records:
+            self.seq += 1
+            lines.append(f"[{self.seq},{record[1:]}\n")
+        self.pending += len(records)
+
+        snapshot = None
+        if self.pending >= self.compact_every:
+            snapshot = dumps({"seq": self.seq, "data": data})
+            self.pending = 0
+        return "".join(lines), snapshot
+
+    def write(self, payload):
+        lines, snapshot = payload
+        if lines:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+                self._file = open(self.journal_path, "a", encoding="utf-8")
+            start = self._file.tell()
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            metrics.count_bytes("written", self._file.tell() - start)
+        if snapshot is not None:
+            self._compact(snapshot)
+
+    def stamp(self):
+        return file_stamp(self.snapshot_path, self.journal_path)
+
+    def _compact(self, snapshot):
+        atomic_write(self.snapshot_path, snapshot)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self.journal_path, "w").close()
+
+    def close(self, data):
+        """Fold the journal into the snapshot so the next start replays nothing"""
+        if self.pending:
+            self._compact(dumps({"seq": self.seq, "data": data}))
+            self.pending = 0
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,75 @@
+# utils/lazy.py
+"""Deferred imports for heavy dependencies.
+
+A cog (or util) that only needs a big library inside a few commands
+declares it with ``lazy_import`` instead of a top-level ``import``; the
+module is imported on first attribute access, i.e. the first time one of
+those commands runs, instead of on the start-up path.
+
+    analytics = lazy_import("utils.analytics")  # pulls in NumPy
+    ...
+    stats = analytics.team_stats(...)
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+import types
+
+_lazy = {}  # module name -> LazyModule, for the startup report
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in that imports the real module on first attribute access"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_seconds"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    t = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_seconds"] = time.perf_counter() - t
+                    self.__dict__["_lazy_module"] = module
+                    print(f"📦 Imported {self.__name__} on first use ({self._lazy_seconds * 1000:.0f} ms)")
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def loaded(self):
+        return self.__dict__["_lazy_module"] is not None
+
+
+def lazy_import(name, optional=False):
+    """Module proxy for ``name``, imported on first use.
+
+    Already-imported modules are returned as-is. With ``optional=True`` a
+    module that is not installed gives ``None`` (checked without importing it).
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if optional and importlib.util.find_spec(name) is None:
+        return None
+    proxy = _lazy.get(name)
+    if proxy is None:
+        proxy = _lazy[name] = LazyModule(name)
+    return proxy
+
+
+def lazy_report():
+    """``{name: seconds to import, or None while still deferred}``"""
+    return {name: proxy._lazy_seconds for name, proxy in _lazy.items()}
@@ -0,0 +1,113 @@
+# utils/loader.py
+"""Concurrent cog loading with a per-cog startup report.
+
+Cogs are discovered in the ``cogs`` folder next to ``main.py`` (not the
+working directory), so the bot starts the same from any folder. Every cog
+is imported and set up concurrently and independently: one that fails to
+import or whose ``setup()`` raises is reported and skipped without
+holding the others up.
+
+The report (printed, and written to ``data/startup_report.json``) splits
+each cog's time into:
+- import: executing the cog module and everything it imports first
+- setup:  ``bot.load_extension`` (``setup()``, ``add_cog``, ``cog_load``),
+  handed the module imported above so its body runs only once
+Dependencies declared with ``utils.lazy.lazy_import`` are listed as
+deferred until a command first uses them.
+"""
+import asyncio
+import importlib
+import importlib.abc
+import importlib.util
+import time
+import traceback
+from pathlib import Path
+from utils.aio import save_json
+from utils.lazy import lazy_report
+
+STARTUP_REPORT_FILE = "data/startup_report.json"
+
+
+def discover(directory):
+    """Extension names (``"<folder>.<module>"``) for the ``*.py`` files in ``directory``"""
+    directory = Path(directory)
+    return [f"{directory.name}.{path.stem}" for path in sorted(directory.glob("*.py")) if not path.stem.startswith("_")]
+
+
+class _Imported(importlib.abc.Loader):
+    """Loader that gives ``load_extension`` an already executed module instead of running it again"""
+
+    def __init__(self, module):
+        self.module = module
+
+    def create_module(self, spec):
+        return self.module
+
+    def exec_module(self, module):
+        pass
+
+
+async def _load(bot, name, import_lock):
+    entry = {"cog": name, "ok": False, "import_ms": None, "setup_ms": None, "error": None}
+    stage = "import"
+    try:
+        # One import at a time, off the event loop: imports hold the GIL, so
+        # overlapping them only adds contention (and blurs the per-cog times)
+        async with import_lock:
+            t = time.perf_counter()
+            module = await asyncio.to_thread(importlib.import_module, name)
+            entry["import_ms"] = (time.perf_counter() - t) * 1000
+
+        stage = "setup"
+        t = time.perf_counter()
+        # load_extension builds the module from its spec; point the spec at the
+        # imported module for this call, so it only awaits setup()
+        spec = module.__spec__
+        module.__spec__ = importlib.util.spec_from_loader(name, _Imported(module), origin=spec.origin)
+        try:
+            await bot.load_extension(name)
+        finally:
+            module.__spec__ = spec
+        entry["setup_ms"] = (time.perf_counter() - t) * 1000
+        entry["ok"] = True
+    except Exception as e:
+        cause = e.__cause__ or e  # load_extension wraps errors in ExtensionFailed
+        entry["error"] = f"{stage}: {type(cause).__name__}: {cause}"
+        entry["traceback"] = "".join(traceback.format_exception(cause))
+    return entry
+
+
+async def load_cogs(bot, directory, report_path=STARTUP_REPORT_FILE):
+    """Load every cog in ``directory`` concurrently and return the startup report"""
+    t = time.perf_counter()
+    import_lock = asyncio.Lock()
+    cogs = await asyncio.gather(*(_load(bot, name, import_lock) for name in discover(directory)))
+    report = {
+        "total_ms": (time.perf_counter() - t) * 1000,
+        "cogs": cogs,
+        "deferred": lazy_report(),
+        "ready_ms": None,
+    }
+    print_report(report)
+    await save_report(report, report_path)
+    return report
+
+
+def print_report(report):
+    for entry in sorted(report["cogs"], key=lambda e: e["cog"]):
+        if entry["ok"]:
+            print(f"✅ Loaded cog: {entry['cog']} (import {entry['import_ms']:.0f} ms, setup {entry['setup_ms']:.0f} ms)")
+        else:
+            print(f"❌ Failed to load cog {entry['cog']}: {entry['error']}")
+    deferred = [name for name, seconds in report["deferred"].items() if seconds is None]
+    if deferred:
+        print(f"💤 Deferred until first use: {', '.join(deferred)}")
+    loaded = sum(entry["ok"] for entry in report["cogs"])
+    print(f"📋 {loaded}/{len(report['cogs'])} cogs loaded in {report['total_ms']:.0f} ms")
+
+
+async def save_report(report, path=STARTUP_REPORT_FILE):
+    try:
+        await save_json(path, report, indent=True)
+    except OSError as e:
+        print(f"❌ Failed to write startup report: {e}")
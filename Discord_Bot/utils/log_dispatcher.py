@@ -0,0 +1,111 @@
+# utils/log_dispatcher.py
+import asyncio
+import os
+import discord
+
+LOG_CHANNEL_NAME = os.getenv("LOG_CHANNEL_NAME", "fapps-bot-logs")
+
+# Seconds between sends; a burst of events inside one interval becomes one message
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2.0"))
+
+MESSAGE_LIMIT = 2000
+
+_dispatcher = None
+
+
+# ----------------- Log Dispatcher -----------------
+class LogDispatcher:
+    """Batches log lines per guild and posts them to the logs channel in the background.
+
+    ``log()`` never awaits, so commands can respond first. The logs channel
+    is looked up by name once per guild and its ID cached.
+    """
+
+    def __init__(self, bot, channel_name=LOG_CHANNEL_NAME, interval=LOG_FLUSH_INTERVAL):
+        self.bot = bot
+        self.channel_name = channel_name
+        self.interval = interval
+        self._queues = {}       # guild_id -> [lines]
+        self._channel_ids = {}  # guild_id -> channel_id (None = no logs channel)
+        self._task = None
+
+    def log(self, guild, message):
+        """Queue ``message`` for ``guild``'s logs channel (non-blocking)"""
+        self._queues.setdefault(guild.id, []).append(message)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def invalidate(self, guild_id):
+        """Forget the cached channel (e.g. after it was renamed or deleted)"""
+        self._channel_ids.pop(guild_id, None)
+
+    def _resolve(self, guild_id):
+        if guild_id in self._channel_ids:
+            channel_id = self._channel_ids[guild_id]
+            return self.bot.get_channel(channel_id) if channel_id else None
+
+        guild = self.bot.get_guild(guild_id)
+        channel = discord.utils.get(guild.text_channels, name=self.channel_name) if guild else None
+        self._channel_ids[guild_id] = channel.id if channel else None
+        return channel
+
+    # ----------------- Sending -----------------
+    async def _run(self):
+        while self._queues:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        """Send everything queued so far, one or a few messages per guild"""
+        queues, self._queues = self._queues, {}
+        for guild_id, lines in queues.items():
+            channel = self._resolve(guild_id)
+            if channel is None:
+                continue
+            for message in chunk_lines(lines):
+                await self._send(channel, message)
+
+    async def _send(self, channel, message, attempts=3):
+        for attempt in range(attempts):
+            try:
+                await channel.send(message)
+                return
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == attempts - 1:
+                    print(f"❌ Failed to send log message: {e}")
+                    return
+                # discord.py already retries rate limits; back off further if one still escapes
+                await asyncio.sleep(float(getattr(e.response, "headers", {}).get("Retry-After", 2 ** attempt)))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+def chunk_lines(lines, limit=MESSAGE_LIMIT):
+    """Join lines into as few messages as possible, each within Discord's limit"""
+    message = ""
+    for line in lines:
+        line = line[:limit]
+        if message and len(message) + 1 + len(line) > limit:
+            yield message
+            message = line
+        else:
+            message = f"{message}\n{line}" if message else line
+    if message:
+        yield message
+
+
+def get_dispatcher(bot):
+    """Return the process-wide log dispatcher"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = LogDispatcher(bot)
+    return _dispatcher
+
+
+def log_to_channel(bot, guild, message):
+    """Queue a line for the guild's logs channel"""
+    get_dispatcher(bot).log(guild, message)
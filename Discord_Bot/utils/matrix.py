@@ -0,0 +1,190 @@
+# utils/matrix.py
+"""Compact attendance matrix: one byte per person-day, for fast range queries.
+
+Each user gets a row (a ``bytearray``); column ``i`` is day ``start + i``.
+Statuses are stored as small codes, 0 meaning "no record". Counting a
+range is a ``bytearray.count`` over a slice, which runs in C. NumPy is
+optional: when installed, :meth:`AttendanceMatrix.block` returns a 2-D
+``uint8`` array for whole-team operations (imported on its first call).
+
+The matrix is an index next to the store's nested dict, not a replacement:
+every backend, export and event view reads the dict. What makes the dict
+expensive is one fresh key string and one fresh status string per
+person-day as parsed from JSON, so building the matrix also makes the dict
+share them (:func:`share_strings`). That cuts the loaded attendance data to
+about a fifth; the matrix itself adds about one byte per person-day (see
+benchmarks/attendance_memory.py).
+"""
+import sys
+from datetime import date, timedelta
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy", optional=True)  # None when not installed; only block() needs it
+
+STATUSES = ("Present", "Late", "Half-Day", "Absent")
+CODES = {status: code for code, status in enumerate(STATUSES, start=1)}
+NO_RECORD = 0
+
+
+_SHARED_STATUSES = {status: status for status in STATUSES}
+
+
+def share_strings(data):
+    """Rebuild each ``{date: status}`` dict in place with shared key and value strings.
+
+    A JSON load gives every person-day its own date and status string; dates
+    are interned (each day is stored once, whoever has a record on it) and
+    statuses replaced by the STATUSES constants.
+    """
+    for dates in data.values():
+        items = [(sys.intern(day), _SHARED_STATUSES.get(status, status)) for day, status in dates.items()]
+        dates.clear()
+        dates.update(items)
+
+
+def day_number(iso):
+    return date.fromisoformat(iso).toordinal()
+
+
+def record_day(iso):
+    """Day number of a stored date key, or None when it cannot be read.
+
+    Older files may hold unpadded keys ("2024-1-5"); those are read as the
+    same day. Anything else is skipped so one bad key cannot break every query.
+    """
+    try:
+        return day_number(iso)
+    except (TypeError, ValueError):
+        pass
+    try:
+        year, month, day = (int(part) for part in iso.split("-"))
+        return date(year, month, day).toordinal()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def month_range(month):
+    """First and last ISO date of a "YYYY-MM" month"""
+    first = date.fromisoformat(f"{month}-01")
+    following = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first.isoformat(), (following - timedelta(days=1)).isoformat()
+
+
+# ----------------- Attendance Matrix -----------------
+class AttendanceMatrix:
+    """Store index holding attendance as ``user row x day column`` status codes.
+
+    Rows only grow as far as the user's latest record, so a new hire does not
+    pay for years of empty columns. Dates before the current first column
+    shift every row once (rare: only backdated edits).
+    """
+
+    def __init__(self):
+        self.rows = {}     # user_id -> bytearray of codes
+        self.start = None  # ordinal of column 0
+
+    def rebuild(self, data):
+        share_strings(data)  # only attendance stores carry the matrix
+        self.rows.clear()
+        entries, skipped = [], []
+        for user_id, dates in data.items():
+            for iso, status in dates.items():
+                day = record_day(iso)
+                if day is None:
+                    skipped.append(f"{user_id}/{iso}")
+                else:
+                    entries.append((user_id, day, CODES.get(status, NO_RECORD)))
+        if skipped:
+            print(f"⚠️ Attendance matrix skipped {len(skipped)} record(s) with unreadable dates: {', '.join(skipped[:10])}")
+
+        self.start = min(day for _, day, _ in entries) if entries else None
+        for user_id, day, code in entries:
+            self._set(user_id, day, code)
+
+    def update(self, user_id, date, old, new):
+        day = record_day(date)
+        if day is None:
+            print(f"⚠️ Attendance matrix skipped {user_id}/{date}: unreadable date")
+            return
+        self._set(user_id, day, NO_RECORD if new is None else CODES.get(new, NO_RECORD))
+
+    def _set(self, user_id, day, code):
+        if self.start is None:
+            self.start = day
+        elif day < self.start:
+            pad = bytes(self.start - day)
+            for row in self.rows.values():
+                row[:0] = pad
+            self.start = day
+
+        row = self.rows.setdefault(user_id, bytearray())
+        col = day - self.start
+        if col >= len(row):
+            if code == NO_RECORD:
+                return
+            row.extend(bytes(col + 1 - len(row)))
+        row[col] = code
+
+    def _bounds(self, since=None, until=None):
+        """Column slice for an inclusive ISO date range (None = open end)"""
+        if self.start is None:
+            return 0, 0
+        lo = 0 if since is None else max(day_number(since) - self.start, 0)
+        hi = None if until is None else max(day_number(until) - self.start + 1, 0)
+        return lo, hi
+
+    # ----------------- Queries -----------------
+    def counts(self, user_id, since=None, until=None):
+        """Status counts for one user over an inclusive date range"""
+        return self.team((user_id,), since, until)
+
+    def team(self, user_ids, since=None, until=None):
+        """Summed status counts for a group of users"""
+        lo, hi = self._bounds(since, until)
+        summary = dict.fromkeys(STATUSES, 0)
+        for user_id in user_ids:
+            row = self.rows.get(user_id)
+            if row:
+                part = row[lo:hi]
+                for status, code in CODES.items():
+                    summary[status] += part.count(code)
+        return summary
+
+    def statuses(self, user_id, since, days):
+        """Status names (None = no record) for ``days`` consecutive days from ``since``"""
+        row = self.rows.get(user_id, b"")
+        first = day_number(since) - (self.start or 0)
+        out = []
+        for col in range(first, first + days):
+            code = row[col] if 0 <= col < len(row) else NO_RECORD
+            out.append(STATUSES[code - 1] if code else None)
+        return out
+
+    def block(self, user_ids, since, until):
+        """``len(user_ids) x days`` uint8 array of codes for an inclusive date range (needs NumPy)"""
+        if np is None:
+            raise RuntimeError("NumPy is required for AttendanceMatrix.block()")
+        first, last = day_number(since), day_number(until)
+        out = np.zeros((len(user_ids), last - first + 1), dtype=np.uint8)
+        if self.start is None:
+            return out
+        lo = first - self.start
+        for i, user_id in enumerate(user_ids):
+            row = self.rows.get(user_id)
+            if not row:
+                continue
+            a, b = max(lo, 0), min(lo + out.shape[1], len(row))
+            if a < b:
+                out[i, a - lo:b - lo] = np.frombuffer(row, dtype=np.uint8, count=b - a, offset=a)
+        return out
+
+    def nbytes(self):
+        return sum(len(row) for row in self.rows.values())
+
+
+def get_matrix(store):
+    """Return the attendance matrix index for ``store``, building it on first use"""
+    index = store.indexes.get("matrix")
+    if index is None:
+        index = store.add_index("matrix", AttendanceMatrix())
+    return index
@@ -0,0 +1,302 @@
+# utils/metrics.py
+"""Interaction latency, event-loop lag and storage I/O metrics.
+
+Enabled with METRICS=1; otherwise nothing is installed and the hooks
+elsewhere cost one context-variable lookup.
+
+Each app command and UI callback gets a :class:`Span` (stored in a
+context variable for the duration of the handler). The layers that
+already time their own work report into it, so every interaction's
+latency is split into:
+- storage: calls through utils/aio.py (file reads/writes, SQLite)
+- render:  chart rendering in the process pool (utils/render.py)
+- discord: Discord HTTP requests, including interaction responses
+and the rest is the handler's own work on the loop. A probe task measures
+event-loop lag (how late a sleep wakes up).
+
+Metrics are served in the Prometheus text format on METRICS_HOST:METRICS_PORT
+(``/metrics``) and summarised by the admin /botstats command.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import namedtuple
+
+METRICS_ENABLED = os.getenv("METRICS", "0") == "1"
+
+# Where the Prometheus endpoint listens (local only by default)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Seconds between event-loop lag probes
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("total", "storage", "render", "discord")
+
+_span = contextvars.ContextVar("metrics_span", default=None)
+_background = set()  # probe task and server, referenced so they are not collected
+STARTED = time.time()
+
+
+# ----------------- Histograms -----------------
+class Histogram:
+    """Cumulative-bucket histogram in seconds (Prometheus semantics)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (None if empty)"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+
+class Registry:
+    def __init__(self):
+        self.commands = {}  # (command, phase) -> Histogram
+        self.errors = {}    # command -> count
+        self.storage_calls = Histogram()
+        self.loop_lag = Histogram(buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+        self.storage_bytes = {"read": 0, "written": 0}
+        self._bytes_lock = threading.Lock()  # bumped from storage I/O threads
+
+    def command(self, name, phase):
+        histogram = self.commands.get((name, phase))
+        if histogram is None:
+            histogram = self.commands[(name, phase)] = Histogram()
+        return histogram
+
+
+registry = Registry()
+
+
+# ----------------- Spans -----------------
+class Span:
+    __slots__ = ("start", "storage", "render", "discord", "done")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.storage = self.render = self.discord = 0.0
+        self.done = False
+
+
+def begin():
+    """Start timing the current interaction handler"""
+    span = Span()
+    _span.set(span)
+    return span
+
+
+def finish(name, span, error=False):
+    """Record a finished handler's latency split"""
+    if span is None or span.done:
+        return
+    span.done = True  # background work spawned by the handler may report later; ignore it
+    registry.command(name, "total").observe(time.perf_counter() - span.start)
+    for phase in PHASES[1:]:
+        registry.command(name, phase).observe(getattr(span, phase))
+    if error:
+        registry.errors[name] = registry.errors.get(name, 0) + 1
+
+
+def add(phase, seconds):
+    """Attribute ``seconds`` of storage/render/discord time to the current interaction"""
+    span = _span.get()
+    if span is not None and not span.done:
+        setattr(span, phase, getattr(span, phase) + seconds)
+
+
+def storage_call(seconds):
+    add("storage", seconds)
+    if METRICS_ENABLED:
+        registry.storage_calls.observe(seconds)
+
+
+def count_bytes(direction, n):
+    if METRICS_ENABLED:
+        with registry._bytes_lock:
+            registry.storage_bytes[direction] += n
+
+
+def timed(name):
+    """Decorator for UI callbacks (``callback(self, interaction, ...)``); a no-op when disabled"""
+    def decorator(callback):
+        if not METRICS_ENABLED:
+            return callback
+
+        @functools.wraps(callback)
+        async def wrapper(self, interaction, *args, **kwargs):
+            token = _span.set(Span())
+            error = False
+            try:
+                return await callback(self, interaction, *args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                finish(name, _span.get(), error)
+                _span.reset(token)
+        return wrapper
+    return decorator
+
+
+# ----------------- discord.py Hooks -----------------
+def _command_name(interaction):
+    command = interaction.command
+    return command.qualified_name if command is not None else "unknown"
+
+
+def make_tree_cls():
+    """CommandTree subclass that times every app command (pass as ``tree_cls``)"""
+    import discord
+    from discord import app_commands
+
+    class MetricsTree(app_commands.CommandTree):
+        async def interaction_check(self, interaction):
+            if interaction.type is not discord.InteractionType.autocomplete:
+                interaction.extras["metrics_span"] = begin()
+            return True
+
+        async def on_error(self, interaction, error):
+            finish(_command_name(interaction), interaction.extras.get("metrics_span"), error=True)
+            await super().on_error(interaction, error)
+
+    return MetricsTree
+
+
+def _timed_request(request):
+    @functools.wraps(request)
+    async def wrapper(*args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        finally:
+            add("discord", time.perf_counter() - t)
+    return wrapper
+
+
+async def install_metrics(bot):
+    """Time Discord HTTP calls, start the lag probe and the endpoint (call from setup_hook)"""
+    from discord.webhook.async_ import async_context
+
+    # REST calls, and interaction responses/followups (sent through the webhook adapter)
+    bot.http.request = _timed_request(bot.http.request)
+    adapter = async_context.get()
+    adapter.request = _timed_request(adapter.request)
+
+    async def on_app_command_completion(interaction, command):
+        finish(command.qualified_name, interaction.extras.get("metrics_span"))
+
+    bot.add_listener(on_app_command_completion)
+    _background.add(asyncio.get_running_loop().create_task(_probe_loop_lag()))
+    try:
+        _background.add(await asyncio.start_server(_serve, METRICS_HOST, METRICS_PORT))
+        print(f"📈 Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    except OSError as e:
+        print(f"❌ Failed to start metrics endpoint: {e}")
+
+
+# ----------------- Event Loop Lag -----------------
+async def _probe_loop_lag(interval=LOOP_LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        t = loop.time()
+        await asyncio.sleep(interval)
+        registry.loop_lag.observe(max(loop.time() - t - interval, 0.0))
+
+
+# ----------------- Prometheus Export -----------------
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name, histogram, **labels):
+    seen = 0
+    for bound, n in zip(histogram.buckets + ("+Inf",), histogram.counts):
+        seen += n
+        yield f"{name}_bucket{_labels(**labels, le=bound)} {seen}"
+    yield f"{name}_sum{_labels(**labels) if labels else ''} {histogram.sum}"
+    yield f"{name}_count{_labels(**labels) if labels else ''} {histogram.count}"
+
+
+def render_prometheus():
+    lines = [
+        "# HELP bot_interaction_seconds Interaction handling time by command and phase",
+        "# TYPE bot_interaction_seconds histogram",
+    ]
+    for (command, phase), histogram in sorted(registry.commands.items()):
+        lines.extend(_histogram_lines("bot_interaction_seconds", histogram, command=command, phase=phase))
+    lines += ["# HELP bot_interaction_errors_total Interaction handlers that raised", "# TYPE bot_interaction_errors_total counter"]
+    lines += [f"bot_interaction_errors_total{_labels(command=c)} {n}" for c, n in sorted(registry.errors.items())]
+    lines += ["# HELP bot_loop_lag_seconds How late the event loop ran a scheduled wake-up", "# TYPE bot_loop_lag_seconds histogram"]
+    lines.extend(_histogram_lines("bot_loop_lag_seconds", registry.loop_lag))
+    lines += ["# HELP bot_storage_call_seconds Storage I/O calls (including queueing)", "# TYPE bot_storage_call_seconds histogram"]
+    lines.extend(_histogram_lines("bot_storage_call_seconds", registry.storage_calls))
+    lines += ["# HELP bot_storage_bytes_total Bytes read from and written to storage", "# TYPE bot_storage_bytes_total counter"]
+    lines += [f"bot_storage_bytes_total{_labels(direction=d)} {n}" for d, n in registry.storage_bytes.items()]
+    lines += ["# HELP bot_uptime_seconds Seconds since the process started", "# TYPE bot_uptime_seconds gauge"]
+    lines.append(f"bot_uptime_seconds {time.time() - STARTED:.0f}")
+    return "\n".join(lines) + "\n"
+
+
+async def _serve(reader, writer):
+    try:
+        request = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # skip headers
+        parts = request.split()
+        if len(parts) >= 2 and parts[1] in (b"/metrics", b"/"):
+            status, body = "200 OK", render_prometheus().encode()
+        else:
+            status, body = "404 Not Found", b"not found\n"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+# ----------------- Summary -----------------
+CommandStats = namedtuple("CommandStats", "name count errors p50 p95 storage render discord")
+
+
+def command_summary():
+    """Per-command stats (means for the phase split), busiest first"""
+    rows = []
+    for (name, phase), total in list(registry.commands.items()):
+        if phase != "total":
+            continue
+        rows.append(CommandStats(
+            name, total.count, registry.errors.get(name, 0), total.quantile(0.5), total.quantile(0.95),
+            registry.command(name, "storage").mean, registry.command(name, "render").mean, registry.command(name, "discord").mean,
+        ))
+    return sorted(rows, key=lambda r: r.count, reverse=True)
@@ -0,0 +1,215 @@
+# utils/policy.py
+"""Per-guild / per-role punch-in policy, compiled into minute lookup tables.
+
+``data/policy.json`` (every key optional; missing values fall back to the
+level above, then to DEFAULT_SHIFT)::
+
+    {
+      "default": {"timezone": "Europe/London", "start": "09:30", ...},
+      "guilds": {
+        "<guild_id>": {
+          "default": {...},
+          "roles": {"<role_id>": {"start": "13:00", "end": "14:00", ...}}
+        }
+      }
+    }
+
+A punch-in at local minute ``m`` is Present up to ``start + grace_minutes``,
+Late up to ``half_day_after``, Half-Day up to ``end``, and refused outside
+``start..end`` or on a day not in ``punch_in_days``. ``workdays`` are the
+days attendance is expected: close-out writes Absent and /attendance_stats
+counts the rate only on those. The file is re-read when it changes, without a restart
+(checked in the storage pool; lookups never wait for the disk).
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from utils import aio
+from utils.storage import file_stamp
+
+POLICY_FILE = "data/policy.json"
+
+# Seconds between checks of policy.json for changes
+POLICY_RELOAD_INTERVAL = float(os.getenv("POLICY_RELOAD_INTERVAL", "5"))
+
+# The original fixed 09:30-10:30 window, everything inside it Present
+DEFAULT_SHIFT = {
+    "timezone": None,  # None = the server's local time
+    "start": "09:30",
+    "end": "10:30",
+    "grace_minutes": 60,
+    "half_day_after": "10:30",
+    "workdays": [0, 1, 2, 3, 4],  # Monday = 0; days attendance is expected
+    "punch_in_days": [0, 1, 2, 3, 4, 5, 6],  # every day, like the original window
+}
+
+REFUSED, PRESENT, LATE, HALF_DAY = 0, 1, 2, 3
+STATUS_NAMES = {PRESENT: "Present", LATE: "Late", HALF_DAY: "Half-Day"}
+
+
+def _minutes(hhmm):
+    """Minute of the day for "HH:MM" (00:00-23:59); ValueError for anything else"""
+    try:
+        hours, minutes = map(int, str(hhmm).split(":"))
+    except ValueError:
+        raise ValueError(f"invalid time {hhmm!r}, use HH:MM") from None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"invalid time {hhmm!r}, use 00:00-23:59")
+    return hours * 60 + minutes
+
+
+# ----------------- Compiled Shift -----------------
+class Shift:
+    """One shift definition with a 1440-entry minute -> outcome table"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.tz = ZoneInfo(spec["timezone"]) if spec["timezone"] else None
+        self.workdays = frozenset(spec["workdays"])
+        self.punch_in_days = frozenset(spec["punch_in_days"])
+        start, end = _minutes(spec["start"]), _minutes(spec["end"])
+        if start > end:
+            raise ValueError(f"shift start {spec['start']} is after its end {spec['end']} (windows can't cross midnight)")
+        self.end = end
+        on_time = start + int(spec["grace_minutes"])
+        half_day = _minutes(spec["half_day_after"])
+
+        self.table = bytearray(24 * 60)
+        for minute in range(start, end + 1):
+            if minute <= on_time:
+                self.table[minute] = PRESENT
+            elif minute <= half_day:
+                self.table[minute] = LATE
+            else:
+                self.table[minute] = HALF_DAY
+
+    def local(self, now=None):
+        """``now`` (aware, default: current time) in the shift's timezone"""
+        now = now or datetime.now(timezone.utc)
+        return now.astimezone(self.tz)
+
+    def classify(self, now=None):
+        """Return ``(status or None if refused, local datetime)`` for a punch-in at ``now``"""
+        local = self.local(now)
+        outcome = self.table[local.hour * 60 + local.minute]
+        if local.weekday() not in self.punch_in_days:
+            outcome = REFUSED
+        return STATUS_NAMES.get(outcome), local
+
+    def works_on(self, day):
+        """Whether attendance is expected on ``day`` (close-out and stats)"""
+        return day.weekday() in self.workdays
+
+    def ends_at(self, day):
+        """Aware datetime when the punch-in window closes on ``day`` (the end minute is still open)"""
+        moment = datetime.combine(day, dtime(self.end // 60, self.end % 60)) + timedelta(minutes=1)
+        return moment.replace(tzinfo=self.tz) if self.tz else moment.astimezone()
+
+    def window(self):
+        return f"{self.spec['start']}–{self.spec['end']}" + (f" ({self.spec['timezone']})" if self.tz else "")
+
+
+# ----------------- Policy -----------------
+class Policy:
+    """Resolves the shift for a guild member; reloads ``path`` when it changes"""
+
+    def __init__(self, path=POLICY_FILE, reload_interval=POLICY_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._stamp = None
+        self._checked = 0.0
+        self.default = Shift(DEFAULT_SHIFT)
+        self.guilds = {}  # guild_id -> (default Shift, {role_id: Shift})
+        self._reload_task = None
+        self._maybe_reload(force=True)
+
+    def reload(self):
+        """Re-read and compile the file now (blocking)"""
+        self._checked = time.monotonic()
+        self._stamp = file_stamp(self.path)  # set first: a bad file is not retried until it changes
+        self._compile(aio.read_json(self.path, {}))
+
+    def _compile(self, config):
+        base = {**DEFAULT_SHIFT, **config.get("default", {})}
+        default, guilds = Shift(base), {}
+        for guild_id, guild in config.get("guilds", {}).items():
+            guild_base = {**base, **guild.get("default", {})}
+            roles = {int(role_id): Shift({**guild_base, **spec}) for role_id, spec in guild.get("roles", {}).items()}
+            guilds[int(guild_id)] = (Shift(guild_base), roles)
+        # Swap in only once everything compiled, so a bad edit keeps the old policy
+        self.default, self.guilds = default, guilds
+
+    def _maybe_reload(self, force=False):
+        if not force and time.monotonic() - self._checked < self.reload_interval:
+            return
+        self._checked = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if force or loop is None:
+            # Start-up and scripts: check inline
+            if force or file_stamp(self.path) != self._stamp:
+                self._try(self.reload, announce=not force)
+        elif self._reload_task is None or self._reload_task.done():
+            # On the loop: stat and read in the storage pool; this lookup keeps the current policy
+            self._reload_task = loop.create_task(self._reload_in_pool())
+
+    def _read_if_changed(self):
+        """(stamp, file bytes); bytes is None when unchanged since the last load"""
+        stamp = file_stamp(self.path)
+        if stamp == self._stamp:
+            return stamp, None
+        try:
+            with open(self.path, "rb") as f:
+                return stamp, f.read()
+        except FileNotFoundError:
+            return stamp, b"{}"
+
+    async def _reload_in_pool(self):
+        stamp, raw = await aio.run(self._read_if_changed, label=f"read {self.path}")
+        if raw is not None:
+            self._stamp = stamp
+            self._try(lambda: self._compile(aio.loads(raw)), announce=True)
+
+    def _try(self, reload, announce):
+        try:
+            reload()
+            if announce:
+                print(f"🔄 Reloaded {self.path}")
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"❌ Invalid {self.path}, keeping the previous policy: {e}")
+
+    def shift_for(self, guild_id=None, role_ids=()):
+        """Shift for a member: their highest configured role, else the guild default.
+
+        ``role_ids`` should be ordered highest role first.
+        """
+        self._maybe_reload()
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            return self.default
+        default, roles = guild
+        for role_id in role_ids:
+            shift = roles.get(role_id)
+            if shift is not None:
+                return shift
+        return default
+
+    def shift_for_member(self, member):
+        guild = getattr(member, "guild", None)
+        roles = [r.id for r in reversed(getattr(member, "roles", ()))]
+        return self.shift_for(guild.id if guild else None, roles)
+
+
+_policy = None
+
+
+def get_policy():
+    """Return the process-wide policy"""
+    global _policy
+    if _policy is None:
+        _policy = Policy()
+    return _policy
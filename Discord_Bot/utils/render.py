@@ -0,0 +1,105 @@
+# utils/render.py
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from utils import metrics
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+
+# Upper bound on cached PNG bytes across all users
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+_pool = None
+
+
+# ----------------- Pool -----------------
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # forkserver/spawn: never fork the bot process with its event loop and threads
+        method = "spawn" if sys.platform == "win32" else "forkserver"
+        _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+async def render(func, *args):
+    """Run a chart function (see utils.heatmap) in the process pool and return its PNG bytes"""
+    loop = asyncio.get_running_loop()
+    t = time.perf_counter()
+    try:
+        return await loop.run_in_executor(_get_pool(), func, *args)
+    finally:
+        metrics.add("render", time.perf_counter() - t)
+
+
+# ----------------- Cache -----------------
+class RenderCache:
+    """LRU cache of rendered PNG bytes, bounded by total size.
+
+    Keys are ``(chart, user_id, window_end, version)`` where version is the
+    store's change counter for that user. It is attached to the attendance
+    store as an index, so any write to a user also evicts their entries.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> png bytes
+        self._by_user = {}             # user_id -> set of keys
+
+    def get(self, key):
+        png = self._entries.get(key)
+        if png is not None:
+            self._entries.move_to_end(key)
+        return png
+
+    def put(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = png
+        self._by_user.setdefault(key[1], set()).add(key)
+        self.size += len(png)
+        while self.size > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        png = self._entries.pop(key, None)
+        if png is None:
+            return
+        self.size -= len(png)
+        keys = self._by_user.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[1]]
+
+    # ----------------- Store index hooks -----------------
+    def rebuild(self, data):
+        self._entries.clear()
+        self._by_user.clear()
+        self.size = 0
+
+    def update(self, user_id, date, old, new):
+        for key in list(self._by_user.get(user_id, ())):
+            self._discard(key)
+
+
+def get_render_cache(store):
+    """Return the calendar image cache attached to ``store``"""
+    cache = store.indexes.get("render_cache")
+    if cache is None:
+        cache = store.add_index("render_cache", RenderCache())
+    return cache
+
+
+def shutdown_renderer():
+    """Stop the worker processes (called at bot shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,207 @@
+# utils/roles.py
+"""Role -> members index per guild, persisted so team commands never wait for chunking.
+
+The index is kept current from member events and from every interaction
+(whose payload carries the member's roles). A guild is only chunked the
+first time a team command runs there, and again in the background once
+the index is older than ROLE_INDEX_REFRESH.
+"""
+import asyncio
+import os
+import time
+from collections import namedtuple
+from utils import aio
+
+ROLE_INDEX_DIR = "data/roles"
+
+# Seconds before a team command triggers a background re-chunk of the guild
+ROLE_INDEX_REFRESH = float(os.getenv("ROLE_INDEX_REFRESH", str(6 * 3600)))
+
+# "full" caches every member (discord.py default); "minimal" caches none, which
+# cuts RSS on large servers (team queries read this index, chunks are not cached)
+MEMBER_CACHE = os.getenv("MEMBER_CACHE", "full")
+
+# Seconds of member changes batched into one write of the index file
+ROLE_INDEX_SAVE_DELAY = 5.0
+
+IndexedMember = namedtuple("IndexedMember", "id name role_ids")
+
+_indexes = {}
+
+
+# ----------------- Role Index -----------------
+class RoleIndex:
+    """Members (minus bots) of one guild and the roles they hold.
+
+    Stored in ``data/roles/<guild_id>.json`` as
+    ``{"refreshed": ts, "members": {id: [display_name, [role_ids]]}}``.
+    """
+
+    def __init__(self, guild_id, saved=None):
+        self.guild_id = guild_id
+        self.path = os.path.join(ROLE_INDEX_DIR, f"{guild_id}.json")
+        self.members = {}  # member_id -> IndexedMember
+        self.by_role = {}  # role_id -> {member_id}
+        self.refreshed = 0.0  # wall time of the last full chunk (0 = never)
+        self._save_handle = None
+        self._chunk_lock = asyncio.Lock()
+        self._refresh_task = None
+        self._restore(aio.read_json(self.path, {}) if saved is None else saved)
+
+    def _restore(self, saved):
+        self.refreshed = saved.get("refreshed", 0.0)
+        for member_id, (name, role_ids) in saved.get("members", {}).items():
+            self._put(IndexedMember(int(member_id), name, tuple(role_ids)))
+
+    # ----------------- Updates -----------------
+    def _put(self, member):
+        self._drop(member.id)
+        self.members[member.id] = member
+        # The @everyone role shares the guild's ID and covers every member
+        for role_id in (self.guild_id, *member.role_ids):
+            self.by_role.setdefault(role_id, set()).add(member.id)
+
+    def _drop(self, member_id):
+        old = self.members.pop(member_id, None)
+        if old is not None:
+            for role_id in (self.guild_id, *old.role_ids):
+                self.by_role.get(role_id, set()).discard(member_id)
+
+    def _role_ids(self, member):
+        # Lowest role first, as shift lookups read role_ids[::-1] (highest first)
+        return tuple(r.id for r in sorted(member.roles) if r.id != self.guild_id)
+
+    def observe(self, member):
+        """Record a ``discord.Member``'s current name and roles (no-op if unchanged)"""
+        if not member.bot:
+            self._observe(IndexedMember(member.id, member.display_name, self._role_ids(member)))
+
+    def _observe(self, entry):
+        if self.members.get(entry.id) != entry:
+            self._put(entry)
+            self._schedule_save()
+
+    def remove(self, member_id):
+        if member_id in self.members:
+            self._drop(member_id)
+            self._schedule_save()
+
+    def remove_role(self, role_id):
+        for member_id in self.by_role.pop(role_id, set()):
+            m = self.members[member_id]
+            self.members[member_id] = m._replace(role_ids=tuple(r for r in m.role_ids if r != role_id))
+        self._schedule_save()
+
+    def replace(self, members):
+        """Rebuild from a full member list (a chunk)"""
+        self.members.clear()
+        self.by_role.clear()
+        for member in members:
+            if not member.bot:
+                self._put(IndexedMember(member.id, member.display_name, self._role_ids(member)))
+        self.refreshed = time.time()
+        self._schedule_save()
+
+    # ----------------- Queries -----------------
+    def role_members(self, role_id=None):
+        """Members holding ``role_id`` (default: everyone), sorted by name"""
+        ids = self.by_role.get(self.guild_id if role_id is None else role_id, ())
+        return sorted((self.members[i] for i in ids), key=lambda m: m.name.lower())
+
+    @property
+    def stale(self):
+        return time.time() - self.refreshed > ROLE_INDEX_REFRESH
+
+    # ----------------- Persistence -----------------
+    def _schedule_save(self):
+        if self._save_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._save_handle = loop.call_later(ROLE_INDEX_SAVE_DELAY, lambda: loop.create_task(self._save()))
+
+    def _payload(self):
+        members = {str(m.id): [m.name, list(m.role_ids)] for m in self.members.values()}
+        return {"refreshed": self.refreshed, "members": members}
+
+    async def _save(self):
+        self._save_handle = None
+        await aio.save_json(self.path, self._payload())
+
+    def close(self):
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+            aio.write_json(self.path, self._payload())
+
+    # ----------------- Chunking -----------------
+    async def refresh(self, guild):
+        """Chunk ``guild`` once and rebuild the index (concurrent callers share one chunk)"""
+        refreshed = self.refreshed
+        async with self._chunk_lock:
+            if self.refreshed != refreshed:
+                return  # another caller refreshed while we waited
+            self.replace(await guild.chunk(cache=MEMBER_CACHE == "full"))
+
+    def refresh_in_background(self, guild):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_logged(guild))
+
+    async def _refresh_logged(self, guild):
+        try:
+            await self.refresh(guild)
+        except Exception as e:
+            print(f"❌ Failed to refresh role index for {guild.name}: {e}")
+
+
+def get_role_index(guild_id):
+    """Return the process-wide role index for a guild (loaded once).
+
+    A first load reads the file on the calling thread; coroutines should
+    use :func:`open_role_index`.
+    """
+    index = _indexes.get(guild_id)
+    if index is None:
+        index = _indexes[guild_id] = RoleIndex(guild_id)
+    return index
+
+
+async def open_role_index(guild_id):
+    """:func:`get_role_index` for coroutines: a first load reads the file in the storage pool"""
+    index = _indexes.get(guild_id)
+    if index is None:
+        saved = await aio.load_json(os.path.join(ROLE_INDEX_DIR, f"{guild_id}.json"), {})
+        index = _indexes.get(guild_id)
+        if index is None:  # not loaded by another caller while we read
+            index = _indexes[guild_id] = RoleIndex(guild_id, saved)
+    return index
+
+
+async def needs_chunk(bot, guild):
+    """True when the next team query for ``guild`` has to wait for a chunk (defer first)"""
+    return bot.intents.members and not (await open_role_index(guild.id)).refreshed
+
+
+async def team_members(bot, guild, role=None):
+    """Indexed members of ``role`` (default: whole guild) without waiting for a chunk when possible.
+
+    Only the first call for a guild that was never indexed waits for a chunk;
+    a stale index answers immediately and is refreshed in the background.
+    Without the members intent the index only knows members seen in events
+    and interactions.
+    """
+    index = await open_role_index(guild.id)
+    if bot.intents.members:
+        if not index.refreshed:
+            await index.refresh(guild)
+        elif index.stale:
+            index.refresh_in_background(guild)
+    return index.role_members(role.id if role is not None else None)
+
+
+def close_role_indexes():
+    """Write pending index changes; used at shutdown"""
+    for index in _indexes.values():
+        index.close()
@@ -0,0 +1,207 @@
+# utils/search.py
+"""In-memory store indexes behind app-command autocomplete.
+
+- :class:`UserDates`: each user's recorded dates, sorted, for prefix
+  lookups ("2024-0" -> that user's dates in 2024-01..09) and the nearest
+  earlier/later date.
+- :class:`TaskSearch`: word -> (user, date) postings over task text, with a
+  sorted word list so the last word of a query can be matched as a prefix.
+
+Both are kept current by the store on every write (``update`` only looks at
+the one user/date that changed), so an autocomplete keystroke is a few
+dict/bisect lookups and never reads the data files.
+"""
+import bisect
+import re
+from collections import Counter
+
+_WORD = re.compile(r"\w+")
+
+# Words a query prefix may expand to in autocomplete, so a one-letter prefix stays cheap
+MAX_PREFIX_WORDS = 50
+
+
+def words(text):
+    return _WORD.findall(str(text).lower())
+
+
+def _prefix_slice(items, prefix):
+    """Bounds of the items starting with ``prefix`` in a sorted list"""
+    lo = bisect.bisect_left(items, prefix)
+    hi = bisect.bisect_left(items, prefix + "\uffff", lo)
+    return lo, hi
+
+
+# ----------------- Dates per User -----------------
+class UserDates:
+    """Store index of the dates each user has an entry on"""
+
+    def __init__(self):
+        self.dates = {}  # user_id -> sorted [iso date]
+
+    def rebuild(self, data):
+        self.dates = {user_id: sorted(dates) for user_id, dates in data.items() if dates}
+
+    def update(self, user_id, date, old, new):
+        if (old is None) == (new is None):
+            return  # changed in place: the date is still there (or still absent)
+        dates = self.dates.setdefault(user_id, [])
+        i = bisect.bisect_left(dates, date)
+        present = i < len(dates) and dates[i] == date
+        if new is not None and not present:
+            dates.insert(i, date)
+        elif new is None and present:
+            del dates[i]
+        if not dates:
+            del self.dates[user_id]
+
+    def prefix(self, user_id, prefix="", limit=25):
+        """The user's latest ``limit`` dates starting with ``prefix``, newest first"""
+        dates = self.dates.get(user_id, [])
+        lo, hi = _prefix_slice(dates, prefix)
+        return dates[max(lo, hi - limit):hi][::-1]
+
+    def around(self, user_id, date):
+        """Closest earlier and later dates than ``date`` (None when there is none)"""
+        dates = self.dates.get(user_id, [])
+        lo = bisect.bisect_left(dates, date)
+        hi = bisect.bisect_right(dates, date)
+        return (dates[lo - 1] if lo else None), (dates[hi] if hi < len(dates) else None)
+
+
+def get_user_dates(store):
+    """Return the per-user date index for ``store``, building it on first use"""
+    index = store.indexes.get("user_dates")
+    if index is None:
+        index = store.add_index("user_dates", UserDates())
+    return index
+
+
+# ----------------- Task Text -----------------
+class TaskSearch:
+    """Store index of the words in task text.
+
+    Postings are grouped by user and point at ``(date, task text)`` with a
+    count of the tasks that day with that text, so every word of a query is
+    matched within one task, a search for one user only looks at that
+    user's postings, and an edit only moves the words that changed.
+    """
+
+    def __init__(self):
+        self.postings = {}  # word -> {user_id: {(date, text): count}}
+        self.sizes = {}     # word -> number of (user, date, text) entries, to pick the rarest word
+        self.words = []     # sorted keys of postings
+
+    def rebuild(self, data):
+        postings, sizes = {}, {}
+        for user_id, dates in data.items():
+            for date, tasks in dates.items():
+                for task in tasks:
+                    text = task["task"]
+                    key = (date, text)
+                    for word in set(words(text)):
+                        users = postings.get(word)
+                        if users is None:
+                            users = postings[word] = {}
+                        entries = users.get(user_id)
+                        if entries is None:
+                            entries = users[user_id] = {}
+                        if key not in entries:
+                            entries[key] = 0
+                            sizes[word] = sizes.get(word, 0) + 1
+                        entries[key] += 1
+        self.postings, self.sizes = postings, sizes
+        self.words = sorted(postings)
+
+    def update(self, user_id, date, old, new):
+        delta = Counter(task["task"] for task in new or ())
+        delta.subtract(task["task"] for task in old or ())
+        for text, n in delta.items():
+            if n:
+                self._apply(user_id, (date, text), n)
+
+    def _apply(self, user_id, key, n):
+        for word in set(words(key[1])):
+            users = self.postings.get(word)
+            if users is None:
+                users = self.postings[word] = {}
+                self.sizes[word] = 0
+                bisect.insort(self.words, word)
+            entries = users.setdefault(user_id, {})
+            count = entries.get(key, 0) + n
+            if count > 0:
+                self.sizes[word] += key not in entries
+                entries[key] = count
+            elif key in entries:
+                del entries[key]
+                self.sizes[word] -= 1
+            if not entries:
+                del users[user_id]
+            if not users:
+                del self.postings[word], self.sizes[word]
+                del self.words[bisect.bisect_left(self.words, word)]
+
+    # ----------------- Queries -----------------
+    def matches(self, query, user_ids=None, prefix_words=None):
+        """Yield ``(user_id, date, text)`` for tasks containing every word of ``query``.
+
+        The last word may be a prefix (it is usually still being typed); with
+        ``prefix_words`` it only expands to that many index words.
+        Matches come out unordered and lazily, so callers can stop after a page.
+        """
+        query = words(query)
+        if not query:
+            return
+        groups = [[word] for word in query[:-1]]
+        lo, hi = _prefix_slice(self.words, query[-1])
+        groups.append(self.words[lo:hi if prefix_words is None else min(hi, lo + prefix_words)])
+        if not all(word in self.postings for word in query[:-1]) or not groups[-1]:
+            return
+
+        # Walk the rarest word (or prefix) and probe the others
+        groups.sort(key=lambda group: sum(self.sizes[word] for word in group))
+        smallest = [self.postings[word] for word in groups[0]]
+        rest = [[self.postings[word] for word in group] for group in groups[1:]]
+        seen = set() if len(smallest) > 1 else None  # a task can only repeat across a prefix's words
+        for users in smallest:
+            for user_id in (users if user_ids is None else [u for u in user_ids if u in users]):
+                others = [[u[user_id] for u in group if user_id in u] for group in rest]
+                if not all(others):
+                    continue
+                for key in users[user_id]:
+                    if seen is not None:
+                        if (user_id, key) in seen:
+                            continue
+                        seen.add((user_id, key))
+                    for group in others:
+                        for entries in group:
+                            if key in entries:
+                                break
+                        else:
+                            break  # missing from every word of this group
+                    else:
+                        yield user_id, key[0], key[1]
+
+    def texts(self, query, user_ids=None, limit=25):
+        """Distinct task texts matching ``query`` (for autocomplete)"""
+        found = {}
+        for _, _, text in self.matches(query, user_ids, MAX_PREFIX_WORDS):
+            found[text] = None
+            if len(found) >= limit:
+                break
+        return list(found)
+
+    def find(self, store, query, user_ids=None):
+        """``(user_id, date, task)`` for every task matching ``query``, newest first"""
+        results = []
+        for user_id, date, text in sorted(self.matches(query, user_ids), key=lambda m: m[1], reverse=True):
+            results.extend((user_id, date, task) for task in store.get(user_id, date) or () if task["task"] == text)
+        return results
+
+
+def get_task_search(store):
+    """Return the task text index for the tasks ``store``, building it on first use"""
+    index = store.indexes.get("task_search")
+    if index is None:
+        index = store.add_index("task_search", TaskSearch())
+    return index
@@ -0,0 +1,148 @@
+# utils/sqlite.py
+import os
+import sqlite3
+import threading
+import time
+from utils import metrics
+from utils.aio import dumps, loads, read_json
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/bot.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    dataset    TEXT NOT NULL,
+    user_id    TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (dataset, user_id, date)
+);
+-- Only the primary key is read; these indexes served queries that were dropped
+DROP INDEX IF EXISTS records_by_date;
+DROP INDEX IF EXISTS records_by_time;
+CREATE TABLE IF NOT EXISTS migrations (
+    dataset     TEXT PRIMARY KEY,
+    migrated_at REAL NOT NULL
+);
+"""
+
+
+# ----------------- SQLite Backend -----------------
+class SqliteBackend:
+    """Stores each ``{user_id: {date: value}}`` entry as one indexed row.
+
+    All data files share one database; the dataset column is the file path
+    relative to the data folder (``attendance``, ``guilds/<id>/tasks``).
+    ``value`` is the JSON of whatever lives under the date: a status string
+    for attendance, the day's task list for tasks.
+    Writes and queries run in a worker thread, never on the event loop.
+    """
+
+    journaled = True
+
+    def __init__(self, path, db_path=SQLITE_PATH):
+        self.legacy_path = path
+        # "attendance" for data/attendance.json, "guilds/<id>/attendance" for a guild partition
+        self.dataset = os.path.splitext(os.path.relpath(path, os.path.dirname(db_path) or "."))[0].replace(os.sep, "/")
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # ----------------- Startup -----------------
+    def load(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, date, value FROM records WHERE dataset = ? ORDER BY rowid",
+                (self.dataset,)
+            ).fetchall()
+            migrated = self._conn.execute("SELECT 1 FROM migrations WHERE dataset = ?", (self.dataset,)).fetchone()
+        if migrated is None:
+            if not rows:
+                return self._migrate()
+            self._mark_migrated()  # database filled before migrations were recorded
+
+        data = {}
+        for user_id, date, value in rows:
+            data.setdefault(user_id, {})[date] = loads(value)
+        metrics.count_bytes("read", sum(len(row[2]) for row in rows))
+        return data
+
+    def _migrate(self):
+        """One-shot import of the old whole-file layout.
+
+        Recorded in the migrations table in the same transaction, so a dataset
+        emptied later stays empty instead of re-importing the legacy file.
+        """
+        if not os.path.exists(self.legacy_path):
+            self._mark_migrated()
+            return {}
+        data = read_json(self.legacy_path)
+        now = time.time()
+        rows = [
+            (self.dataset, user_id, date, dumps(value), now)
+            for user_id, dates in data.items()
+            for date, value in dates.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR IGNORE INTO migrations VALUES (?, ?)", (self.dataset, now))
+        print(f"🔄 Migrated {self.legacy_path} into {self.dataset} table")
+        return data
+
+    def _mark_migrated(self):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO migrations VALUES (?, ?)", (self.dataset, time.time()))
+
+    # ----------------- Writes -----------------
+    def prepare(self, data, records):
+        """Collapse the batch into the final value of each touched (user, date)"""
+        touched_users, touched_rows = set(), set()
+        for record in records:
+            keys = loads(record)[1]
+            if len(keys) == 1:
+                touched_users.add(keys[0])
+            else:
+                touched_rows.add((keys[0], keys[1]))
+
+        now = time.time()
+        upserts, deletes = [], []
+        for user_id in touched_users:
+            deletes.append((self.dataset, user_id))
+            for date, value in data.get(user_id, {}).items():
+                upserts.append((self.dataset, user_id, date, dumps(value), now))
+        for user_id, date in touched_rows:
+            if user_id in touched_users:
+                continue
+            value = data.get(user_id, {}).get(date)
+            if value is None:
+                deletes.append((self.dataset, user_id, date))
+            else:
+                upserts.append((self.dataset, user_id, date, dumps(value), now))
+        return upserts, deletes
+
+    def write(self, payload):
+        upserts, deletes = payload
+        metrics.count_bytes("written", sum(len(row[3]) for row in upserts))
+        with self._lock, self._conn:
+            for key in deletes:
+                if len(key) == 2:
+                    self._conn.execute("DELETE FROM records WHERE dataset = ? AND user_id = ?", key)
+                else:
+                    self._conn.execute("DELETE FROM records WHERE dataset = ? AND user_id = ? AND date = ?", key)
+            self._conn.executemany(
+                "INSERT INTO records VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (dataset, user_id, date) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                upserts
+            )
+
+    def stamp(self):
+        """Changes whenever another connection commits to the database"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self, data):
+        with self._lock:
+            self._conn.close()
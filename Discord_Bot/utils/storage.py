@@ -0,0 +1,501 @@
+# utils/storage.py
+import asyncio
+import contextlib
+import copy
+import os
+import weakref
+from types import MappingProxyType
+from utils import aio
+from utils.aio import atomic_write, dumps, loads, read_json  # atomic_write re-exported for existing imports
+from utils.roles import get_role_index, open_role_index
+
+ATTENDANCE_FILE = "data/attendance.json"
+TASKS_FILE = "data/tasks.json"
+
+# "json" rewrites the whole file on flush, "journal" appends one record per change,
+# "sqlite" keeps indexed rows in data/bot.db
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+
+# Seconds to wait after the last write before flushing to disk
+FLUSH_DELAY = float(os.getenv("STORAGE_FLUSH_DELAY", "2.0"))
+
+# Set when several bot processes share the same data files
+STORAGE_FILE_LOCK = os.getenv("STORAGE_FILE_LOCK", "0") == "1"
+
+# "global": one data file for every guild (a user has one record everywhere).
+# "guild": one file per guild under data/guilds/<guild_id>/, seeded with the
+# guild's members' records from the global file; processes owning different
+# shards never share a file.
+STORAGE_PARTITION = os.getenv("STORAGE_PARTITION", "global")
+
+
+# ----------------- Mutations -----------------
+def apply_op(data, op, keys, value=None):
+    """Apply one mutation to nested JSON data. Returns the removed value for deletes.
+
+    ``op`` is "set", "append" or "delete". Used both by the live store and when
+    replaying a journal, so the two can never disagree.
+    """
+    if op == "delete":
+        nodes = [data]
+        for key in keys[:-1]:
+            nodes.append(nodes[-1][key])
+        removed = nodes[-1].pop(keys[-1])
+
+        # Drop empty containers (e.g. a date with no tasks left, then the user)
+        for depth in range(len(keys) - 1, 0, -1):
+            if nodes[depth]:
+                break
+            nodes[depth - 1].pop(keys[depth - 1])
+        return removed
+
+    node = data
+    for key in keys[:-1]:
+        if isinstance(node, list):
+            node = node[key]
+        else:
+            node = node.setdefault(key, {})
+
+    if op == "set":
+        node[keys[-1]] = value
+    elif op == "append":
+        if isinstance(node, dict):
+            node.setdefault(keys[-1], []).append(value)
+        else:
+            node[keys[-1]].append(value)
+    else:
+        raise ValueError(f"Unknown storage op: {op}")
+    return None
+
+
+# ----------------- File Helpers -----------------
+def file_stamp(*paths):
+    """Cheap change marker for files written by other processes"""
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            stamps.append(None)
+        else:
+            stamps.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+class FileLock:
+    """Exclusive advisory lock on ``<path>.lock`` shared between processes"""
+
+    def __init__(self, path):
+        self.path = f"{path}.lock"
+        self._fd = None
+
+    def acquire(self):
+        import fcntl  # POSIX only; STORAGE_FILE_LOCK is not supported on Windows
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)  # closing the descriptor drops the flock
+            self._fd = None
+
+
+# ----------------- Backends -----------------
+class JsonFileBackend:
+    """Whole-file JSON persistence (the original data/*.json layout).
+
+    Keeps each user's entries encoded from the last write, so a flush only
+    re-encodes the users changed since then on the event loop and the file
+    is assembled in the storage pool. Costs about one file's size in memory.
+    """
+
+    journaled = True  # prepare() reads the changed user IDs from the records
+
+    def __init__(self, path):
+        self.path = path
+        self._parts = {}  # user_id -> JSON of that user's entries
+
+    def load(self):
+        data = read_json(self.path, {})
+        self._parts = {user_id: dumps(entries) for user_id, entries in data.items()}
+        return data
+
+    def prepare(self, data, records):
+        """Re-encode the changed users on the event loop (consistent snapshot)"""
+        for user_id in {loads(record)[1][0] for record in records}:
+            if user_id in data:
+                self._parts[user_id] = dumps(data[user_id])
+            else:
+                self._parts.pop(user_id, None)
+        return list(self._parts.items())
+
+    def write(self, payload):
+        # Temp file + rename: a crash mid-write leaves the previous file intact
+        atomic_write(self.path, "{" + ",".join(f"{dumps(str(user_id))}:{part}" for user_id, part in payload) + "}")
+
+    def stamp(self):
+        return file_stamp(self.path)
+
+    def close(self, data):
+        pass
+
+
+def make_backend(path, kind=None):
+    """Create the configured backend for a data file"""
+    kind = kind or STORAGE_BACKEND
+    if kind == "json":
+        return JsonFileBackend(path)
+    if kind == "journal":
+        from utils.journal import JournalBackend
+        return JournalBackend(path)
+    if kind == "sqlite":
+        from utils.sqlite import SqliteBackend
+        return SqliteBackend(path)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {kind}")
+
+
+# ----------------- Store -----------------
+class Store:
+    """In-memory copy of a data file, persisted in the background by a backend.
+
+    Reads never touch the disk. Writes mark the store dirty and schedule a
+    debounced flush, so a burst of commands costs a single backend write.
+    Backend I/O from the event loop goes through the storage pool (utils/aio.py).
+    """
+
+    def __init__(self, path, backend=None, flush_delay=None, file_lock=STORAGE_FILE_LOCK):
+        self.path = path
+        self.backend = backend or make_backend(path)
+        if flush_delay is None:
+            flush_delay = getattr(self.backend, "flush_delay", FLUSH_DELAY)
+        self.flush_delay = flush_delay
+        self.file_lock = FileLock(path) if file_lock else None
+        self._data = self.backend.load()
+        self._stamp = self.backend.stamp()
+        self._key_locks = weakref.WeakValueDictionary()  # key -> asyncio.Lock
+        self._file_guard = asyncio.Lock()  # one holder of the file lock per process
+        self.indexes = {}  # name -> derived index kept in sync with every write
+        self.versions = {}  # user_id -> write counter, bumped on every change to that user
+        self._records = []  # encoded mutations not yet handed to the backend
+        self._dirty = False
+        self._flush_handle = None
+        self._flush_task = None
+        self._write_lock = asyncio.Lock()
+
+    # ----------------- Reads -----------------
+    def view(self):
+        """Read-only view of the whole store (no copy)"""
+        return MappingProxyType(self._data)
+
+    def get(self, *keys, default=None):
+        """Return the value at ``keys``; dicts are returned as read-only views.
+
+        Lists (e.g. a day's tasks) are returned as-is and must not be mutated.
+        """
+        node = self._data
+        for key in keys:
+            try:
+                node = node[key]
+            except (KeyError, IndexError, TypeError):
+                return default
+        if isinstance(node, dict):
+            return MappingProxyType(node)
+        return node
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def version(self, user_id):
+        """Change counter for one user's records (0 until first written this session)"""
+        return self.versions.get(user_id, 0)
+
+    # ----------------- Transactions -----------------
+    @contextlib.asynccontextmanager
+    async def transaction(self, *key):
+        """Serialize read-check-write sequences on ``key`` (usually a user ID).
+
+        Writers to different keys run concurrently. With STORAGE_FILE_LOCK the
+        block also holds the cross-process file lock, picks up writes made by
+        other processes first, and writes its changes before releasing.
+        """
+        lock = self._key_locks.get(key)
+        if lock is None:
+            lock = self._key_locks[key] = asyncio.Lock()
+
+        async with lock:
+            if self.file_lock is None:
+                yield self
+                return
+
+            async with self._file_guard:
+                await aio.run(self.file_lock.acquire, label=f"lock {self.path}")
+                try:
+                    await self._reload_if_changed()
+                    yield self
+                    await self._flush()
+                finally:
+                    self.file_lock.release()
+
+    async def _reload_if_changed(self):
+        """Reload data another process wrote since our last read or write"""
+        stamp = await aio.run(self.backend.stamp, label=f"stat {self.path}")
+        if stamp == self._stamp:
+            return
+        self._data = await aio.run(self.backend.load, label=f"reload {self.path}")
+        self._stamp = stamp
+        for user_id in set(self.versions) | set(self._data):
+            self.versions[user_id] = self.versions.get(user_id, 0) + 1
+        for index in self.indexes.values():
+            index.rebuild(self._data)
+
+    # ----------------- Indexes -----------------
+    def add_index(self, name, index):
+        """Attach a derived index: built once from the data, then updated on every write.
+
+        ``index`` needs ``rebuild(data)`` and ``update(user_id, date, old, new)``,
+        where old/new are the entry under ``data[user_id][date]`` (None if absent).
+        """
+        index.rebuild(self._data)
+        self.indexes[name] = index
+        return index
+
+    def _entries(self, keys):
+        """Copy the ``(user_id, date)`` entries a write to ``keys`` can change"""
+        user = self._data.get(keys[0], {})
+        if len(keys) == 1:
+            return {(keys[0], date): copy.deepcopy(value) for date, value in user.items()}
+        return {(keys[0], keys[1]): copy.deepcopy(user.get(keys[1]))}
+
+    # ----------------- Writes -----------------
+    def _apply(self, op, keys, value=None):
+        if self.backend.journaled:
+            # Encode now: later mutations may change the same objects in place
+            self._records.append(dumps([op, keys, value]))
+        before = self._entries(keys) if self.indexes else None
+        result = apply_op(self._data, op, keys, value)
+        self.versions[keys[0]] = self.versions.get(keys[0], 0) + 1
+
+        if before is not None:
+            user = self._data.get(keys[0], {})
+            if len(keys) == 1:
+                for date in user:
+                    before.setdefault((keys[0], date), None)
+            for (user_id, date), old in before.items():
+                new = user.get(date)
+                for index in self.indexes.values():
+                    index.update(user_id, date, old, new)
+
+        self._mark_dirty()
+        return result
+
+    def set(self, *keys, value):
+        """Set the value at ``keys``, creating intermediate dicts"""
+        self._apply("set", keys, value)
+
+    def append(self, *keys, value):
+        """Append ``value`` to the list at ``keys``, creating it if needed"""
+        self._apply("append", keys, value)
+
+    def delete(self, *keys):
+        """Remove the value at ``keys`` and prune parents left empty. Returns the removed value."""
+        return self._apply("delete", keys)
+
+    # ----------------- Persistence -----------------
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop (e.g. scripts): caller flushes with close()
+        self._flush_handle = loop.call_later(self.flush_delay, self._schedule_flush)
+
+    def _schedule_flush(self):
+        self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self):
+        """Persist pending changes. Disk I/O runs off the event loop."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self.file_lock is None:
+            await self._flush()
+            return
+
+        async with self._file_guard:
+            await aio.run(self.file_lock.acquire, label=f"lock {self.path}")
+            try:
+                await self._flush()
+            finally:
+                self.file_lock.release()
+
+    async def _flush(self):
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            # Build the payload on the loop so it is consistent, write in a thread
+            records, self._records = self._records, []
+            with aio.budget(f"prepare {self.path}"):
+                payload = self.backend.prepare(self._data, records)
+            self._dirty = False
+            await aio.run(self._write, payload, label=f"flush {self.path}")
+
+    def _write(self, payload):
+        self.backend.write(payload)
+        self._stamp = self.backend.stamp()
+
+    def flush_sync(self):
+        """Flush synchronously, without the event loop"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._dirty:
+            records, self._records = self._records, []
+            if self.file_lock is not None:
+                self.file_lock.acquire()
+            try:
+                self.backend.write(self.backend.prepare(self._data, records))
+            finally:
+                if self.file_lock is not None:
+                    self.file_lock.release()
+            self._dirty = False
+
+    def close(self):
+        """Flush synchronously; used at shutdown when the loop may be going away"""
+        self.flush_sync()
+        self.backend.close(self._data)
+
+
+# ----------------- Shared Instances -----------------
+_stores = {}
+_opening = {}  # (path, guild_id) -> task loading that store in the storage pool
+_hooks = {}  # base path -> [hook(store)] run on every store created for it
+
+
+def partition_path(path, guild_id=None):
+    """Data file holding ``guild_id``'s records for the base ``path``"""
+    if STORAGE_PARTITION != "guild" or guild_id is None:
+        return path
+    return os.path.join(os.path.dirname(path), "guilds", str(guild_id), os.path.basename(path))
+
+
+def add_store_hook(path, hook):
+    """Run ``hook(store)`` on every store of ``path`` (all partitions), now and when created.
+
+    Used to attach indexes so a guild's store has them from its first write.
+    """
+    if hook in _hooks.setdefault(path, []):
+        return
+    _hooks[path].append(hook)
+    for (base, _), store in _stores.items():
+        if base == path:
+            hook(store)
+
+
+def get_store(path, guild_id=None):
+    """Return the process-wide store for ``path`` and guild (loaded once).
+
+    A first load reads the whole file on the calling thread; coroutines
+    should use :func:`open_store`.
+    """
+    if STORAGE_PARTITION != "guild":
+        guild_id = None
+    store = _stores.get((path, guild_id))
+    if store is None:
+        members = get_role_index(guild_id) if guild_id is not None else None
+        store = _register(path, guild_id, _load_store(path, guild_id, *_known_members(members)))
+    return store
+
+
+async def open_store(path, guild_id=None):
+    """:func:`get_store` for coroutines: a first load (and seeding) runs in the storage pool"""
+    if STORAGE_PARTITION != "guild":
+        guild_id = None
+    key = (path, guild_id)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+    task = _opening.get(key)
+    if task is None:
+        # Concurrent first commands in a guild share one load
+        task = _opening[key] = asyncio.get_running_loop().create_task(_open(path, guild_id))
+    return await asyncio.shield(task)
+
+
+async def _open(path, guild_id):
+    try:
+        members = await open_role_index(guild_id) if guild_id is not None else None
+        store = await aio.run(
+            _load_store, path, guild_id, *_known_members(members), label=f"open {partition_path(path, guild_id)}"
+        )
+        return _register(path, guild_id, store)
+    finally:
+        _opening.pop((path, guild_id), None)
+
+
+def _known_members(index):
+    """(member IDs, whether a full chunk filled the index), copied on the loop for the seed"""
+    if index is None:
+        return frozenset(), False
+    return frozenset(str(member_id) for member_id in index.members), bool(index.refreshed)
+
+
+def _load_store(path, guild_id, member_ids=frozenset(), complete=False):
+    store = Store(partition_path(path, guild_id))
+    if guild_id is not None:
+        _seed_partition(store, path, member_ids, complete)
+    return store
+
+
+def _register(path, guild_id, store):
+    """Publish a loaded store and attach its hooks (on the loop thread)"""
+    existing = _stores.get((path, guild_id))
+    if existing is not None:
+        store.backend.close(store.view())  # lost a race with get_store(); keep the first
+        return existing
+    _stores[(path, guild_id)] = store
+    for hook in _hooks.get(path, ()):
+        hook(store)
+    return store
+
+
+def _seed_partition(store, legacy_path, member_ids, complete):
+    """Copy the guild's members' records from the global file into its partition.
+
+    The global data is not keyed by guild, so only users in the guild's role
+    index are copied; anyone else's history stays out of this guild. Until
+    the index has been filled by a full chunk it may miss members, so each
+    open copies the members it knows that the partition lacks, and the
+    ``.seeded`` marker is only written once a chunked index has been applied.
+    """
+    marker = f"{store.path}.seeded"
+    if os.path.exists(marker):
+        return
+    legacy = make_backend(legacy_path)
+    data = legacy.load()
+    legacy.close(data)
+    copied = 0
+    for user_id, dates in data.items():
+        if user_id in member_ids and store.get(user_id) is None:
+            store.set(user_id, value=dates)
+            copied += 1
+    if copied:
+        store.flush_sync()  # write now so the marker never precedes the data
+        print(f"🔄 Seeded {store.path} with {copied} members from {legacy_path}")
+    if complete:
+        os.makedirs(os.path.dirname(marker) or ".", exist_ok=True)
+        open(marker, "w").close()
+
+
+def iter_stores(path):
+    """Stores already open for ``path`` (one per guild when partitioned)"""
+    return [store for (base, _), store in _stores.items() if base == path]
+
+
+def close_stores():
+    """Flush every open store to disk"""
+    for store in _stores.values():
+        store.close()
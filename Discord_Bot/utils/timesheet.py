@@ -0,0 +1,153 @@
+# utils/timesheet.py
+"""Task durations as integer minutes, and per-user day/ISO-week totals.
+
+Tasks are stored as ``{"task": str, "time": str, "minutes": int}``:
+``minutes`` is parsed once when the task is written and ``time`` is its
+normalized display text ("1h 30m"). Older tasks only have free-form text,
+under ``time`` (or ``duration`` in early data); they are parsed once when
+the index is built.
+
+:class:`Timesheet` is a store index over the tasks file, so /timesheet
+answers from running totals instead of rescanning every task.
+"""
+import re
+from datetime import date, timedelta
+
+_CLOCK = re.compile(r"(\d+):([0-5]\d)")  # "1:30"
+_PARTS = re.compile(r"(?:\d+(?:\.\d+)?\s*[a-z]*\s*)+")
+_PART = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]*)")
+_UNITS = {
+    "": 1, "m": 1, "min": 1, "mins": 1, "minute": 1, "minutes": 1,
+    "h": 60, "hr": 60, "hrs": 60, "hour": 60, "hours": 60,
+}
+
+
+# ----------------- Durations -----------------
+def parse_duration(text):
+    """Minutes in a free-form duration, or None if unreadable.
+
+    Accepts e.g. "45m", "1h 30m", "1h30", "1.5h", "2 hours", "1:30" and a
+    bare number of minutes ("90").
+    """
+    text = str(text).strip().lower().replace(",", " ").replace(" and ", " ")
+    clock = _CLOCK.fullmatch(text)
+    if clock:
+        return int(clock[1]) * 60 + int(clock[2])
+    if not _PARTS.fullmatch(text):
+        return None
+
+    total = 0.0
+    for number, unit in _PART.findall(text):
+        if unit not in _UNITS:
+            return None
+        total += float(number) * _UNITS[unit]  # unit-less counts as minutes, so "1h30" works
+    return round(total)
+
+
+def format_minutes(minutes):
+    """120 -> "2h", 90 -> "1h 30m", 45 -> "45m" """
+    hours, minutes = divmod(int(minutes), 60)
+    if hours and minutes:
+        return f"{hours}h {minutes}m"
+    return f"{hours}h" if hours else f"{minutes}m"
+
+
+def task_time(task):
+    """Display text of a stored task's duration, whichever key it was saved under"""
+    return task.get("time", task.get("duration", "?"))
+
+
+def task_minutes(task):
+    """Minutes of a stored task (None if its legacy text is unreadable)"""
+    minutes = task.get("minutes")
+    if minutes is None:
+        minutes = parse_duration(task_time(task))
+    return minutes
+
+
+def day_minutes(tasks):
+    return sum(task_minutes(t) or 0 for t in tasks or ())
+
+
+# ----------------- Periods -----------------
+def week_range(day):
+    """Monday and Sunday of the ISO week containing ``day``"""
+    monday = day - timedelta(days=day.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+# ----------------- Timesheet Index -----------------
+class Timesheet:
+    """Store index of minutes per user per day and per ISO week.
+
+    ``update`` receives a user's whole task list for one date (before and
+    after the write), so edits and deletes adjust the totals by the
+    difference without touching other days.
+    """
+
+    def __init__(self):
+        self.days = {}   # user_id -> {iso date: minutes}
+        self.weeks = {}  # user_id -> {(iso year, iso week): minutes}
+
+    def rebuild(self, data):
+        self.days.clear()
+        self.weeks.clear()
+        for user_id, dates in data.items():
+            for iso, tasks in dates.items():
+                self._add(user_id, iso, day_minutes(tasks), present=True)
+
+    def update(self, user_id, date, old, new):
+        self._add(user_id, date, day_minutes(new) - day_minutes(old), present=new is not None)
+
+    def _add(self, user_id, iso, delta, present):
+        days = self.days.setdefault(user_id, {})
+        if present:
+            days[iso] = days.get(iso, 0) + delta
+        else:
+            days.pop(iso, None)
+        week = date.fromisoformat(iso).isocalendar()[:2]
+        weeks = self.weeks.setdefault(user_id, {})
+        weeks[week] = weeks.get(week, 0) + delta
+        if not weeks[week]:
+            weeks.pop(week)
+        if not days:
+            self.days.pop(user_id)
+            self.weeks.pop(user_id, None)
+
+    # ----------------- Queries -----------------
+    def day(self, user_id, day):
+        return self.days.get(user_id, {}).get(day.isoformat(), 0)
+
+    def week(self, user_id, day):
+        """Minutes in the ISO week containing ``day``"""
+        return self.weeks.get(user_id, {}).get(day.isocalendar()[:2], 0)
+
+    def total(self, user_id, since, until):
+        """Minutes on days ``since..until`` (inclusive); whole ISO weeks are single lookups"""
+        minutes, day = 0, since
+        while day <= until:
+            if day.weekday() == 0 and day + timedelta(days=6) <= until:
+                minutes += self.week(user_id, day)
+                day += timedelta(days=7)
+            else:
+                minutes += self.day(user_id, day)
+                day += timedelta(days=1)
+        return minutes
+
+    def team(self, user_ids, since, until):
+        """``{user_id: minutes}`` for each user with time logged in the range"""
+        totals = {}
+        for user_id in user_ids:
+            if user_id in self.days:
+                minutes = self.total(user_id, since, until)
+                if minutes:
+                    totals[user_id] = minutes
+        return totals
+
+
+def get_timesheet(store):
+    """Return the timesheet index for the tasks ``store``, building it on first use"""
+    index = store.indexes.get("timesheet")
+    if index is None:
+        index = store.add_index("timesheet", Timesheet())
+    return index